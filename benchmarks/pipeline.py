@@ -0,0 +1,317 @@
+"""
+Offline pipeline benchmark.
+
+Replays the pages captured in debug_html/ through cleanup, chunking,
+extraction (against a deterministic fake chat model with configurable
+latency), JSON repair, dedupe and validation, and compares the numbers with
+benchmarks/baseline.json:
+
+    python -m benchmarks.pipeline                  # compare, exit 1 on regression
+    python -m benchmarks.pipeline --update-baseline
+    python -m benchmarks.pipeline --snapshots data/snapshots   # latest live pages
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from spagent.chains.extractor import ExtractorChain
+from spagent.llm import set_model_concurrency
+from spagent.schemas import Event, FetchResult, SuccessCriteria
+from spagent.snapshots import SnapshotStore
+from spagent.tools.calendar import TZ
+from spagent.tools.chunker import chunk_html
+from spagent.tools.compact import compact_html, minify_html
+from spagent.tools.dedupe import dedupe
+from spagent.tools.fetchers import clean_sao_paulo_secreto, strip_head_scripts_styles
+from spagent.tools.validation import validate
+from spagent.utils import normalize_llm_json
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "debug_html"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+BENCH_MODEL = "bench-fake"
+# A fixed weekend, so validation results don't depend on today's date
+WINDOW = (
+    TZ.localize(datetime(2026, 1, 9)),
+    TZ.localize(datetime(2026, 1, 11, 23, 59)),
+)
+DATES = ("2026-01-09", "2026-01-10", "2026-01-11", "2026-02-20")
+
+CLEANERS = {"sao_paulo_secreto": clean_sao_paulo_secreto}
+
+HEADING_RE = re.compile(r"^#{2,3} (.+)$", re.MULTILINE)
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+# A stage regresses when its p95 grows by more than this fraction (and by
+# more than MIN_REGRESSION_MS, so sub-millisecond stages don't flap)
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 1.0
+# Counts that must match the baseline exactly
+EXACT_KEYS = ("pages", "chunks", "llm_calls", "extracted", "deduped", "validated")
+
+
+class FakeExtractorModel(BaseChatModel):
+    """
+    Deterministic stand-in for the extraction model.
+
+    Every h2/h3 heading (`## ...` / `### ...` in the compact text) in the
+    chunk becomes an event. Depending on a hash of
+    its title, about a third are repeated in upper case (dedupe work) and a
+    quarter are dated outside the window (validation work); every fourth
+    response is wrapped in a markdown fence with trailing chatter (JSON
+    repair work).
+    """
+
+    latency: float = 0.0
+    calls: int = 0
+    raw: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "bench-fake"
+
+    def _respond(self, messages) -> str:
+        page = messages[-1].content.split("PAGE:\n", 1)[-1]
+        titles = [
+            LINK_RE.sub(r"\1", m.group(1)).strip() for m in HEADING_RE.finditer(page)
+        ]
+        events = []
+        for title in filter(None, titles):
+            h = zlib.crc32(title.encode("utf-8"))
+            event = {"title": title, "starts_at": DATES[h % len(DATES)]}
+            events.append(event)
+            if h % 3 == 0:
+                events.append({**event, "title": title.upper()})
+
+        self.calls += 1
+        text = json.dumps({"events": events}, ensure_ascii=False)
+        if self.calls % 4 == 0:
+            text = f"```json\n{text}\n```\nThese are the events I found."
+        self.raw.append(text)
+        return text
+
+    def _result(self, text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(text))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return self._result(self._respond(messages))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._result(self._respond(messages))
+
+
+def load_fixtures(path: Path = FIXTURES) -> List[FetchResult]:
+    pages = []
+    for file in sorted(path.glob("*.txt")):
+        html = file.read_text(encoding="utf-8", errors="ignore")
+        if html.strip():
+            pages.append(
+                FetchResult(
+                    url=f"https://{file.stem}.test/", html=html, source=file.stem
+                )
+            )
+    return pages
+
+
+class Timer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextlib.contextmanager
+    def __call__(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.samples.setdefault(stage, []).append(ms)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+async def _run_once(
+    pages: List[FetchResult], timer: Timer, latency: float, concurrency: int
+) -> Dict[str, int]:
+    model = FakeExtractorModel(latency=latency)
+    extractor = ExtractorChain(model=BENCH_MODEL, max_concurrency=concurrency)
+    extractor.llm.llm = model
+
+    counts = {"pages": len(pages), "chunks": 0, "extracted": 0}
+    events: List[Event] = []
+    for page in pages:
+        clean = CLEANERS.get(page.source, strip_head_scripts_styles)
+        with timer("cleanup"):
+            html = clean(page.html)
+        with timer("chunking"):
+            chunks = chunk_html(minify_html(html), max_tokens=extractor.chunk_tokens)
+            counts["chunks"] += sum(1 for c in chunks if compact_html(c))
+        with timer("extraction"):
+            result = await extractor.extract(page.model_copy(update={"html": html}))
+        events.extend(result.events)
+
+    for text in model.raw:
+        with timer("json_repair"):
+            normalize_llm_json(text)
+
+    counts["extracted"] = len(events)
+    with timer("dedupe"):
+        events = dedupe(events)
+    counts["deduped"] = len(events)
+    with timer("validation"):
+        report = validate(events, SuccessCriteria(), WINDOW)
+    counts["validated"] = len(report.events)
+    counts["llm_calls"] = model.calls
+    return counts
+
+
+def run_benchmark(
+    pages: Optional[List[FetchResult]] = None,
+    *,
+    repeat: int = 3,
+    latency: float = 0.05,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """Run the pipeline `repeat` times and return the report dict."""
+    pages = load_fixtures() if pages is None else pages
+    set_model_concurrency(BENCH_MODEL, concurrency)
+    timer = Timer()
+
+    cwd = os.getcwd()
+    # The extractor prints progress and writes caches relative to the cwd;
+    # keep both away from the fixtures and the report
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        contextlib.redirect_stdout(io.StringIO()),
+    ):
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                counts = asyncio.run(_run_once(pages, timer, latency, concurrency))
+            elapsed = time.perf_counter() - start
+
+            # tracemalloc slows allocation-heavy stages several times over,
+            # so peak memory comes from a separate, untimed run
+            tracemalloc.start()
+            asyncio.run(_run_once(pages, Timer(), latency, concurrency))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "config": {"repeat": repeat, "latency": latency, "concurrency": concurrency},
+        "counts": counts,
+        "throughput": {
+            "chunks_per_s": round(counts["chunks"] * repeat / elapsed, 2),
+            "events_per_s": round(counts["validated"] * repeat / elapsed, 2),
+        },
+        "stages": {
+            stage: {
+                "p50_ms": round(percentile(samples, 0.5), 3),
+                "p95_ms": round(percentile(samples, 0.95), 3),
+                "n": len(samples),
+            }
+            for stage, samples in timer.samples.items()
+        },
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Regressions of `report` against `baseline`, as readable lines."""
+    problems = []
+    for key in EXACT_KEYS:
+        old, new = baseline["counts"].get(key), report["counts"].get(key)
+        if old != new:
+            problems.append(f"{key}: {old} -> {new}")
+
+    for stage, stats in report["stages"].items():
+        old = baseline["stages"].get(stage)
+        if (
+            old
+            and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance)
+            and stats["p95_ms"] - old["p95_ms"] > MIN_REGRESSION_MS
+        ):
+            problems.append(
+                f"{stage} p95: {old['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms"
+            )
+
+    old_peak = baseline.get("peak_memory_mb")
+    if old_peak and report["peak_memory_mb"] > old_peak * (1 + tolerance):
+        problems.append(
+            f"peak memory: {old_peak:.1f}MB -> {report['peak_memory_mb']:.1f}MB"
+        )
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--snapshots",
+        type=Path,
+        help="Benchmark the latest page of each source in this snapshot store "
+        "instead of the fixtures (not comparable with the baseline)",
+    )
+    args = parser.parse_args(argv)
+
+    pages = None
+    if args.snapshots:
+        pages = list(SnapshotStore(args.snapshots).latest_pages().values())
+    report = run_benchmark(
+        pages, repeat=args.repeat, latency=args.latency, concurrency=args.concurrency
+    )
+    print(json.dumps(report, indent=2))
+    if args.snapshots:
+        return 0
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("no baseline; run with --update-baseline", file=sys.stderr)
+        return 0
+
+    problems = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    for line in problems:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
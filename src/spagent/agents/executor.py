@@ -1,5 +1,7 @@
+import asyncio
 import time
-from typing import Dict, Callable, Awaitable, Any, List
+from datetime import datetime
+from typing import Dict, Callable, Awaitable, Any, List, Optional, Tuple
 from ..schemas import (
     EventList,
     FetchResult,
@@ -8,22 +10,52 @@ from ..schemas import (
     StepResult,
     ExecutionSummary,
     Event,
+    SuccessCriteria,
 )
+from ..budget import Budget, within_deadline
+from ..tracing import span
 
 ToolFn = Callable[..., Awaitable[Any]]
 
+DEFAULT_MAX_CONCURRENCY = 4
+# LLM calls stop at the budget deadline by themselves; fetches and tools
+# still running this long after it are cancelled
+DEADLINE_GRACE_S = 2.0
+
 
 class Executor:
-    def __init__(self, tools: Dict[str, ToolFn]):
+    def __init__(
+        self,
+        tools: Dict[str, ToolFn],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        window: Optional[Tuple[datetime, datetime]] = None,
+        budget: Budget | None = None,
+    ):
         self.tools = tools
+        self.max_concurrency = max(1, max_concurrency)
+        # Date window for validate_events (None: the current weekend)
+        self.window = window
+        self.budget = budget
+        self.criteria = SuccessCriteria()
         self.pages: List[FetchResult] = []
         self.events: List[Event] = []
         self.sources = set()
         self.step_results: List[StepResult] = []
 
-    async def run_step(self, step: PlanStep) -> StepResult:
-        fn = self.tools.get(step.tool)
-
+    def _resolve(self, step: PlanStep) -> ToolFn | StepResult:
+        """
+        The tool for `step`, or a failed StepResult when it is not
+        registered or cannot be built (tools are built on first lookup).
+        """
+        try:
+            fn = self.tools.get(step.tool)
+        except Exception as e:
+            return StepResult(
+                tool=step.tool,
+                ok=False,
+                errors=1,
+                notes=f"Tool could not be built: {type(e).__name__}: {e}",
+            )
         if not fn:
             return StepResult(
                 tool=step.tool,
@@ -31,19 +63,43 @@ class Executor:
                 errors=1,
                 notes=f"Tool not registered: {step.tool}",
             )
+        return fn
+
+    async def run_step(self, step: PlanStep) -> StepResult:
+        fn = self._resolve(step)
+        if isinstance(fn, StepResult):
+            self.step_results.append(fn)
+            return fn
 
+        if self.budget is not None and (self.budget.truncated or self.budget.expired):
+            # Sequential (fallback) steps come last in priority
+            self.budget.exceeded(self.budget.reason or "deadline", "steps")
+            sr = _cut_off(step, "skipped")
+        else:
+            task = asyncio.ensure_future(self._execute(step, fn))
+            cut = await within_deadline([task], self.budget, DEADLINE_GRACE_S)
+            sr = _cut_off(step, "cancelled") if cut else task.result()
+        self.step_results.append(sr)
+        return sr
+
+    async def _execute(self, step: PlanStep, fn: ToolFn) -> StepResult:
+        with span("step", tool=step.tool) as s:
+            sr = await self._run_tool(step, fn)
+            s.set(ok=sr.ok, events_found=sr.events_found)
+        return sr
+
+    async def _run_tool(self, step: PlanStep, fn: ToolFn) -> StepResult:
         start = time.perf_counter()
 
-        try:
-            duration_ms = int((time.perf_counter() - start) * 1000)
+        notes = None
+        events_found = None
 
+        try:
             if step.tool.startswith("fetch_"):
                 page: FetchResult = await fn()
                 self.pages.append(page)
                 self.sources.add(page.source)
 
-                events_found = None
-
             elif step.tool == "extract_events":
                 extracted: EventList = []
 
@@ -54,10 +110,22 @@ class Executor:
                 self.events.extend(extracted)
                 events_found = len(extracted)
 
-            elif step.tool in ("dedupe_events", "validate_events"):
+            elif step.tool == "dedupe_events":
                 self.events = await fn(self.events)
                 events_found = len(self.events)
 
+            elif step.tool == "validate_events":
+                report = await fn(self.events, self.criteria, self.window)
+                self.events = report.events
+                events_found = len(self.events)
+                notes = report.notes()
+
+            elif step.tool == "websearch_events":
+                found = await fn(self.window)
+                self.events.extend(found)
+                self.sources.add("websearch")
+                events_found = len(found)
+
             duration_ms = int((time.perf_counter() - start) * 1000)
 
             sr = StepResult(
@@ -65,6 +133,7 @@ class Executor:
                 ok=True,
                 events_found=events_found,
                 duration_ms=duration_ms,
+                notes=notes,
             )
 
         except Exception as e:
@@ -72,21 +141,153 @@ class Executor:
                 tool=step.tool,
                 ok=False,
                 errors=1,
+                duration_ms=int((time.perf_counter() - start) * 1000),
                 notes=str(e),
             )
 
-        self.step_results.append(sr)
         return sr
 
     async def run_plan(self, plan: Plan) -> ExecutionSummary:
-        for step in plan.steps:
-            await self.run_step(step)
+        """
+        Run a plan as a dependency graph instead of a flat sequence:
+
+        - every fetch_* step starts immediately (bounded by max_concurrency);
+        - extract_events runs on each page as soon as its fetch returns;
+        - dedupe_events / validate_events run in plan order once all
+          extraction has finished;
+        - any other step runs alongside the fetchers.
+
+        Step results are recorded in plan order.
+        """
+        self.criteria = plan.success_criteria
+        sem = asyncio.Semaphore(self.max_concurrency)
+        # Set from the plan below, before any fetch has started
+        extract_fn: ToolFn | None = None
+
+        results: Dict[int, StepResult] = {}
+        extract_tasks: List[asyncio.Task] = []
+        extract_errors: List[str] = []
+        extracted: List[Event] = []
+        extract_start: float | None = None
+
+        async def extract_page(page: FetchResult) -> None:
+            nonlocal extract_start
+            with span("page", url=page.url, source=page.source) as s:
+                queued = time.perf_counter()
+                async with sem:
+                    s.set(queue_wait_ms=(time.perf_counter() - queued) * 1000)
+                    if extract_start is None:
+                        extract_start = time.perf_counter()
+                    try:
+                        batch = await extract_fn(page)
+                    except Exception as e:
+                        s.error = f"{type(e).__name__}: {e}"
+                        extract_errors.append(f"{page.source}: {e}")
+                        return
+                s.set(events_found=len(batch.events or []))
+            extracted.extend(batch.events or [])
+
+        async def fetch(idx: int, step: PlanStep, fn: ToolFn) -> None:
+            start = time.perf_counter()
+            with span("step", tool=step.tool) as s:
+                async with sem:
+                    s.set(queue_wait_ms=(time.perf_counter() - start) * 1000)
+                    try:
+                        page: FetchResult = await fn()
+                    except Exception as e:
+                        s.set(ok=False)
+                        s.error = f"{type(e).__name__}: {e}"
+                        results[idx] = StepResult(
+                            tool=step.tool,
+                            ok=False,
+                            errors=1,
+                            duration_ms=int((time.perf_counter() - start) * 1000),
+                            notes=str(e),
+                        )
+                        return
+                s.set(ok=True, bytes=len(page.html or ""))
+
+            self.pages.append(page)
+            self.sources.add(page.source)
+            results[idx] = StepResult(
+                tool=step.tool,
+                ok=True,
+                duration_ms=int((time.perf_counter() - start) * 1000),
+            )
+            if extract_fn is not None:
+                extract_tasks.append(asyncio.create_task(extract_page(page)))
+
+        async def independent(idx: int, step: PlanStep, fn: ToolFn) -> None:
+            async with sem:
+                results[idx] = await self._execute(step, fn)
 
+        stage: List[Awaitable[None]] = []
+        stage_steps: List[tuple[int, PlanStep]] = []
+        post: List[tuple[int, PlanStep, ToolFn]] = []
+        extract_idx = None
+
+        for idx, step in enumerate(plan.steps):
+            if step.tool == "stop":
+                continue
+
+            fn = self._resolve(step)
+            if isinstance(fn, StepResult):
+                results[idx] = fn
+            elif step.tool.startswith("fetch_"):
+                stage.append(fetch(idx, step, fn))
+                stage_steps.append((idx, step))
+            elif step.tool == "extract_events":
+                if extract_idx is None:
+                    extract_idx, extract_fn = idx, fn
+            elif step.tool in ("dedupe_events", "validate_events"):
+                post.append((idx, step, fn))
+            else:
+                stage.append(independent(idx, step, fn))
+                stage_steps.append((idx, step))
+
+        # Past the run budget's deadline, unfinished fetches, extractions and
+        # tools are cancelled and the run goes on with what it has
+        await within_deadline(stage, self.budget, DEADLINE_GRACE_S)
+        for idx, step in stage_steps:
+            results.setdefault(idx, _cut_off(step, "cancelled"))
+        # Extraction tasks are spawned by fetchers, so they only exist once
+        # every fetch has returned.
+        cut = await within_deadline(extract_tasks, self.budget, DEADLINE_GRACE_S)
+
+        if extract_idx is not None:
+            elapsed = time.perf_counter() - extract_start if extract_start else 0
+            self.events.extend(extracted)
+            notes = extract_errors[:]
+            if cut:
+                notes.append(f"{len(cut)} pages cut off by the run budget")
+            results[extract_idx] = StepResult(
+                tool="extract_events",
+                ok=len(extract_errors) < max(1, len(extract_tasks)),
+                events_found=len(extracted),
+                errors=len(extract_errors),
+                duration_ms=int(elapsed * 1000),
+                notes="; ".join(notes) or None,
+            )
+
+        for idx, step, fn in post:
+            results[idx] = await self._execute(step, fn)
+
+        self.step_results.extend(results[i] for i in sorted(results))
         return self.summary()
 
     def summary(self) -> ExecutionSummary:
+        budget = self.budget
         return ExecutionSummary(
             total_events=len(self.events),
             sources_used=sorted(self.sources),
-            erros=sum(1 for r in self.step_results if not r.ok),
+            # steps cut off by the budget are reported as truncation instead
+            errors=sum(1 for r in self.step_results if not r.ok and r.errors),
+            truncated=budget is not None and budget.truncated,
+            truncated_reason=budget.describe() if budget is not None else None,
         )
+
+
+def _cut_off(step: PlanStep, how: str) -> StepResult:
+    return StepResult(
+        tool=step.tool, ok=False, errors=0, notes=f"{how} by the run budget"
+    )
@@ -1,25 +1,75 @@
+import asyncio
 import json
+import logging
 from pdb import run
+from .plan_cache import PlanCache
 from .planner import Planner
-from ..llm import LLM
+from ..cache import get_response_cache
+from ..llm import DEFAULT_PROVIDER, LLM
+from ..retrieval.event_index import EventIndex
+from ..schemas import SuccessCriteria
 from ..tools.calendar import current_weekend
+from ..tools.validation import validate
+from ..tools.registry import (
+    TOOLS,
+    extractor_built,
+    get_extractor,
+    set_extractor_provider,
+)
+from ..tracing import get_tracer
 from .runner import run_agent
 from pprint import pprint
 
+logger = logging.getLogger(__name__)
+
 
 class Orchestrator:
-    def __init__(self, model: str = "llama3.1:8b-instruct"):
-        self.llm = LLM(provider="ollama", model=model)
-        self.planner = Planner(self.llm)
+    def __init__(
+        self,
+        model: str = "llama3.1:8b-instruct",
+        skip_planner: bool = False,
+        provider: str = DEFAULT_PROVIDER,
+    ):
+        self.cache = get_response_cache()
+        self.llm = LLM(provider=provider, model=model, cache=self.cache)
+        set_extractor_provider(provider)
+        self.planner = Planner(
+            self.llm, tools=TOOLS, cache=PlanCache(), use_llm=not skip_planner
+        )
+        self.index: EventIndex | None = None
+
+    def focus_events(self, events, focus: str):
+        """
+        Rank events by semantic similarity to `focus` (no LLM pass).
+        Embedding is blocking; async callers run this in a thread.
+        """
+        if not focus or not events:
+            return events
+        try:
+            if self.index is None:
+                self.index = EventIndex()
+            embedded = self.index.upsert(events)
+            print(f"[index] {embedded} new/changed events embedded")
+            return self.index.rank(events, focus)
+        except Exception:
+            logger.exception("Semantic focus unavailable, returning all events")
+            return events
 
-    async def weekend_run(self, focus: str, mode: str = "serp"):
+    async def weekend_run(self, focus: str, mode: str = "serp", budget=None):
         fri, sun = current_weekend()
         weekend_range = f"{fri.date()} to {sun.date()}"
         user_request = f"Eventos de {fri.date()} a {sun.date()} em São Paulo;"
+        # The extractor is shared across runs; report this run's cascade only
+        cascade_start = get_extractor().cascade_counts() if extractor_built() else None
 
         events, step_results, summary = await run_agent(
-            user_request, planner=self.planner
+            user_request,
+            planner=self.planner,
+            window=(fri, sun),
+            mode=mode,
+            budget=budget,
         )
+        events = await asyncio.to_thread(self.focus_events, events, focus)
 
         print(
             "\n============================== EVENTS ================================="
@@ -27,3 +77,59 @@ class Orchestrator:
         for i, e in enumerate(events, start=1):
             print(f"\nEvent #{i}")
             pprint(e.model_dump())
+
+        print(f"\nLLM cache: {self.cache.stats()}")
+        if extractor_built():
+            stats = get_extractor().stats
+            print(
+                f"Incremental extraction: {stats} "
+                f"({stats['chunks_reused']} LLM calls saved)"
+            )
+            cascade = get_extractor().cascade_report(since=cascade_start)
+            print(f"Extraction cascade: {cascade}")
+        if summary.truncated:
+            print(f"Partial results: {summary.truncated_reason}")
+        trace = get_tracer().export()
+        print(f"Trace: {trace} (metrics: {trace.parent / 'metrics.prom'})")
+
+        return [e.model_dump() for e in events]
+
+    async def batch_run(self, foci, weekends, mode: str = "serp", budget=None):
+        """
+        Answer every (focus, weekend) pair from one plan/fetch/extract pass.
+
+        The pipeline runs once over the span covering all `weekends`; the
+        shared pool is then re-validated per weekend and ranked per focus.
+        Yields one result dict per query.
+        """
+        start = min(fri for fri, _ in weekends)
+        end = max(sun for _, sun in weekends)
+        user_request = f"Eventos de {start.date()} a {end.date()} em São Paulo;"
+
+        pool, step_results, summary = await run_agent(
+            user_request,
+            planner=self.planner,
+            window=(start, end),
+            mode=mode,
+            budget=budget,
+        )
+
+        criteria = SuccessCriteria()
+        for fri, sun in weekends:
+            report = validate(
+                [e.model_copy() for e in pool], criteria=criteria, window=(fri, sun)
+            )
+            for focus in foci:
+                events = await asyncio.to_thread(
+                    self.focus_events, report.events, focus
+                )
+                yield {
+                    "focus": focus,
+                    "weekend_start": fri.date().isoformat(),
+                    "weekend_end": sun.date().isoformat(),
+                    "events": [e.model_dump() for e in events],
+                    "truncated": summary.truncated,
+                }
+
+        print(f"\nLLM cache: {self.cache.stats()}")
+        get_tracer().export()
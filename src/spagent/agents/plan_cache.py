@@ -0,0 +1,63 @@
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..schemas import Plan
+
+DEFAULT_PLAN_CACHE_PATH = "data/plan_cache.json"
+
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def normalize_request(request: str) -> str:
+    """Casefold, strip accents/punctuation noise and replace ISO dates."""
+    text = unicodedata.normalize("NFKD", request)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = DATE_RE.sub("<date>", text.casefold())
+    text = re.sub(r"[^\w<>]+", " ", text)
+    return " ".join(text.split())
+
+
+class PlanCache:
+    """
+    Validated plans keyed by the normalized request and the available tools.
+
+    Dates are templated out of both the key and the stored plan, so the plan
+    cached for last weekend's request is reused (with this weekend's dates)
+    for this weekend's.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_PLAN_CACHE_PATH):
+        self.path = Path(path)
+        self._plans = (
+            json.loads(self.path.read_text(encoding="utf-8"))
+            if self.path.exists()
+            else {}
+        )
+
+    @staticmethod
+    def key(request: str, tools: Iterable[str]) -> str:
+        raw = normalize_request(request) + "|" + ",".join(sorted(tools))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, request: str, tools: Iterable[str]) -> Optional[Plan]:
+        template = self._plans.get(self.key(request, tools))
+        if template is None:
+            return None
+        for i, date in enumerate(DATE_RE.findall(request)):
+            template = template.replace(f"<date{i}>", date)
+        return Plan.model_validate_json(template)
+
+    def put(self, request: str, tools: Iterable[str], plan: Plan) -> None:
+        template = plan.model_dump_json()
+        for i, date in enumerate(DATE_RE.findall(request)):
+            template = template.replace(date, f"<date{i}>")
+        self._plans[self.key(request, tools)] = template
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(self._plans, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
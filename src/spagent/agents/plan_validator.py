@@ -0,0 +1,137 @@
+from typing import Iterable, List, Tuple
+
+from ..schemas import FallbackPlan, Plan, PlanStep, SuccessCriteria
+
+EXTRACT = "extract_events"
+POST_EXTRACT = ("dedupe_events", "validate_events")
+
+
+def _is_fetch(tool: str) -> bool:
+    return tool.startswith("fetch_")
+
+
+def _step(tool: str, description: str) -> PlanStep:
+    return PlanStep(tool=tool, description=description, params={})
+
+
+def _clean_steps(
+    steps: List[PlanStep], available: set, repairs: List[str], where: str
+) -> List[PlanStep]:
+    """Drop unregistered/duplicate steps and clear params."""
+    cleaned: List[PlanStep] = []
+    seen = set()
+    for step in steps:
+        if step.tool == "stop":
+            continue
+        if step.tool not in available:
+            repairs.append(f"{where}: dropped unregistered tool {step.tool}")
+            continue
+        if step.tool in seen:
+            repairs.append(f"{where}: dropped duplicate {step.tool}")
+            continue
+        if step.params:
+            repairs.append(f"{where}: cleared params of {step.tool}")
+            step = step.model_copy(update={"params": {}})
+        seen.add(step.tool)
+        cleaned.append(step)
+    return cleaned
+
+
+def validate_plan(plan: Plan, tools: Iterable[str]) -> Tuple[Plan, List[str]]:
+    """
+    Enforce the pipeline rules from the planner's SYSTEM prompt locally and
+    repair violations deterministically.
+
+    Returns the repaired plan and a list of human-readable repairs (empty
+    when the plan was already valid).
+    """
+    available = set(tools)
+    repairs: List[str] = []
+    steps = _clean_steps(plan.steps, available, repairs, "steps")
+
+    fetches = [s for s in steps if _is_fetch(s.tool)]
+    by_tool = {s.tool: s for s in steps}
+    others = [
+        s
+        for s in steps
+        if not _is_fetch(s.tool) and s.tool != EXTRACT and s.tool not in POST_EXTRACT
+    ]
+
+    # At least two different fetchers unless fewer are registered
+    registered_fetches = sorted(t for t in available if _is_fetch(t))
+    for tool in registered_fetches:
+        if len(fetches) >= 2:
+            break
+        if tool not in by_tool:
+            repairs.append(f"steps: added {tool} (need two fetchers)")
+            fetches.append(_step(tool, f"Collect events with {tool}"))
+
+    ordered = list(fetches)
+    if fetches and EXTRACT in available:
+        if EXTRACT not in by_tool:
+            repairs.append("steps: added extract_events after fetchers")
+        ordered.append(
+            by_tool.get(EXTRACT)
+            or _step(EXTRACT, "Extract events from the fetched resources")
+        )
+    elif EXTRACT in by_tool:
+        repairs.append("steps: dropped extract_events (nothing fetched)")
+
+    has_extract = any(s.tool == EXTRACT for s in ordered)
+    for tool in POST_EXTRACT:
+        if tool not in by_tool:
+            continue
+        if has_extract:
+            ordered.append(by_tool[tool])
+        else:
+            repairs.append(f"steps: dropped {tool} (no extract_events)")
+
+    # websearch and friends go after the dedicated pipeline
+    ordered.extend(others)
+
+    kept = {s.tool for s in ordered}
+    if [s.tool for s in ordered if s.tool in by_tool] != [
+        s.tool for s in steps if s.tool in kept
+    ]:
+        repairs.append("steps: reordered to fetch -> extract -> dedupe -> validate")
+
+    fallback = plan.fallback
+    if fallback is not None:
+        fb_steps = _clean_steps(fallback.steps, available, repairs, "fallback")
+        fallback = (
+            FallbackPlan(trigger=fallback.trigger, steps=fb_steps) if fb_steps else None
+        )
+
+    repaired = plan.model_copy(update={"steps": ordered, "fallback": fallback})
+    return repaired, repairs
+
+
+def default_plan(goal: str, tools: Iterable[str]) -> Plan:
+    """Deterministic plan used when the LLM planner is skipped or fails."""
+    available = set(tools)
+    steps = [
+        _step(tool, f"Collect events with {tool}")
+        for tool in sorted(t for t in available if _is_fetch(t))
+    ]
+    if steps and EXTRACT in available:
+        steps.append(_step(EXTRACT, "Extract events from the fetched resources"))
+        steps += [
+            _step(tool, tool.replace("_", " ").capitalize())
+            for tool in POST_EXTRACT
+            if tool in available
+        ]
+
+    fallback = None
+    if "websearch_events" in available:
+        fallback = FallbackPlan(
+            trigger="If total_events < min_events",
+            steps=[_step("websearch_events", "Fallback discovery")],
+        )
+
+    return Plan(
+        goal=goal,
+        strategy="Use dedicated fetch and extraction first and validate results.",
+        steps=steps,
+        success_criteria=SuccessCriteria(),
+        fallback=fallback,
+    )
@@ -1,5 +1,11 @@
+import logging
+from typing import Iterable, Optional
+
 from spagent.schemas import Plan
 from ..llm import LLM
+from .plan_cache import PlanCache
+from .plan_validator import default_plan, validate_plan
+from ..tracing import span
 
 SYSTEM = """You are a Planning Agent.
 
@@ -96,16 +102,58 @@ Example of a VALID response:
 """
 
 
+logger = logging.getLogger(__name__)
+
+
 class Planner:
-    def __init__(self, llm: LLM):
+    def __init__(
+        self,
+        llm: LLM,
+        tools: Iterable[str] = (),
+        cache: Optional[PlanCache] = None,
+        use_llm: bool = True,
+    ):
         self.llm = llm
+        self.tools = sorted(tools)
+        self.cache = cache
+        # False skips the LLM entirely and always uses the default plan
+        self.use_llm = use_llm
 
     async def plan(self, user_goal: str) -> Plan:
-        plan = await self.llm.json(
-            system=SYSTEM,
-            user=user_goal,
-            schema=Plan,
-            max_retries=2,
-        )
-
+        with span("plan") as s:
+            plan, source = await self._plan(user_goal)
+            s.set(source=source, steps=len(plan.steps))
         return plan
+
+    async def _plan(self, user_goal: str) -> tuple[Plan, str]:
+        if self.cache:
+            cached = self.cache.get(user_goal, self.tools)
+            if cached is not None:
+                print("[planner] using cached plan")
+                return cached, "cache"
+
+        if not self.use_llm:
+            return default_plan(user_goal, self.tools), "default"
+
+        try:
+            # Rule violations are repaired locally, so a single generation
+            # is enough; only unparseable output falls back to the default.
+            plan = await self.llm.json(
+                system=SYSTEM,
+                user=user_goal,
+                schema=Plan,
+                max_retries=0,
+            )
+        except Exception:
+            logger.exception("Planner LLM failed, using default plan")
+            return default_plan(user_goal, self.tools), "default"
+
+        if self.tools:
+            plan, repairs = validate_plan(plan, self.tools)
+            for repair in repairs:
+                print(f"[planner] repaired: {repair}")
+
+        if self.cache:
+            self.cache.put(user_goal, self.tools, plan)
+
+        return plan, "llm"
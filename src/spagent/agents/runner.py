@@ -1,14 +1,77 @@
 from .planner import Planner
-from .executor import Executor
+from .executor import DEFAULT_MAX_CONCURRENCY, Executor
+from ..budget import Budget, use_budget
+from ..schemas import FallbackPlan, Plan, PlanStep
 from ..tools.registry import TOOLS
+from ..tracing import span
 
 
-async def run_agent(user_request: str, planner: Planner):
+def with_websearch(plan: Plan) -> Plan:
+    """
+    SERP mode: web search runs alongside the fetchers (its events still go
+    through dedupe/validate) instead of only as a fallback.
+    """
+    if any(s.tool == "websearch_events" for s in plan.steps):
+        return plan
+    search = PlanStep(tool="websearch_events", description="Web search results")
+    post = next(
+        (
+            i
+            for i, s in enumerate(plan.steps)
+            if s.tool in ("dedupe_events", "validate_events")
+        ),
+        len(plan.steps),
+    )
+    fallback = plan.fallback
+    if fallback is not None:
+        steps = [s for s in fallback.steps if s.tool != "websearch_events"]
+        fallback = (
+            FallbackPlan(trigger=fallback.trigger, steps=steps) if steps else None
+        )
+    return plan.model_copy(
+        update={
+            "steps": plan.steps[:post] + [search] + plan.steps[post:],
+            "fallback": fallback,
+        }
+    )
+
+
+async def run_agent(
+    user_request: str,
+    planner: Planner,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    window=None,
+    mode: str = "crawl",
+    budget: Budget | None = None,
+):
+    """
+    Plan and execute `user_request`. With a `budget` (by default from the
+    RUN_* environment variables) the run stops at its limits and returns
+    the events gathered so far, with `summary.truncated` set.
+    """
+    budget = budget if budget is not None else Budget.from_env()
+    with use_budget(budget), span("run", request=user_request, mode=mode) as s:
+        events, step_results, summary = await _run(
+            user_request, planner, max_concurrency, window, mode, budget
+        )
+        s.set(
+            total_events=summary.total_events,
+            errors=summary.errors,
+            truncated=summary.truncated,
+        )
+    return events, step_results, summary
+
+
+async def _run(user_request, planner, max_concurrency, window, mode, budget):
     plan = await planner.plan(user_request)
+    if mode == "serp" and "websearch_events" in TOOLS:
+        plan = with_websearch(plan)
     print("\n================================ PLAN ===================================")
     print(plan)
 
-    executor = Executor(tools=TOOLS)
+    executor = Executor(
+        tools=TOOLS, max_concurrency=max_concurrency, window=window, budget=budget
+    )
 
     summary = await executor.run_plan(plan)
 
@@ -0,0 +1,201 @@
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+# Defaults for scheduled runs; unset means unbounded
+ENV_DEADLINE = "RUN_DEADLINE_S"
+ENV_MAX_LLM_CALLS = "RUN_MAX_LLM_CALLS"
+ENV_MAX_INPUT_TOKENS = "RUN_MAX_INPUT_TOKENS"
+
+_current: contextvars.ContextVar[Optional["Budget"]] = contextvars.ContextVar(
+    "spagent_budget", default=None
+)
+# Input tokens of a call whose charge waits for a cache/replay miss; a list,
+# so a lookup running in a copied context can still consume it
+_pending: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "spagent_pending_charge", default=None
+)
+
+
+class BudgetExceeded(RuntimeError):
+    """Work skipped or cut off because the run budget is spent."""
+
+
+class Budget:
+    """
+    Limits for one agent run: a wall-clock deadline, a number of LLM calls
+    and an estimate of the input tokens sent to the models.
+
+    The clock starts when the run does (`use_budget`). Each LLM call is
+    charged once it has a model slot, so queued work is what gets skipped;
+    the first limit hit marks the run as truncated.
+    """
+
+    def __init__(
+        self,
+        deadline_s: float | None = None,
+        max_llm_calls: int | None = None,
+        max_input_tokens: int | None = None,
+    ):
+        self.deadline_s = deadline_s
+        self.max_llm_calls = max_llm_calls
+        self.max_input_tokens = max_input_tokens
+        self.started: float | None = None
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.reason: str | None = None
+        self.skipped: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "Budget | None":
+        def read(name: str, cast):
+            value = os.getenv(name)
+            return cast(value) if value else None
+
+        budget = cls(
+            deadline_s=read(ENV_DEADLINE, float),
+            max_llm_calls=read(ENV_MAX_LLM_CALLS, int),
+            max_input_tokens=read(ENV_MAX_INPUT_TOKENS, int),
+        )
+        return budget if budget.limited else None
+
+    @property
+    def limited(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.deadline_s, self.max_llm_calls, self.max_input_tokens)
+        )
+
+    def start(self) -> None:
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def remaining_s(self) -> float | None:
+        """Seconds to the deadline (never negative), or None without one."""
+        if self.deadline_s is None:
+            return None
+        elapsed = time.monotonic() - (self.started or time.monotonic())
+        return max(0.0, self.deadline_s - elapsed)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining_s() == 0.0
+
+    @property
+    def truncated(self) -> bool:
+        return self.reason is not None
+
+    def exceeded(self, reason: str, what: str | None = None) -> BudgetExceeded:
+        """Record that `what` was skipped because of `reason`."""
+        self.reason = self.reason or reason
+        if what:
+            self.skipped[what] = self.skipped.get(what, 0) + 1
+        return BudgetExceeded(f"run budget exceeded: {reason}")
+
+    def charge_llm_call(self, input_tokens: int) -> None:
+        """Account for one LLM call, or raise BudgetExceeded to skip it."""
+        if self.expired:
+            raise self.exceeded("deadline", "llm_calls")
+        if self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls:
+            raise self.exceeded("max_llm_calls", "llm_calls")
+        if (
+            self.max_input_tokens is not None
+            and self.input_tokens + input_tokens > self.max_input_tokens
+        ):
+            raise self.exceeded("max_input_tokens", "llm_calls")
+        self.llm_calls += 1
+        self.input_tokens += input_tokens
+
+    def describe(self) -> str | None:
+        if self.reason is None:
+            return None
+        skipped = ", ".join(f"{n} {what}" for what, n in sorted(self.skipped.items()))
+        note = f"truncated by budget ({self.reason})"
+        return f"{note}; skipped {skipped}" if skipped else note
+
+
+def current_budget() -> Optional[Budget]:
+    return _current.get()
+
+
+@contextmanager
+def use_budget(budget: Budget | None) -> Iterator[Budget | None]:
+    """Make `budget` the one LLM calls in this context are charged to."""
+    if budget is not None:
+        budget.start()
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+@asynccontextmanager
+async def llm_call(
+    input_tokens: int, bound: bool = True, on_miss: bool = False
+) -> AsyncIterator[None]:
+    """
+    Charge one LLM call to the current budget, if any, and cut it off at
+    the deadline (raising BudgetExceeded either way).
+
+    With `on_miss=True` the charge is left to the model's response cache or
+    replay store, which call `charge_miss` only when the answer has to be
+    generated. Streams pass `bound=False`: a timeout can't be scoped to the
+    inside of an async generator, so they are left to the executor's deadline.
+    """
+    budget = _current.get()
+    if budget is None:
+        yield
+        return
+    if on_miss:
+        token = _pending.set([input_tokens])
+    else:
+        token = None
+        budget.charge_llm_call(input_tokens)
+    try:
+        if not bound:
+            yield
+            return
+        try:
+            async with asyncio.timeout(budget.remaining_s()) as cm:
+                yield
+        except TimeoutError:
+            if cm.expired():
+                raise budget.exceeded("deadline", "llm_calls")
+            raise
+    finally:
+        if token is not None:
+            _pending.reset(token)
+
+
+def charge_miss() -> None:
+    """Charge the call deferred by `llm_call(on_miss=True)`, at most once."""
+    pending = _pending.get()
+    budget = _current.get()
+    if pending and budget is not None:
+        budget.charge_llm_call(pending.pop())
+
+
+async def within_deadline(
+    aws, budget: Budget | None, grace_s: float = 0.0
+) -> List[asyncio.Task]:
+    """
+    Await `aws` concurrently, cancelling whatever is still running
+    `grace_s` after the budget's deadline. Returns the cancelled tasks.
+    """
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    if not tasks:
+        return []
+    remaining = budget.remaining_s() if budget is not None else None
+    done, pending = await asyncio.wait(
+        tasks, timeout=None if remaining is None else remaining + grace_s
+    )
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        budget.exceeded("deadline")
+    return [t for t in tasks if t in pending]
@@ -0,0 +1,56 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..schemas import Event
+
+DEFAULT_CHUNK_STORE_PATH = "data/chunk_store"
+
+
+def fingerprint(chunk: str, salt: str = "") -> str:
+    """
+    Key of a chunk's stored events. `salt` names whatever else produced
+    them (prompt version, models), so changing it re-extracts every chunk.
+    """
+    return hashlib.sha256(f"{salt}\x00{chunk}".encode("utf-8")).hexdigest()
+
+
+class ChunkStore:
+    """
+    Remembers, per source URL, which events each chunk produced last run.
+
+    Only the chunks seen on the latest run of a URL are kept, so the store
+    stays proportional to the current page size.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CHUNK_STORE_PATH):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, url: str) -> Path:
+        return self.path / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def load(self, url: str) -> Dict[str, List[Event]]:
+        file = self._file(url)
+        if not file.exists():
+            return {}
+        data = json.loads(file.read_text(encoding="utf-8"))
+        return {
+            fp: [Event.model_validate(e) for e in events]
+            for fp, events in data.get("chunks", {}).items()
+        }
+
+    def save(self, url: str, chunks: Dict[str, Optional[List[Event]]]) -> None:
+        """Persist the chunks of the latest run; failed chunks (None) are skipped."""
+        data = {
+            "url": url,
+            "chunks": {
+                fp: [e.model_dump() for e in events]
+                for fp, events in chunks.items()
+                if events is not None
+            },
+        }
+        self._file(url).write_text(
+            json.dumps(data, ensure_ascii=False), encoding="utf-8"
+        )
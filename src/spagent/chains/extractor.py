@@ -1,16 +1,33 @@
+import asyncio
 import json
 import logging
-from pathlib import Path
-from typing import List
+import re
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_ollama import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
 
-from spagent.utils import normalize_llm_json
+from spagent.budget import BudgetExceeded
+from spagent.cache import ResponseCache
+from spagent.llm import DEFAULT_PROVIDER, LLM
+from spagent.chains.chunk_store import ChunkStore, fingerprint
+from spagent.snapshots import SnapshotStore
+from spagent.tools.chunker import DEFAULT_CHUNK_TOKENS, chunk_html, estimate_tokens
+from spagent.tools.compact import compact_html, minify_html, reduction
+from spagent.tools.dedupe import fold
+from spagent.tools.validation import parse_date
+from spagent.tracing import current_span, span
+from spagent.utils import IncrementalArrayParser, parse_model
 
 from ..schemas import Event, EventList, FetchResult
 
+# Bump when EXTRACTOR_PROMPT changes, so stored chunk results are not reused
+PROMPT_VERSION = 1
+
 EXTRACTOR_PROMPT = ChatPromptTemplate.from_messages(
     [
         (
@@ -19,7 +36,9 @@ EXTRACTOR_PROMPT = ChatPromptTemplate.from_messages(
 You are an information extraction agent.
 
 Your task:
-- Extract all real cultural events from the given HTML.
+- Extract all real cultural events from the given page.
+- The page is compact text: "#" lines are headings, "- " lines are list
+  items, [text](url) are links and dates may follow in parentheses.
 - Ignore navigation, ads, news, unrelated content.
 - Do NOT hallucinate missing data.
 - If no events exist, return an empty list.
@@ -56,7 +75,7 @@ IMPORTANT:
 {format_instructions}
 """,
         ),
-        ("human", "SOURCE: {source}\nURL: {url}\n\nHTML:\n{html}"),
+        ("human", "SOURCE: {source}\nURL: {url}\n\nPAGE:\n{html}"),
     ]
 )
 
@@ -64,69 +83,389 @@ IMPORTANT:
 logger = logging.getLogger(__name__)
 
 
-class ExtractorChain:
-    def __init__(self, model: str = "phi3:mini"):
-        self.llm = ChatOllama(model=model, temperature=0)
+# Date, time and price tokens ("10/01", "10 de janeiro", "20h30", "R$ 40",
+# "grátis"): a chunk dense with them but yielding few events goes to the
+# escalation model
+SIGNAL_RE = re.compile(
+    r"\b\d{1,2}/\d{1,2}\b"
+    r"|\b\d{1,2} de (?:jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)"
+    r"|\b\d{1,2}h(?:\d{2})?\b"
+    r"|R\$\s?\d"
+    r"|\bgr[aá]tis\b",
+    re.IGNORECASE,
+)
+SIGNALS_PER_EVENT = 4
+MIN_SIGNALS = 4
+
 
+def _valid(e: Event) -> bool:
+    """A title, and a `starts_at` that is a date if there is one."""
+    return bool(e.title) and not (e.starts_at and not parse_date(e.starts_at))
+
+
+class ExtractorChain:
+    def __init__(
+        self,
+        model: str = "phi3:mini",
+        max_concurrency: int = 4,
+        chunk_timeout: float | None = 120.0,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        cache: ResponseCache | None = None,
+        chunk_store: ChunkStore | None = None,
+        snapshots: SnapshotStore | None = None,
+        stream: bool = False,
+        provider: str = DEFAULT_PROVIDER,
+        escalate_to: str | None = None,
+    ):
         self.parser = PydanticOutputParser(pydantic_object=EventList)
+        self.cache = cache
+        # Cascade: chunks whose answer looks wrong or incomplete (see
+        # `_escalation_reason`) are re-run on the larger `escalate_to` model
+        self.escalation = (
+            ExtractorChain(
+                model=escalate_to,
+                chunk_timeout=chunk_timeout,
+                cache=cache,
+                stream=stream,
+                provider=provider,
+            )
+            if escalate_to
+            else None
+        )
+        self.escalated: Dict[str, int] = {}
+        self.use_provider(provider, model)
 
-        self.chain = EXTRACTOR_PROMPT | self.llm | self.parser
+        # Number of chunk requests allowed in flight at once (1 = sequential)
+        self.max_concurrency = max(1, max_concurrency)
+        self.chunk_timeout = chunk_timeout
+        self.chunk_tokens = chunk_tokens
 
-    async def extract(self, page: FetchResult) -> EventList:
-        batch_size = 3000
+        # Unchanged chunks reuse the events extracted on a previous run
+        self.chunk_store = chunk_store
+        # Pages are snapshotted for replay/diffing off the event loop, while
+        # their chunks are being extracted
+        self.snapshots = snapshots
 
-        html = page.html or ""
-        print("HTML len = ", len(html))
+        # Parse events while the model is still generating and stop it as
+        # soon as the events array closes
+        self.stream = stream
+        self.stats = {
+            "chunks": 0,
+            "chunks_reused": 0,
+            "llm_calls": 0,
+            "tokens_raw": 0,
+            "tokens_sent": 0,
+        }
+
+    def use_provider(self, provider: str, model: str | None = None) -> None:
+        """Swap the chat model, e.g. to "replay" recorded responses."""
+        # Identical (prompt, chunk) pairs are served from the response cache;
+        # generations share the process-wide per-model concurrency limit
+        self.llm = LLM(
+            provider=provider,
+            model=model or self.llm.model,
+            cache=self.cache,
+            temperature=0,
+        )
+        self.chain = (
+            EXTRACTOR_PROMPT | self.llm.as_runnable() | RunnableLambda(self._parse)
+        )
+        if self.escalation is not None and self.escalation.llm.provider != provider:
+            self.escalation.use_provider(provider)
+
+    @staticmethod
+    def _parse(message: AIMessage) -> EventList:
+        """Keep every valid event from damaged or truncated output."""
+        result, dropped = parse_model(message.content, EventList)
+        if dropped:
+            if (s := current_span()) is not None:
+                s.add("json_dropped", len(dropped))
+            logger.warning("Salvaged extraction JSON, dropped: %s", "; ".join(dropped))
+        return result
+
+    def _inputs(self, page: FetchResult, chunk: str) -> dict:
+        return {
+            "source": page.source,
+            "url": page.url,
+            "html": chunk,
+            "format_instructions": self.parser.get_format_instructions(),
+        }
+
+    async def stream_chunk(self, page: FetchResult, chunk: str) -> AsyncIterator[Event]:
+        """Yield each event as soon as its closing brace is generated."""
+        messages = EXTRACTOR_PROMPT.format_messages(**self._inputs(page, chunk))
+        parser = IncrementalArrayParser()
+
+        async with aclosing(self.llm.astream_messages(messages)) as tokens:
+            async for token in tokens:
+                for item in parser.feed(token):
+                    try:
+                        event = Event.model_validate(item)
+                    except Exception:
+                        parser.dropped += 1
+                        continue
+                    event.source_name = page.source
+                    event.source_url = page.url
+                    yield event
+                if parser.done:
+                    # Don't pay for whatever the model emits after the array
+                    break
+
+        if parser.dropped:
+            logger.warning(
+                "Dropped %s malformed events from %s", parser.dropped, page.url
+            )
+
+    async def _collect_stream(self, page: FetchResult, chunk: str) -> List[Event]:
+        return [e async for e in self.stream_chunk(page, chunk)]
+
+    async def _extract_chunk(
+        self,
+        page: FetchResult,
+        chunk: str,
+        idx: int,
+        total: int,
+        sem: asyncio.Semaphore,
+    ) -> Optional[List[Event]]:
+        """Events for one chunk, or None if the chunk failed."""
+        with span("chunk", url=page.url, idx=idx, chars=len(chunk)) as s:
+            queued = time.perf_counter()
+            async with sem:
+                s.set(queue_wait_ms=(time.perf_counter() - queued) * 1000)
+                events = await self._run_chunk(page, chunk, idx, total)
+            s.set(events_found=None if events is None else len(events))
+            if events is None:
+                s.error = "extraction failed"
+            return events
+
+    async def _ask(self, page: FetchResult, chunk: str) -> List[Event]:
+        """One extraction call for `chunk`; raises if it fails."""
+        self.stats["llm_calls"] += 1
+        if self.stream:
+            return await asyncio.wait_for(
+                self._collect_stream(page, chunk), timeout=self.chunk_timeout
+            )
+
+        result: EventList = await asyncio.wait_for(
+            self.chain.ainvoke(self._inputs(page, chunk)),
+            timeout=self.chunk_timeout,
+        )
+
+        print(
+            "=======================RAW TEXT==========================\n",
+            result,
+        )
 
-        # ===== SAVE FULL HTML FOR OFFLINE ANALYSIS =====
-        dump_dir = Path("debug_html")
-        dump_dir.mkdir(exist_ok=True)
+        events = result.events or []
 
-        safe_source = (page.source or "unknown").replace(" ", "_")
-        filename = dump_dir / f"{safe_source}.txt"
+        # Inject source metadata defensively
+        for e in events:
+            e.source_name = page.source
+            e.source_url = page.url
 
-        with open(filename, "w", encoding="utf-8", errors="ignore") as f:
-            f.write(html)
+        return events
 
-        print(f"[debug] full HTML saved to {filename.resolve()}")
-        # ===============================================
+    @staticmethod
+    def _escalation_reason(chunk: str, events: List[Event]) -> Optional[str]:
+        """Why the small model's answer for `chunk` should not be trusted."""
+        if not all(map(_valid, events)):
+            return "invalid"
+        signals = len(SIGNAL_RE.findall(chunk))
+        if signals >= MIN_SIGNALS and len(events) * SIGNALS_PER_EVENT < signals:
+            return "too_few"
+        # Titles that are not on the page, or events without any date, are
+        # the usual signs of a small model guessing
+        text = fold(chunk)
+        weak = sum(
+            1
+            for e in events
+            if fold(e.title) not in text or not (e.starts_at or e.date_text)
+        )
+        if weak * 2 > len(events):
+            return "low_confidence"
+        return None
+
+    @staticmethod
+    def _merge(chunk: str, small: List[Event], large: List[Event]) -> List[Event]:
+        """
+        The larger model's events plus valid small-model ones it missed, in
+        the order the titles appear in the chunk. Titles match by date too,
+        so recurring shows survive, unless either side has no usable date.
+        """
+        dates: Dict[str, set] = {}
+        for e in large:
+            dates.setdefault(fold(e.title), set()).add(parse_date(e.starts_at))
+
+        def missed(e: Event) -> bool:
+            seen = dates.get(fold(e.title))
+            if seen is None:
+                return True
+            day = parse_date(e.starts_at)
+            return day is not None and None not in seen and day not in seen
+
+        text = fold(chunk)
+        extra = [e for e in small if _valid(e) and fold(e.title) in text and missed(e)]
 
-        all_events: List[Event] = []
-        batches = [html[i : i + batch_size] for i in range(0, len(html), batch_size)]
+        def position(e: Event) -> int:
+            at = text.find(fold(e.title)) if e.title else -1
+            return at if at >= 0 else len(text)
 
-        for idx, chunk in enumerate(batches):
+        return sorted(large + extra, key=position)
+
+    async def _run_chunk(
+        self, page: FetchResult, chunk: str, idx: int, total: int
+    ) -> Optional[List[Event]]:
+        try:
+            print(f"Extracting batch {idx + 1} of {total} from {page.url}")
             try:
-                print(f"Extracting batch {idx + 1} of {len(batches)} from {page.url}")
-                result: EventList = await self.chain.ainvoke(
-                    {
-                        "source": page.source,
-                        "url": page.url,
-                        "html": chunk,
-                        "format_instructions": self.parser.get_format_instructions(),
-                    }
-                )
+                events = await self._ask(page, chunk)
+                reason = self.escalation and self._escalation_reason(chunk, events)
+            except (BudgetExceeded, asyncio.TimeoutError):
+                # Not escalated: a timeout would only get worse on a larger
+                # model, and a budget skip must stay a skip
+                raise
+            except Exception as e:
+                if self.escalation is None:
+                    raise
+                logger.warning("Small model failed on %s: %s", page.url, e)
+                events, reason = [], "failed"
 
+            if reason:
+                self.escalated[reason] = self.escalated.get(reason, 0) + 1
+                if (s := current_span()) is not None:
+                    s.set(escalated=reason)
                 print(
-                    "=======================RAW TEXT==========================\n",
-                    result,
+                    f"[cascade] batch {idx + 1} of {total} from {page.url}: "
+                    f"{reason}, retrying on {self.escalation.llm.model}"
                 )
+                try:
+                    larger = await self.escalation._ask(page, chunk)
+                except Exception as e:
+                    if reason == "failed":
+                        raise
+                    # keep what the small model found
+                    logger.warning("Large model failed on %s: %s", page.url, e)
+                    larger = []
+                events = self._merge(chunk, events, larger)
 
-                events = result.events or []
+            return events
+        except BudgetExceeded:
+            # Skipped, not failed: the chunk is retried on the next run
+            print(f"[budget] skipped batch {idx + 1} of {total} from {page.url}")
+            return None
+        except Exception:
+            # Don't kill the entire page if one batch fails
+            logger.exception(
+                "Extraction failed for batch %s of %s (%s)",
+                idx + 1,
+                total,
+                page.url,
+            )
+            return None
 
-                # Inject source metadata defensively
-                for e in events:
-                    e.source_name = page.source
-                    e.source_url = page.url
+    def _store_salt(self) -> str:
+        """What stored chunk results depend on besides the chunk itself."""
+        models = [self.llm.model]
+        if self.escalation is not None:
+            models.append(self.escalation.llm.model)
+        return "|".join([f"v{PROMPT_VERSION}", *models])
 
-                all_events.extend(events)
-            except Exception as e:
-                # Don't kill the entire page if one batch fails
-                logger.exception(
-                    "Extraction failed for batch %s of %s (%s)",
-                    idx + 1,
-                    len(batches),
-                    page.url,
-                )
+    def cascade_counts(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of the cascade counters, for `cascade_report(since=...)`."""
+        calls = {self.llm.model: self.stats["llm_calls"]}
+        if self.escalation is not None:
+            calls[self.escalation.llm.model] = self.escalation.stats["llm_calls"]
+        return {"calls": calls, "reasons": dict(self.escalated)}
+
+    def cascade_report(
+        self, since: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> Dict[str, object]:
+        """
+        Calls per model and how often chunks were escalated, and why. The
+        extractor lives as long as the process, so a run passes the
+        `cascade_counts()` taken when it started to report only its own.
+        """
+        now = self.cascade_counts()
+        since = since or {"calls": {}, "reasons": {}}
+        calls = {m: n - since["calls"].get(m, 0) for m, n in now["calls"].items()}
+        reasons = {
+            r: n - since["reasons"].get(r, 0)
+            for r, n in now["reasons"].items()
+            if n > since["reasons"].get(r, 0)
+        }
+        escalated = sum(reasons.values())
+        return {
+            "calls": calls,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / max(1, calls[self.llm.model]), 3),
+            "reasons": reasons,
+        }
+
+    async def extract(self, page: FetchResult) -> EventList:
+        snapshot = (
+            asyncio.create_task(self.snapshots.put(page)) if self.snapshots else None
+        )
+        try:
+            return await self._extract_page(page)
+        finally:
+            # Also when extraction fails or is cancelled (e.g. at the deadline)
+            if snapshot is not None:
+                try:
+                    await snapshot
+                except Exception:
+                    logger.exception("Could not snapshot %s", page.url)
+
+    async def _extract_page(self, page: FetchResult) -> EventList:
+        html = page.html or ""
+        print("HTML len = ", len(html))
+
+        # Chunks follow the page's DOM so event cards are not cut in half;
+        # they are cut from bare structural markup and sent as compact text
+        # (chunks with no text left, e.g. only images, are skipped)
+        chunks = chunk_html(minify_html(html), max_tokens=self.chunk_tokens)
+        batches = [text for text in map(compact_html, chunks) if text]
+
+        salt = self._store_salt()
+        fingerprints = [fingerprint(chunk, salt) for chunk in batches]
+        previous = self.chunk_store.load(page.url) if self.chunk_store else {}
+
+        sem = asyncio.Semaphore(self.max_concurrency)
+        pending = {
+            idx: self._extract_chunk(page, chunk, idx, len(batches), sem)
+            for idx, (chunk, fp) in enumerate(zip(batches, fingerprints))
+            if fp not in previous
+        }
+        # gather preserves argument order, so events come back in page order
+        fresh = dict(zip(pending, await asyncio.gather(*pending.values())))
+
+        results: List[Optional[List[Event]]] = [
+            fresh[idx] if idx in fresh else previous[fp]
+            for idx, fp in enumerate(fingerprints)
+        ]
+
+        reused = len(batches) - len(pending)
+        self.stats["chunks"] += len(batches)
+        self.stats["chunks_reused"] += reused
+        if (s := current_span()) is not None:
+            s.set(chunks=len(batches), chunks_reused=reused)
+        print(
+            f"[incremental] {page.url}: reused {reused} of {len(batches)} chunks, "
+            f"sent {len(pending)} to the LLM"
+        )
+        compact = "\n".join(batches)
+        raw_tokens, sent_tokens = estimate_tokens(html), estimate_tokens(compact)
+        self.stats["tokens_raw"] += raw_tokens
+        self.stats["tokens_sent"] += sent_tokens
+        print(
+            f"[compact] {page.url}: {raw_tokens} -> {sent_tokens} tokens "
+            f"({reduction(html, compact):.0%} fewer)"
+        )
+
+        if self.chunk_store:
+            chunks: Dict[str, Optional[List[Event]]] = dict(zip(fingerprints, results))
+            self.chunk_store.save(page.url, chunks)
+
+        all_events: List[Event] = [e for events in results for e in events or []]
         print(
             "========================ALL EVENTS==========================", all_events
         )
@@ -0,0 +1,141 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import soupsieve
+import yaml
+from bs4 import BeautifulSoup, Tag
+from pydantic import BaseModel
+
+from ..schemas import Event, FetchResult
+
+SOURCES_PATH = "config/sources.yaml"
+
+# "a::attr(href)" -> css "a", attribute "href"; "h3::text" -> css "h3", text
+PSEUDO_RE = re.compile(r"::(?:attr\((?P<attr>[\w-]+)\)|text)\s*$")
+
+
+class SelectorSpec(BaseModel):
+    item: str
+    title: str
+    date: Optional[str] = None
+    link: Optional[str] = None
+    venue: Optional[str] = None
+    price: Optional[str] = None
+
+
+class SourceConfig(BaseModel):
+    name: str
+    url: str
+    city: Optional[str] = "São Paulo"
+    type: List[str] = []
+    selectors: Optional[SelectorSpec] = None
+
+
+class FieldSelector:
+    """One compiled field selector, e.g. `a::attr(href)`."""
+
+    def __init__(self, expr: str):
+        m = PSEUDO_RE.search(expr)
+        self.attr = m.group("attr") if m else None
+        css = expr[: m.start()] if m else expr
+        self.css = soupsieve.compile(css.strip()) if css.strip() else None
+
+    def first(self, item: Tag) -> Optional[Tag]:
+        return self.css.select_one(item) if self.css else item
+
+    def value(self, item: Tag) -> Optional[str]:
+        el = self.first(item)
+        if el is None:
+            return None
+        if self.attr:
+            return el.get(self.attr)
+        text = el.get_text(" ", strip=True)
+        return text or None
+
+
+class CompiledSource:
+    def __init__(self, config: SourceConfig):
+        self.config = config
+        spec = config.selectors
+        self.item = soupsieve.compile(spec.item)
+        self.fields: Dict[str, FieldSelector] = {
+            name: FieldSelector(expr)
+            for name, expr in spec.model_dump(exclude={"item"}).items()
+            if expr
+        }
+
+    def matches(self, page: FetchResult) -> bool:
+        name = self.config.name.lower().replace("-", "_")
+        return page.url.startswith(self.config.url) or (
+            (page.source or "").lower().replace("-", "_") == name
+        )
+
+    def extract(self, page: FetchResult) -> List[Event]:
+        soup = BeautifulSoup(page.html or "", "html.parser")
+        events = []
+        for item in self.item.select(soup):
+            values = {k: f.value(item) for k, f in self.fields.items()}
+
+            starts_at = None
+            if "date" in self.fields:
+                date_el = self.fields["date"].first(item)
+                if date_el is not None:
+                    starts_at = date_el.get("datetime")
+
+            link = values.get("link")
+            events.append(
+                Event(
+                    title=values.get("title"),
+                    starts_at=starts_at,
+                    date_text=values.get("date"),
+                    venue=values.get("venue"),
+                    city=self.config.city,
+                    price=values.get("price"),
+                    link=urljoin(page.url, link) if link else None,
+                    source_name=page.source,
+                    source_url=page.url,
+                )
+            )
+        return events
+
+
+def load_sources(path: str | Path = SOURCES_PATH) -> List[SourceConfig]:
+    data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or []
+    return [SourceConfig.model_validate(entry) for entry in data]
+
+
+def is_valid(event: Event) -> bool:
+    return bool(event.title) and bool(event.starts_at or event.date_text or event.link)
+
+
+class SelectorExtractor:
+    """
+    Deterministic fast path for sources with stable markup.
+
+    Only sources that declare `selectors` in config/sources.yaml take part;
+    everything else (and any page where the selectors come back empty or
+    invalid) is left to the LLM extractor.
+    """
+
+    def __init__(self, sources: Optional[List[SourceConfig]] = None):
+        if sources is None:
+            sources = load_sources() if Path(SOURCES_PATH).exists() else []
+        self.sources = [CompiledSource(s) for s in sources if s.selectors]
+
+    def extract(self, page: FetchResult) -> Optional[List[Event]]:
+        """Events for `page`, or None when the caller should fall back."""
+        for source in self.sources:
+            if not source.matches(page):
+                continue
+            try:
+                events = source.extract(page)
+            except Exception:
+                return None
+            valid = [e for e in events if is_valid(e)]
+            # Mostly invalid items means the markup drifted: trust the LLM
+            if not valid or len(valid) * 2 < len(events):
+                return None
+            return valid
+        return None
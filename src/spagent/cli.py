@@ -8,23 +8,130 @@ if sys.platform.startswith("win"):
     except Exception:
         pass
 
-import asyncio, json, typer
+import asyncio, contextlib, json, typer
+from pathlib import Path
+from typing import List, Optional
 from rich import print
-from .agents.orchestrator import Orchestrator
+from .tools.calendar import upcoming_weekends, weekend_of
+
+# The agent stack (LangChain, chromadb, BeautifulSoup, ...) is imported inside
+# the commands, so `--help`, cron wrappers and health checks start fast;
+# tests/test_cli.py holds cold start to this budget
+STARTUP_BUDGET_S = 1.0
 
 app = typer.Typer(help="Multi-agent tools for SP weekend events")
 
+PROVIDER_HELP = (
+    "ollama, openai or replay (serve responses recorded with LLM_REPLAY=record)"
+)
+
+
+DEADLINE_HELP = "Wall-clock seconds for the run; partial results after that"
+MAX_LLM_CALLS_HELP = "Stop calling the LLM after this many calls"
+MAX_INPUT_TOKENS_HELP = "Stop calling the LLM after ~this many prompt tokens"
+
+
+def _budget(deadline, max_llm_calls, max_input_tokens):
+    """A run budget from the CLI limits; None defers to the RUN_* env vars."""
+    from .budget import Budget
+
+    budget = Budget(deadline, max_llm_calls, max_input_tokens)
+    return budget if budget.limited else None
+
+
+def _orchestrator(model: str, skip_planner: bool, provider: str):
+    from .agents.orchestrator import Orchestrator
+
+    return Orchestrator(model=model, skip_planner=skip_planner, provider=provider)
+
 
 @app.command(help="Run the multi-agent weekend discovery (SERP-first).")
 def weekend(
     focus: str = "samba",
     model: str = "mistral:7b",
     mode: str = typer.Option("serp", help="serp or crawl"),
+    skip_planner: bool = typer.Option(
+        False, help="Use the cached/default plan without calling the planner LLM"
+    ),
+    provider: str = typer.Option("ollama", envvar="LLM_PROVIDER", help=PROVIDER_HELP),
+    deadline: Optional[float] = typer.Option(None, help=DEADLINE_HELP),
+    max_llm_calls: Optional[int] = typer.Option(None, help=MAX_LLM_CALLS_HELP),
+    max_input_tokens: Optional[int] = typer.Option(None, help=MAX_INPUT_TOKENS_HELP),
 ):
-    orch = Orchestrator(model=model)
-    result = asyncio.run(orch.weekend_run(focus=focus, mode=mode))
+    orch = _orchestrator(model, skip_planner, provider)
+    budget = _budget(deadline, max_llm_calls, max_input_tokens)
+    result = asyncio.run(orch.weekend_run(focus=focus, mode=mode, budget=budget))
     print(json.dumps(result, ensure_ascii=False, indent=2))
 
 
+@app.command(
+    help="Answer several (focus, weekend) queries from one shared fetch/extract "
+    "pass; writes one NDJSON line per query."
+)
+def batch(
+    focus: List[str] = typer.Option(["samba"], help="Repeat for several foci"),
+    weekend: List[str] = typer.Option(
+        [], help="A date (YYYY-MM-DD) in the week of a weekend; repeatable"
+    ),
+    weekends: int = typer.Option(
+        1, help="Number of upcoming weekends when --weekend is not given"
+    ),
+    model: str = "mistral:7b",
+    mode: str = typer.Option("serp", help="serp or crawl"),
+    skip_planner: bool = typer.Option(
+        False, help="Use the cached/default plan without calling the planner LLM"
+    ),
+    provider: str = typer.Option("ollama", envvar="LLM_PROVIDER", help=PROVIDER_HELP),
+    output: Optional[Path] = typer.Option(None, help="NDJSON file (default: stdout)"),
+    deadline: Optional[float] = typer.Option(None, help=DEADLINE_HELP),
+    max_llm_calls: Optional[int] = typer.Option(None, help=MAX_LLM_CALLS_HELP),
+    max_input_tokens: Optional[int] = typer.Option(None, help=MAX_INPUT_TOKENS_HELP),
+):
+    windows = [weekend_of(d) for d in weekend] or upcoming_weekends(weekends)
+    out = output.open("w", encoding="utf-8") if output else sys.stdout
+
+    async def run():
+        orch = _orchestrator(model, skip_planner, provider)
+        budget = _budget(deadline, max_llm_calls, max_input_tokens)
+        async for result in orch.batch_run(focus, windows, mode=mode, budget=budget):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+
+    # Progress output goes to stderr so stdout stays valid NDJSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            asyncio.run(run())
+        finally:
+            if output:
+                out.close()
+
+
+@app.command(
+    help="Serve weekend results over HTTP, precomputed on a schedule and "
+    "refreshed in the background (stale-while-revalidate)."
+)
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    focus: List[str] = typer.Option(["samba"], help="Foci to precompute"),
+    interval: float = typer.Option(20 * 60, help="Seconds between precomputations"),
+    model: str = "mistral:7b",
+    mode: str = typer.Option("serp", help="serp or crawl"),
+    skip_planner: bool = typer.Option(
+        False, help="Use the cached/default plan without calling the planner LLM"
+    ),
+    provider: str = typer.Option("ollama", envvar="LLM_PROVIDER", help=PROVIDER_HELP),
+):
+    from .server import WeekendService, serve as serve_forever
+
+    async def run():
+        orch = _orchestrator(model, skip_planner, provider)
+        service = WeekendService(orch, foci=focus, mode=mode)
+        await serve_forever(service, host=host, port=port, interval_s=interval)
+
+    print(f"Serving on http://{host}:{port}/events?focus={focus[0]}")
+    asyncio.run(run())
+
+
 if __name__ == "__main__":
     app()
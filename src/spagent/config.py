@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from pathlib import Path
-import os, yaml
+import os, re, yaml
+
+# ${VAR:default} placeholders in settings.yaml
+ENV_REF = re.compile(r"\$\{(\w+):([^}]*)\}")
 
 
 class Settings(BaseModel):
@@ -8,12 +11,14 @@ class Settings(BaseModel):
     llm_model: str = "llama3.1:8b-instruct"
     embeddings_model: str = "all-MiniLM-L6-v2"
     search_provider: str = "duckduckgo"
+    searx_url: str = "http://localhost:8888"
     persist_path: str = "data/vectordb"
 
 
 def load_settings() -> Settings:
     cfg_path = Path("config/settings.yaml")
-    data = yaml.safe_load(cfg_path.read_text())
+    text = ENV_REF.sub(lambda m: os.getenv(m[1], m[2]), cfg_path.read_text())
+    data = yaml.safe_load(text)
     # simple env overlay
     data["llm"]["provider"] = os.getenv("LLM_PROVIDER", data["llm"]["provider"])
     data["llm"]["model"] = os.getenv("LLM_MODEL", data["llm"]["model"])
@@ -28,5 +33,6 @@ def load_settings() -> Settings:
         llm_model=data["llm"]["model"],
         embeddings_model=data["embeddings"]["model"],
         search_provider=data["search"]["provider"],
+        searx_url=data["search"].get("searx_url") or Settings().searx_url,
         persist_path=data["retrieval"]["persist_path"],
     )
@@ -1,100 +1,218 @@
 # llm.py
-from typing import Type, TypeVar, get_origin, get_args
-import json
-import re
-
-from pydantic import ValidationError, BaseModel
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import Any, AsyncIterator, Dict, Type, TypeVar
+import asyncio
+import logging
+import os
+from contextlib import aclosing
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from .budget import llm_call
+from .cache import ResponseCache
+from .replay import ON_MISS, REPLAY_MODE, ReplayChatModel, get_replay_store
+from .tools.chunker import estimate_tokens
+from .tracing import Span, span
+from .utils import parse_model
 
 try:
-    from langchain_community.chat_models import ChatOllama
+    from langchain_ollama import ChatOllama
 except Exception:  # pragma: no cover
     ChatOllama = None
 
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
 
-def _extract_json(text: str) -> str:
-    """
-    Extract the first valid JSON object or array from text
-    by matching balanced braces/brackets.
-    """
-    text = text.strip()
-
-    # Remove code fences if present
-    if text.startswith("```"):
-        lines = text.splitlines()
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
-        text = "\n".join(lines).strip()
-
-    start = None
-    stack = []
-    for i, ch in enumerate(text):
-        if ch in "{[":
-            if start is None:
-                start = i
-            stack.append(ch)
-        elif ch in "}]":
-            if not stack:
-                continue
-            opening = stack.pop()
-            if not stack:
-                # Found matching end
-                return text[start : i + 1]
-
-    return text  # fallback (will fail loudly)
-
-
-def _autoclose_json(text: str) -> str:
+DEFAULT_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")
+
+# Max generations in flight per model, process-wide
+DEFAULT_MODEL_CONCURRENCY = int(os.getenv("LLM_MAX_INFLIGHT", "4"))
+
+_chat_models: Dict[tuple, Any] = {}
+_model_limits: Dict[str, asyncio.Semaphore] = {}
+_model_concurrency: Dict[str, int] = {}
+_limits_loop: asyncio.AbstractEventLoop | None = None
+
+
+def set_model_concurrency(model: str, limit: int) -> None:
+    _model_concurrency[model] = max(1, limit)
+    _model_limits.pop(model, None)
+
+
+def model_limit(model: str) -> asyncio.Semaphore:
+    """Semaphore shared by every caller generating with `model`."""
+    global _limits_loop
+    loop = asyncio.get_running_loop()
+    if _limits_loop is not loop:
+        # Semaphores bind to the loop they are first awaited on
+        _model_limits.clear()
+        _limits_loop = loop
+    if model not in _model_limits:
+        _model_limits[model] = asyncio.Semaphore(
+            _model_concurrency.get(model, DEFAULT_MODEL_CONCURRENCY)
+        )
+    return _model_limits[model]
+
+
+def _live_chat_model(
+    provider: str, model: str, temperature: float, cache: ResponseCache | None
+):
+    if provider == "ollama":
+        if ChatOllama is None:
+            raise RuntimeError("LangChain Ollama not installed")
+        # e.g. "30m" for `spagent serve`, so the model stays loaded between runs
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
+            cache=cache,
+            keep_alive=os.getenv("LLM_KEEP_ALIVE"),
+        )
+
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, temperature=temperature, cache=cache)
+
+
+def get_chat_model(
+    provider: str,
+    model: str,
+    temperature: float,
+    cache: ResponseCache | None = None,
+):
     """
-    Close unbalanced JSON braces/brackets.
-    Last-resort repair for truncated outputs.
+    One chat model (and therefore one HTTP connection pool) per
+    provider/model/temperature/cache, shared by the planner and extractor.
+
+    `provider="replay"` answers from recorded responses (see spagent.replay);
+    with LLM_REPLAY=record, live models are wrapped so they get recorded.
     """
-    text = text.rstrip()
+    key = (provider, model, temperature, id(cache))
+    if key in _chat_models:
+        return _chat_models[key]
+
+    if provider == "replay":
+        chat = ReplayChatModel(
+            store=get_replay_store(),
+            model=model,
+            temperature=temperature,
+            inner=(
+                _live_chat_model("ollama", model, temperature, cache)
+                if ON_MISS == "live"
+                else None
+            ),
+            on_miss=ON_MISS,
+        )
+    else:
+        chat = _live_chat_model(provider, model, temperature, cache)
+        if REPLAY_MODE == "record":
+            chat = ReplayChatModel(
+                store=get_replay_store(),
+                model=model,
+                temperature=temperature,
+                inner=chat,
+                record=True,
+            )
 
-    open_curly = text.count("{")
-    close_curly = text.count("}")
-    open_square = text.count("[")
-    close_square = text.count("]")
+    _chat_models[key] = chat
+    return chat
 
-    if close_curly < open_curly:
-        text += "}" * (open_curly - close_curly)
-    if close_square < open_square:
-        text += "]" * (open_square - close_square)
 
-    return text
+def _prompt_tokens(messages: Any) -> int:
+    """Estimated input tokens of a prompt, as charged to the run budget."""
+    if isinstance(messages, PromptValue):
+        messages = messages.to_messages()
+    return sum(estimate_tokens(str(m.content)) for m in messages)
 
 
 class LLM:
-    def __init__(self, provider: str = "ollama", model: str = "llama3.1:8b-instruct"):
+    def __init__(
+        self,
+        provider: str = DEFAULT_PROVIDER,
+        model: str = "llama3.1:8b-instruct",
+        cache: ResponseCache | None = None,
+        temperature: float = 0.2,
+    ):
         self.provider = provider
         self.model = model
+        self.cache = cache
+        self.temperature = temperature
+        self.llm = get_chat_model(provider, model, temperature, cache)
 
-        if provider == "ollama":
-            if ChatOllama is None:
-                raise RuntimeError("LangChain Ollama not installed")
-            self.llm = ChatOllama(
-                model=model,
-                temperature=0.2,
-            )
-        else:
-            from langchain_openai import ChatOpenAI
-
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=0.2,
-            )
-
-    def ask(self, system: str, user: str) -> str:
-        msgs = [
+    @staticmethod
+    def _messages(system: str, user: str):
+        return [
             SystemMessage(content=system),
             HumanMessage(content=user),
         ]
-        return self.llm.invoke(msgs).content
+
+    def ask(self, system: str, user: str) -> str:
+        """Blocking call; prefer `aask` inside the event loop."""
+        return self.llm.invoke(self._messages(system, user)).content
+
+    @staticmethod
+    def _record_usage(s: Span, message: Any) -> None:
+        usage = getattr(message, "usage_metadata", None) or {}
+        for key in ("input_tokens", "output_tokens"):
+            if usage.get(key):
+                s.add(key, usage[key])
+
+    def _budgeted(self, messages: Any, stream: bool = False):
+        """
+        The run budget's charge for a call. Replay and ResponseCache misses
+        are charged where they happen, so answers served from them are free;
+        LangChain skips the cache for streams.
+        """
+        on_miss = isinstance(self.llm, ReplayChatModel) or (
+            not stream and isinstance(getattr(self.llm, "cache", None), ResponseCache)
+        )
+        return llm_call(_prompt_tokens(messages), bound=not stream, on_miss=on_miss)
+
+    async def ainvoke(self, messages: Any) -> AIMessage:
+        with span("llm", model=self.model) as s:
+            queued = time.perf_counter()
+            async with model_limit(self.model):
+                s.set(queue_wait_ms=(time.perf_counter() - queued) * 1000)
+                async with self._budgeted(messages):
+                    message = await self.llm.ainvoke(messages)
+            self._record_usage(s, message)
+            return message
+
+    async def aask(self, system: str, user: str) -> str:
+        return (await self.ainvoke(self._messages(system, user))).content
+
+    async def astream_messages(self, messages: Any) -> AsyncIterator[str]:
+        """
+        Yield text as it is generated. Close the iterator (e.g. with
+        contextlib.aclosing) to stop generation early and free the slot.
+        """
+        # Not made current: this body is suspended at every yield
+        with span("llm", current=False, model=self.model, stream=True) as s:
+            queued = time.perf_counter()
+            async with (
+                model_limit(self.model),
+                self._budgeted(messages, stream=True),
+                aclosing(self.llm.astream(messages)) as stream,
+            ):
+                s.set(queue_wait_ms=(time.perf_counter() - queued) * 1000)
+                async for chunk in stream:
+                    self._record_usage(s, chunk)
+                    yield chunk.content
+
+    async def astream(self, system: str, user: str) -> AsyncIterator[str]:
+        async for token in self.astream_messages(self._messages(system, user)):
+            yield token
+
+    def as_runnable(self) -> Runnable:
+        """Drop-in for the chat model inside `prompt | llm | parser` chains."""
+
+        async def call(prompt: PromptValue) -> AIMessage:
+            return await self.ainvoke(prompt)
+
+        return RunnableLambda(lambda prompt: self.llm.invoke(prompt), afunc=call)
 
     async def json(
         self,
@@ -108,9 +226,7 @@ class LLM:
         Ask the LLM for JSON output and validate against a Pydantic schema.
         """
 
-        json_system = (
-            system
-            + """
+        json_system = system + """
 
 STRICT RULES:
 - Return ONLY valid JSON.
@@ -119,57 +235,36 @@ STRICT RULES:
 - Always close all JSON objects and arrays.
 - If unsure, return an empty array [].
 """
-        )
-
-        last_error: Exception | None = None
 
-        for attempt in range(max_retries + 1):
-            raw = self.ask(json_system, user)
-            try:
-                clean = _extract_json(raw)
-                data = json.loads(clean)
-                origin = get_origin(schema)
-                if origin is list:
-                    model = get_args(schema)[0]
-                    if not issubclass(model, BaseModel):
-                        raise TypeError("List schema must contain BaseModel")
-                    return [model.model_validate(x) for x in data]
-
-                # Single BaseModel
-                if issubclass(schema, BaseModel):
-                    return schema.model_validate(data)
-
-                raise TypeError("Unsupported schema type")
-
-            except (json.JSONDecodeError, ValidationError) as e:
-                last_error = e
+        with span("llm.json", model=self.model) as s:
+            last_error: Exception | None = None
+            prompt = user
 
+            for attempt in range(max_retries + 1):
+                s.set(retries=attempt)
+                raw = await self.aask(json_system, prompt)
                 try:
-                    repaired = _autoclose_json(clean)
-                    data = json.loads(repaired)
-                    origin = get_origin(schema)
-                    if origin is list:
-                        model = get_args(schema)[0]
-                        return [model.model_validate(x) for x in data]
-                    if issubclass(schema, BaseModel):
-                        return schema.model_validate(data)
-                except Exception:
-                    pass
-
-                # Repair-only retry prompt
-                user = f"""
-            The JSON below is INVALID.
-
-            Fix it.
-            Do NOT add new items.
-            Do NOT remove existing items.
-            Do NOT use markdown.
-            Return ONLY valid JSON.
-
-            INVALID JSON:
-            {clean}
-            """
-
-        raise RuntimeError(
-            f"LLM JSON parsing failed after {max_retries + 1} attempts: {last_error}"
-        )
+                    result, dropped = parse_model(raw, schema)
+                except ValueError as e:  # includes pydantic's ValidationError
+                    last_error = e
+                    # Nothing salvageable: ask again instead of feeding the
+                    # broken output back for the model to repair
+                    reason = str(e).splitlines()[0]
+                    prompt = (
+                        f"{user}\n\nYour previous answer was unusable ({reason}). "
+                        "Answer again with ONLY the JSON."
+                    )
+                    continue
+
+                if dropped:
+                    s.add("json_dropped", len(dropped))
+                    logger.warning(
+                        "Salvaged %s JSON, dropped: %s",
+                        self.model,
+                        "; ".join(dropped),
+                    )
+                return result
+
+            raise RuntimeError(
+                f"LLM JSON parsing failed after {max_retries + 1} attempts: {last_error}"
+            )
@@ -0,0 +1,215 @@
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from .budget import charge_miss
+from .cache import ResponseCache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_PATH = "data/replay/llm.jsonl.gz"
+
+# LLM_REPLAY=record wraps live models so every response is written down;
+# LLM_PROVIDER=replay serves them back. LLM_REPLAY_ON_MISS=live lets replay
+# fall through to Ollama for prompts that were never recorded.
+REPLAY_MODE = os.getenv("LLM_REPLAY", "off")
+ON_MISS = os.getenv("LLM_REPLAY_ON_MISS", "error")
+
+
+class ReplayMiss(LookupError):
+    """A prompt with no recorded response while replaying."""
+
+
+def replay_key(model: str, temperature: float, messages: List[BaseMessage]) -> str:
+    """Provider-independent key: a recording from Ollama replays anywhere."""
+    payload = json.dumps(
+        [model, temperature, [(m.type, m.content) for m in messages]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    """
+    Append-only, gzip-compressed JSON lines of `{"key", "text"}`.
+
+    A recording session keeps one writer open and appends a single gzip
+    member, flushed after every record and finished by `close()` (at exit
+    at the latest), so responses share one compression window. Sessions
+    hold an exclusive lock on `<path>.lock` while recording; a member left
+    unfinished by a killed session is repaired by rewriting the file, but
+    only by a session that holds that lock. The whole index is loaded once
+    and served from memory.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_REPLAY_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._responses: Dict[str, str] = {}
+        self._writer: Optional[gzip.GzipFile] = None
+        self._session_lock = None
+        self._unfinished = False
+        self.hits = 0
+        self.misses = 0
+        if self.path.exists():
+            try:
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        record = json.loads(line)
+                        self._responses[record["key"]] = record["text"]
+            except (EOFError, ValueError):
+                # a session still recording, or one that never closed
+                self._unfinished = True
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._responses.get(key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def _line(self, key: str, text: str) -> bytes:
+        record = json.dumps({"key": key, "text": text}, ensure_ascii=False)
+        return (record + "\n").encode("utf-8")
+
+    def _lock_session(self) -> bool:
+        """Take the recording lock if no other session holds it."""
+        if fcntl is None:
+            return False
+        lock = open(self.path.with_name(self.path.name + ".lock"), "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._session_lock = lock
+        return True
+
+    def _open_writer(self) -> gzip.GzipFile:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._lock_session():
+            if self._unfinished:
+                # nobody is writing it: the member was left by a killed session
+                tmp = self.path.with_suffix(".tmp")
+                with gzip.open(tmp, "wb") as f:
+                    for key, text in self._responses.items():
+                        f.write(self._line(key, text))
+                tmp.replace(self.path)
+                self._unfinished = False
+        else:
+            logger.warning(
+                "%s is being recorded by another session; appending a new member",
+                self.path,
+            )
+        atexit.register(self.close)
+        return gzip.open(self.path, "ab")
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            if self._responses.get(key) == text:
+                return
+            if self._writer is None:
+                self._writer = self._open_writer()
+            self._responses[key] = text
+            self._writer.write(self._line(key, text))
+            # sync flush: readable now, without ending the member
+            self._writer.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                atexit.unregister(self.close)
+            if self._session_lock is not None:
+                self._session_lock.close()  # releases the flock
+                self._session_lock = None
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that answers from a ReplayStore.
+
+    With `record=True` every call goes to `inner` and the response is
+    stored. Otherwise recorded responses are returned instantly; a miss
+    raises ReplayMiss, or is sent to `inner` (and recorded) when
+    `on_miss="live"`.
+    """
+
+    store: Any
+    model: str
+    temperature: float = 0.0
+    inner: Optional[BaseChatModel] = None
+    record: bool = False
+    on_miss: str = "error"
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _key(self, messages: List[BaseMessage]) -> str:
+        return replay_key(self.model, self.temperature, messages)
+
+    @staticmethod
+    def _result(text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(text))])
+
+    def _recorded(self, key: str) -> Optional[str]:
+        if self.record:
+            return None
+        text = self.store.get(key)
+        if text is None and (self.on_miss != "live" or self.inner is None):
+            raise ReplayMiss(f"No recorded response for {self.model} ({key[:12]})")
+        return text
+
+    def _charge_miss(self) -> None:
+        # A ResponseCache on `inner` charges its own misses
+        if not isinstance(getattr(self.inner, "cache", None), ResponseCache):
+            charge_miss()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._key(messages)
+        text = self._recorded(key)
+        if text is None:
+            self._charge_miss()
+            text = self.inner.invoke(messages, stop=stop, **kwargs).content
+            self.store.put(key, text)
+        return self._result(text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._key(messages)
+        text = self._recorded(key)
+        if text is None:
+            self._charge_miss()
+            text = (await self.inner.ainvoke(messages, stop=stop, **kwargs)).content
+            self.store.put(key, text)
+        return self._result(text)
+
+
+_replay_store: Optional[ReplayStore] = None
+
+
+def get_replay_store() -> ReplayStore:
+    global _replay_store
+    if _replay_store is None:
+        _replay_store = ReplayStore(os.getenv("LLM_REPLAY_PATH", DEFAULT_REPLAY_PATH))
+    return _replay_store
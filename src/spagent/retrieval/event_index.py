@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from ..config import load_settings
+from ..schemas import Event
+from ..tools.dedupe import date_key, fold
+
+try:
+    import chromadb
+except Exception:  # pragma: no cover
+    chromadb = None
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    def encode(self, texts: List[str], batch_size: int = ...) -> Any: ...
+
+
+def event_id(event: Event) -> str:
+    """
+    Stable identity: the same show on the same day. The venue is content,
+    not identity, so a corrected venue replaces the entry instead of
+    leaving the old one behind.
+    """
+    key = "|".join([fold(event.title), date_key(event)])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def event_hash(event: Event) -> str:
+    raw = json.dumps(event.model_dump(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def event_text(event: Event) -> str:
+    parts = [event.title, event.category, event.venue, event.date_text]
+    return " | ".join(p for p in parts if p)
+
+
+class EventIndex:
+    """
+    Persistent Chroma collection of events, used to rank a run's events
+    against a free-text focus ("samba", "teatro infantil") without an LLM.
+
+    Embeddings are computed in batches and only for events that are new or
+    whose content changed since they were last indexed. The store path and
+    embedding model default to the ones in `config/settings.yaml`.
+    """
+
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        model_name: Optional[str] = None,
+        embedder: Optional[Embedder] = None,
+        batch_size: int = 64,
+        collection: str = "events",
+    ):
+        if chromadb is None:
+            raise RuntimeError("chromadb not installed")
+        if persist_path is None or model_name is None:
+            settings = load_settings()
+            persist_path = persist_path or settings.persist_path
+            model_name = model_name or settings.embeddings_model
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._embedder = embedder
+        self.client = chromadb.PersistentClient(path=persist_path)
+        self.collection = self.client.get_or_create_collection(
+            collection, metadata={"hnsw:space": "cosine"}
+        )
+        self.stats = {"upserted": 0, "embedded": 0}
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            # Deferred: loading the model is the slow part of startup
+            from sentence_transformers import SentenceTransformer
+
+            self._embedder = SentenceTransformer(self.model_name)
+        return self._embedder
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self.embedder.encode(texts, batch_size=self.batch_size)
+        return [list(map(float, v)) for v in vectors]
+
+    def upsert(self, events: Sequence[Event]) -> int:
+        """Index `events`; returns how many needed a new embedding."""
+        latest: Dict[str, Event] = {event_id(e): e for e in events if e.title}
+        if not latest:
+            return 0
+
+        ids = list(latest)
+        existing = self.collection.get(ids=ids, include=["metadatas"])
+        known = {
+            i: (m or {}).get("hash")
+            for i, m in zip(existing["ids"], existing["metadatas"])
+        }
+
+        changed = [i for i in ids if known.get(i) != event_hash(latest[i])]
+        for start in range(0, len(changed), self.batch_size):
+            batch = changed[start : start + self.batch_size]
+            docs = [event_text(latest[i]) for i in batch]
+            self.collection.upsert(
+                ids=batch,
+                embeddings=self._embed(docs),
+                documents=docs,
+                metadatas=[
+                    {
+                        "hash": event_hash(latest[i]),
+                        "date": date_key(latest[i]),
+                        "event": latest[i].model_dump_json(),
+                    }
+                    for i in batch
+                ],
+            )
+
+        self.stats["upserted"] += len(ids)
+        self.stats["embedded"] += len(changed)
+        return len(changed)
+
+    def query(
+        self, focus: str, k: int = 20, date: Optional[str] = None
+    ) -> List[Tuple[Event, float]]:
+        """Nearest indexed events to `focus` (optionally on one ISO date)."""
+        if self.collection.count() == 0:
+            return []
+        result = self.collection.query(
+            query_embeddings=self._embed([focus]),
+            n_results=min(k, self.collection.count()),
+            where={"date": date} if date else None,
+            include=["metadatas", "distances"],
+        )
+        return [
+            (Event.model_validate_json(m["event"]), 1 - d)
+            for m, d in zip(result["metadatas"][0], result["distances"][0])
+        ]
+
+    def rank(
+        self, events: Sequence[Event], focus: str, min_score: float = 0.25
+    ) -> List[Event]:
+        """
+        Order `events` by similarity to `focus`, dropping clearly unrelated
+        ones. Events must have been upserted first.
+        """
+        ids = [event_id(e) for e in events]
+        stored = self.collection.get(
+            ids=list(dict.fromkeys(ids)), include=["embeddings"]
+        )
+        vectors = dict(zip(stored["ids"], stored["embeddings"]))
+        query = self._embed([focus])[0]
+
+        def score(i: str) -> float:
+            v = vectors.get(i)
+            if v is None:
+                return 0.0
+            dot = sum(a * b for a, b in zip(query, v))
+            norm = (sum(a * a for a in query) * sum(b * b for b in v)) ** 0.5
+            return dot / norm if norm else 0.0
+
+        scored = [(score(i), n, e) for n, (i, e) in enumerate(zip(ids, events))]
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        return [e for s, _, e in scored if s >= min_score]
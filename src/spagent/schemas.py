@@ -88,10 +88,25 @@ class StepResult(BaseModel):
     notes: Optional[str] = None
 
 
+class ValidationReport(BaseModel):
+    events: List[Event]
+    rejected: Dict[str, int] = Field(default_factory=dict)
+
+    def notes(self) -> str:
+        total = len(self.events) + sum(self.rejected.values())
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(self.rejected.items()))
+        return f"kept {len(self.events)}/{total}" + (
+            f"; rejected: {reasons}" if reasons else ""
+        )
+
+
 class ExecutionSummary(BaseModel):
     total_events: int
     sources_used: List[str]
     errors: int = 0
+    # Set when the run budget cut work short; events are partial
+    truncated: bool = False
+    truncated_reason: Optional[str] = None
 
 
 class FetchResult(BaseModel):
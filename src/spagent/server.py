@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .tools.calendar import current_weekend, weekend_of
+
+DEFAULT_RESULTS_PATH = "data/serve_results.json"
+# Results younger than this are served as-is; older ones (up to MAX_STALE_S)
+# are served immediately while a refresh runs in the background
+FRESH_S = 30 * 60
+MAX_STALE_S = 24 * 3600
+# Scheduled precomputation of the current weekend
+REFRESH_INTERVAL_S = 20 * 60
+# Every run computes all tracked foci: the configured ones plus the most
+# recently requested others, up to this many in total
+MAX_FOCI = 32
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+
+class ResultUnavailable(LookupError):
+    """The run finished without a result for the requested focus."""
+
+
+class WeekendService:
+    """
+    Stale-while-revalidate cache of weekend results in front of an
+    Orchestrator that stays loaded (clients, chat models, chains) for the
+    lifetime of the process.
+
+    Agent runs are single-flight: concurrent requests for a missing key
+    await the same run, and each run computes every tracked focus for its
+    weekend at once through `Orchestrator.batch_run`. Configured foci are
+    always tracked; other requested foci are kept least-recently-used up
+    to `max_foci`, and their results are dropped when they are evicted.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        foci: List[str],
+        path: str | Path = DEFAULT_RESULTS_PATH,
+        fresh_s: float = FRESH_S,
+        max_stale_s: float = MAX_STALE_S,
+        mode: str = "serp",
+        max_foci: int = MAX_FOCI,
+    ):
+        self.orchestrator = orchestrator
+        self.configured = list(dict.fromkeys(foci))
+        self.requested: OrderedDict[str, None] = OrderedDict()
+        self.max_foci = max_foci
+        self.path = Path(path)
+        self.fresh_s = fresh_s
+        self.max_stale_s = max_stale_s
+        self.mode = mode
+        self.results: Dict[Key, Dict[str, Any]] = {}
+        self._runs: Dict[str, asyncio.Task] = {}
+        self._run_lock = asyncio.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "runs": 0}
+
+        if self.path.exists():
+            for entry in json.loads(self.path.read_text(encoding="utf-8")):
+                self.results[(entry["focus"], entry["weekend_start"])] = entry
+            for focus, _ in list(self.results):
+                self._track(focus)
+
+    @property
+    def foci(self) -> List[str]:
+        return self.configured + list(self.requested)
+
+    def _track(self, focus: str) -> None:
+        if focus in self.configured:
+            return
+        self.requested[focus] = None
+        self.requested.move_to_end(focus)
+        while self.requested and len(self.foci) > self.max_foci:
+            evicted, _ = self.requested.popitem(last=False)
+            for key in [k for k in self.results if k[0] == evicted]:
+                del self.results[key]
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(list(self.results.values()), ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    async def _compute(self, weekend) -> None:
+        # One pipeline run at a time; Ollama is the bottleneck anyway
+        async with self._run_lock:
+            self.stats["runs"] += 1
+            now = time.time()
+            async for result in self.orchestrator.batch_run(
+                self.foci, [weekend], mode=self.mode
+            ):
+                result["computed_at"] = now
+                self.results[(result["focus"], result["weekend_start"])] = result
+            self._save()
+
+    def refresh(self, weekend) -> asyncio.Task:
+        """Start (or join) the run for `weekend`."""
+        key = weekend[0].date().isoformat()
+        task = self._runs.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._compute(weekend))
+            task.add_done_callback(self._log_failure)
+            self._runs[key] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Weekend refresh failed", exc_info=task.exception())
+
+    async def get(self, focus: str, weekend=None) -> Dict[str, Any]:
+        weekend = weekend or current_weekend()
+        self._track(focus)
+        key = (focus, weekend[0].date().isoformat())
+
+        entry = self.results.get(key)
+        age = time.time() - entry["computed_at"] if entry else None
+        if entry is not None and age < self.fresh_s:
+            self.stats["hits"] += 1
+            return {**entry, "stale": False}
+        if entry is not None and age < self.max_stale_s:
+            self.stats["stale_hits"] += 1
+            self.refresh(weekend)
+            return {**entry, "stale": True}
+
+        self.stats["misses"] += 1
+        await asyncio.shield(self.refresh(weekend))
+        if key not in self.results:
+            # joined a run that started before this focus was known
+            await asyncio.shield(self.refresh(weekend))
+        # None if the run produced nothing for it, or it was evicted meanwhile
+        entry = self.results.get(key)
+        if entry is None:
+            raise ResultUnavailable(f"no result for focus {focus!r}, try again")
+        return {**entry, "stale": False}
+
+    async def precompute_forever(self, interval_s: float = REFRESH_INTERVAL_S):
+        while True:
+            try:
+                await self.refresh(current_weekend())
+            except Exception:
+                pass  # already logged; try again next tick
+            await asyncio.sleep(interval_s)
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: Any) -> None:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    reason = HTTPStatus(status).phrase
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "Connection: close\r\n\r\n".encode("ascii") + payload
+    )
+    await writer.drain()
+    writer.close()
+
+
+def make_handler(service: WeekendService):
+    """
+    Minimal HTTP/1.1 endpoint on asyncio streams, so requests are served
+    on the same event loop as the warm clients and models.
+
+        GET /events?focus=samba[&weekend=YYYY-MM-DD]
+        GET /health
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            if len(request_line) < 2 or request_line[0] != "GET":
+                return await _respond(writer, 405, {"error": "GET only"})
+
+            url = urlsplit(request_line[1])
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == "/health":
+                return await _respond(
+                    writer, 200, {"ok": True, "foci": service.foci, **service.stats}
+                )
+            if url.path != "/events":
+                return await _respond(writer, 404, {"error": "not found"})
+
+            try:
+                weekend = weekend_of(query["weekend"]) if "weekend" in query else None
+            except ValueError as e:
+                return await _respond(writer, 400, {"error": str(e)})
+            result = await service.get(query.get("focus", "samba"), weekend)
+            await _respond(writer, 200, result)
+        except ResultUnavailable as e:
+            await _respond(writer, 503, {"error": str(e)})
+        except Exception as e:
+            logger.exception("Request failed")
+            await _respond(writer, 500, {"error": str(e)})
+
+    return handle
+
+
+async def serve(
+    service: WeekendService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    interval_s: float = REFRESH_INTERVAL_S,
+) -> None:
+    server = await asyncio.start_server(make_handler(service), host, port)
+    scheduler = asyncio.create_task(service.precompute_forever(interval_s))
+    logger.info("Serving on http://%s:%s", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        scheduler.cancel()
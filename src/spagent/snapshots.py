@@ -0,0 +1,176 @@
+import asyncio
+import difflib
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .schemas import FetchResult
+
+DEFAULT_SNAPSHOT_PATH = "data/snapshots"
+# Weeks of history per source; pages whose content did not change since the
+# previous snapshot only cost one index line
+MAX_AGE_DAYS = 28
+MAX_PER_SOURCE = 500
+
+
+class Snapshot(BaseModel):
+    sha: str
+    source: str
+    url: str
+    captured_at: float
+    size: int
+
+
+class SnapshotStore:
+    """
+    Compressed, content-addressed store of the pages handed to extraction.
+
+    Page bodies are written once per distinct content under
+    `blobs/<sha[:2]>/<sha>.html.gz`; each source keeps an append-only
+    history in `index/<source>.jsonl`, trimmed to `max_age_days` and
+    `max_per_source` entries. Blobs no longer referenced by any history are
+    deleted when a source is trimmed.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_SNAPSHOT_PATH,
+        max_age_days: float = MAX_AGE_DAYS,
+        max_per_source: int = MAX_PER_SOURCE,
+    ):
+        self.path = Path(path)
+        self.max_age_s = max_age_days * 86400
+        self.max_per_source = max_per_source
+        self._lock = threading.Lock()
+
+    def _blob(self, sha: str) -> Path:
+        return self.path / "blobs" / sha[:2] / f"{sha}.html.gz"
+
+    def _index(self, source: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in source)
+        return self.path / "index" / f"{safe or 'unknown'}.jsonl"
+
+    async def put(self, page: FetchResult) -> Snapshot:
+        """Snapshot `page` without blocking the event loop."""
+        return await asyncio.to_thread(self.put_sync, page)
+
+    def put_sync(self, page: FetchResult, now: float | None = None) -> Snapshot:
+        html = page.html or ""
+        snapshot = Snapshot(
+            sha=hashlib.sha256(html.encode("utf-8")).hexdigest(),
+            source=page.source or "unknown",
+            url=page.url,
+            captured_at=time.time() if now is None else now,
+            size=len(html),
+        )
+        blob = self._blob(snapshot.sha)
+        with self._lock:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_suffix(".tmp")
+                tmp.write_bytes(gzip.compress(html.encode("utf-8")))
+                tmp.replace(blob)
+
+            index = self._index(snapshot.source)
+            index.parent.mkdir(parents=True, exist_ok=True)
+            with index.open("a", encoding="utf-8") as f:
+                f.write(snapshot.model_dump_json() + "\n")
+            self._trim(snapshot.source, snapshot.captured_at)
+        return snapshot
+
+    def _trim(self, source: str, now: float) -> None:
+        history = self.history(source)
+        kept = [s for s in history if now - s.captured_at <= self.max_age_s]
+        kept = kept[-self.max_per_source :]
+        if len(kept) == len(history):
+            return
+
+        index = self._index(source)
+        tmp = index.with_suffix(".tmp")
+        tmp.write_text(
+            "".join(s.model_dump_json() + "\n" for s in kept), encoding="utf-8"
+        )
+        tmp.replace(index)
+
+        dropped = {s.sha for s in history} - {s.sha for s in kept}
+        if dropped:
+            dropped -= self._referenced()
+        for sha in dropped:
+            self._blob(sha).unlink(missing_ok=True)
+
+    def _referenced(self) -> set:
+        return {s.sha for source in self.sources() for s in self.history(source)}
+
+    def sources(self) -> List[str]:
+        index_dir = self.path / "index"
+        if not index_dir.exists():
+            return []
+        sources = []
+        for index in sorted(index_dir.glob("*.jsonl")):
+            with index.open(encoding="utf-8") as f:
+                first = f.readline()
+            if first.strip():
+                sources.append(json.loads(first)["source"])
+        return sources
+
+    def history(self, source: str) -> List[Snapshot]:
+        """Snapshots of `source`, oldest first."""
+        index = self._index(source)
+        if not index.exists():
+            return []
+        with index.open(encoding="utf-8") as f:
+            return [Snapshot.model_validate_json(line) for line in f if line.strip()]
+
+    def latest(self, source: str) -> Optional[Snapshot]:
+        history = self.history(source)
+        return history[-1] if history else None
+
+    def read(self, snapshot: Snapshot | str) -> str:
+        sha = snapshot if isinstance(snapshot, str) else snapshot.sha
+        return gzip.decompress(self._blob(sha).read_bytes()).decode("utf-8")
+
+    def page(self, snapshot: Snapshot) -> FetchResult:
+        """The snapshot as the FetchResult extraction saw, for replaying."""
+        return FetchResult(
+            url=snapshot.url, html=self.read(snapshot), source=snapshot.source
+        )
+
+    def latest_pages(self) -> Dict[str, FetchResult]:
+        return {
+            source: self.page(snapshot)
+            for source in self.sources()
+            if (snapshot := self.latest(source)) is not None
+        }
+
+    def diff(self, old: Snapshot, new: Snapshot, context: int = 2) -> str:
+        """Unified diff of two snapshots' text, as the extractor sends it."""
+        from .tools.compact import compact_html, minify_html
+
+        def lines(snapshot: Snapshot) -> List[str]:
+            return compact_html(minify_html(self.read(snapshot))).splitlines()
+
+        return "\n".join(
+            difflib.unified_diff(
+                lines(old),
+                lines(new),
+                fromfile=f"{old.source}@{old.sha[:12]}",
+                tofile=f"{new.source}@{new.sha[:12]}",
+                n=context,
+                lineterm="",
+            )
+        )
+
+    def stats(self) -> Dict[str, int]:
+        blobs = list((self.path / "blobs").glob("*/*.html.gz"))
+        return {
+            "sources": len(self.sources()),
+            "snapshots": sum(len(self.history(s)) for s in self.sources()),
+            "blobs": len(blobs),
+            "bytes": sum(b.stat().st_size for b in blobs),
+        }
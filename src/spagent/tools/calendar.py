@@ -14,3 +14,20 @@ def current_weekend(today: datetime | None = None):
     )
     sunday = friday + timedelta(days=2, hours=23, minutes=59)
     return friday, sunday
+
+
+def upcoming_weekends(count: int = 1, today: datetime | None = None):
+    """`count` consecutive weekends, starting with `current_weekend(today)`."""
+    start = today or datetime.now(TZ)
+    return [current_weekend(start + timedelta(weeks=i)) for i in range(count)]
+
+
+def weekend_of(day: str):
+    """
+    The weekend of the week an ISO date (YYYY-MM-DD) falls in: Monday to
+    Thursday look ahead to Friday, Friday to Sunday are their own weekend.
+    """
+    now = TZ.localize(datetime.fromisoformat(day))
+    if now.weekday() >= 4:
+        now -= timedelta(days=now.weekday() - 4)
+    return current_weekend(now)
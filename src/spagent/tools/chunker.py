@@ -0,0 +1,125 @@
+import zlib
+from collections import Counter
+from typing import List, Sequence
+
+from bs4 import BeautifulSoup, Comment, NavigableString, PageElement, Tag
+
+# Rough chars-per-token ratio for the small instruct models we run locally.
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_TOKENS = 750
+
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# A chunk may also close early (once half full) after a unit whose hash hits
+# this modulus, so an edit to one card only changes the chunks around it
+# instead of shifting every boundary after it.
+ANCHOR_MODULUS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _signature(el: Tag) -> str:
+    return ".".join([el.name, *sorted(el.get("class") or [])])
+
+
+def _children(node: Tag) -> List[PageElement]:
+    return [
+        c
+        for c in node.children
+        if not isinstance(c, Comment)
+        and not (isinstance(c, NavigableString) and not c.strip())
+    ]
+
+
+def _group_children(node: Tag) -> List[List[PageElement]]:
+    """
+    Group a node's children so that each repeated sibling structure
+    (card, list item, heading-led section) starts a new group.
+    """
+    children = _children(node)
+    counts = Counter(_signature(c) for c in children if isinstance(c, Tag))
+    repeated = [sig for sig, n in counts.items() if n >= 2]
+
+    if not repeated:
+        return [[c] for c in children]
+
+    headings = sorted(
+        (sig for sig in repeated if sig.split(".")[0] in HEADINGS),
+        key=lambda sig: sig.split(".")[0],
+    )
+    boundary = headings[0] if headings else max(repeated, key=counts.__getitem__)
+
+    groups: List[List[PageElement]] = []
+    for c in children:
+        if not groups or (isinstance(c, Tag) and _signature(c) == boundary):
+            groups.append([])
+        groups[-1].append(c)
+    return groups
+
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    parts = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= max_chars // 2:
+            cut = max_chars
+        parts.append(text[:cut])
+        text = text[cut:]
+    if text:
+        parts.append(text)
+    return parts
+
+
+def _units(nodes: Sequence[PageElement], max_tokens: int) -> List[str]:
+    text = "".join(str(n) for n in nodes)
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    if len(nodes) > 1:
+        return [u for n in nodes for u in _units([n], max_tokens)]
+
+    node = nodes[0]
+    if isinstance(node, Tag) and _children(node):
+        return [u for g in _group_children(node) for u in _units(g, max_tokens)]
+
+    return _split_text(text, max_tokens)
+
+
+def _is_anchor(unit: str) -> bool:
+    return zlib.crc32(unit.encode("utf-8")) % ANCHOR_MODULUS == 0
+
+
+def chunk_html(html: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """
+    Split cleaned HTML into chunks aligned to the page's DOM structure.
+
+    Repeated sibling structures are kept whole where they fit and packed
+    greedily up to `max_tokens`, so an event card is never cut in half
+    unless it is bigger than the whole budget on its own. Boundaries are
+    partly content-defined, so unchanged regions of a page produce the same
+    chunks from run to run.
+    """
+    if not html or not html.strip():
+        return []
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in _units([soup], max_tokens):
+        tokens = estimate_tokens(unit)
+        if current and size + tokens > max_tokens:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += tokens
+        if size * 2 >= max_tokens and _is_anchor(unit):
+            chunks.append("".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
@@ -0,0 +1,154 @@
+"""
+Single-pass HTML preprocessing for extraction input.
+
+Fetchers strip page noise once (`strip_noise`); before extraction the page
+is reduced to bare structural markup (`minify_html`) for the DOM-aware
+chunker, and each chunk is rendered as compact text (`compact_html`) for
+the model: markdown-style headings and list items, `[text](href)` links and
+`<time datetime>` values, without attributes, class names or wrappers.
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from .chunker import estimate_tokens
+
+# Bump when `strip_noise` output changes: pages cleaned by an older version
+# are not served from the HTTP cache (see tools.http)
+CLEAN_VERSION = 2
+
+NOISE_RE = re.compile(
+    r"<(head|script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>|<!--.*?-->",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Elements dropped together with everything inside them
+SKIP = {
+    "head", "script", "style", "noscript", "template", "svg", "iframe",
+    "button", "select", "nav", "form",
+}  # fmt: skip
+VOID = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area"}
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# Elements kept by minify_html; anything else is unwrapped to its content
+STRUCTURE = {
+    "main", "article", "section", "div", "header", "footer", "aside",
+    "p", "blockquote", "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tr", "td", "th", "a", "time", "br",
+    *HEADINGS,
+}  # fmt: skip
+BLOCK = STRUCTURE - {"a", "time", "td", "th"}
+KEEP_ATTRS = {"a": "href", "time": "datetime"}
+
+
+def strip_noise(html: str) -> str:
+    """Drop <head>, scripts, styles, inline SVG and comments in one pass."""
+    return NOISE_RE.sub("", html)
+
+
+class _Compactor(HTMLParser):
+    def __init__(self, markup: bool):
+        super().__init__(convert_charrefs=True)
+        self.markup = markup
+        self.out: List[str] = []
+        self.skipping: List[str] = []
+        # (tag, output position, kept attribute) for open a/time elements
+        self.open: List[Tuple[str, int, Optional[str]]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.skipping:
+            if tag == self.skipping[-1] and tag not in VOID:
+                self.skipping.append(tag)
+            return
+        if tag in SKIP:
+            if tag not in VOID:
+                self.skipping.append(tag)
+            return
+
+        attr = KEEP_ATTRS.get(tag)
+        value = dict(attrs).get(attr) if attr else None
+
+        if self.markup:
+            if tag in STRUCTURE:
+                kept = f' {attr}="{escape(value)}"' if value else ""
+                self.out.append(f"<{tag}{kept}>")
+            return
+
+        if tag in HEADINGS:
+            self.out.append("\n" + "#" * HEADINGS[tag] + " ")
+        elif tag == "li":
+            self.out.append("\n- ")
+        elif tag in ("td", "th"):
+            self.out.append(" | ")
+        elif tag in BLOCK:
+            self.out.append("\n")
+        if tag in KEEP_ATTRS and tag not in VOID:
+            self.open.append((tag, len(self.out), value))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.skipping:
+            if tag == self.skipping[-1]:
+                self.skipping.pop()
+            return
+        if tag in VOID:
+            return
+
+        if self.markup:
+            if tag in STRUCTURE:
+                self.out.append(f"</{tag}>")
+            return
+
+        if self.open and self.open[-1][0] == tag:
+            _, start, value = self.open.pop()
+            text = " ".join("".join(self.out[start:]).split())
+            del self.out[start:]
+            if tag == "a" and value and value.startswith(("http", "/")) and text:
+                self.out.append(f"[{text}]({value})")
+            elif tag == "time" and value and value not in text:
+                self.out.append(f"{text} ({value})" if text else value)
+            else:
+                self.out.append(text)
+        elif tag in HEADINGS or tag in BLOCK:
+            self.out.append("\n")
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        if self.markup:
+            self.out.append(escape(data, quote=False))
+        else:
+            self.out.append(data)
+
+    def result(self) -> str:
+        self.close()
+        text = "".join(self.out)
+        if self.markup:
+            return re.sub(r"\s+", " ", text).strip()
+        lines = (" ".join(line.split()) for line in text.split("\n"))
+        return "\n".join(line for line in lines if line.strip("-# "))
+
+
+def minify_html(html: str) -> str:
+    """Structural tags only, with no attributes but `href` and `datetime`."""
+    parser = _Compactor(markup=True)
+    parser.feed(html or "")
+    return parser.result()
+
+
+def compact_html(html: str) -> str:
+    """Render HTML as compact, structure-preserving text for the model."""
+    parser = _Compactor(markup=False)
+    parser.feed(html or "")
+    return parser.result()
+
+
+def reduction(before: str, after: str) -> float:
+    """Fraction of estimated tokens removed going from `before` to `after`."""
+    tokens = estimate_tokens(before)
+    return 1 - estimate_tokens(after) / tokens if tokens else 0.0
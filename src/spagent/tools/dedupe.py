@@ -0,0 +1,176 @@
+import re
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..schemas import Event
+
+STOPWORDS = {
+    "a", "as", "o", "os", "e", "de", "da", "das", "do", "dos", "em", "no",
+    "na", "nos", "nas", "com", "para", "por", "um", "uma", "the", "and", "of",
+}  # fmt: skip
+
+# MinHash over title tokens, banded for LSH: 6 bands x 2 rows catches pairs
+# whose token Jaccard is above ~0.4; they are then verified on trigrams.
+BANDS = 6
+ROWS = 2
+_PRIME = (1 << 61) - 1
+_PERMS = [
+    (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(BANDS * ROWS)
+]
+
+# Only the most recent clusters in a bucket are considered, and only the
+# ones sharing the most bands are verified, which keeps the worst case
+# linear when many titles share common words
+MAX_BUCKET_SCAN = 32
+MAX_CANDIDATES = 4
+
+TITLE_THRESHOLD = 0.6
+VENUE_THRESHOLD = 0.3
+
+# Fields taken from the single richest record so title/link/source stay
+# consistent with each other
+SOURCE_FIELDS = ("title", "link", "source_name", "source_url")
+
+
+@lru_cache(maxsize=65536)
+def fold(text: Optional[str]) -> str:
+    """Accent-fold, casefold and strip punctuation."""
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.casefold()
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def tokens(text: str) -> List[str]:
+    return [t for t in text.split() if t not in STOPWORDS] or text.split()
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def date_key(event: Event) -> str:
+    m = re.match(r"\d{4}-\d{2}-\d{2}", event.starts_at or "")
+    return m.group(0) if m else "?"
+
+
+def minhash_bands(words: List[str]) -> List[Tuple[int, ...]]:
+    hashes = [zlib.crc32(w.encode("utf-8")) for w in set(words)]
+    if not hashes:
+        return []
+    sig = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+    return [tuple(sig[i * ROWS : (i + 1) * ROWS]) for i in range(BANDS)]
+
+
+class _Record:
+    __slots__ = ("event", "title", "venue", "numbers", "title_grams", "venue_grams")
+
+    def __init__(self, event: Event):
+        self.event = event
+        self.title = fold(event.title)
+        self.venue = fold(event.venue)
+        self.numbers = {t for t in self.title.split() if t.isdigit()}
+        self.title_grams = trigrams(self.title)
+        self.venue_grams = trigrams(self.venue) if self.venue else set()
+
+    def matches(self, other: "_Record") -> bool:
+        # "Parte 1" / "Parte 2", "Festival 2025" / "Festival 2026"
+        if self.numbers != other.numbers:
+            return False
+        if self.title != other.title and (
+            jaccard(self.title_grams, other.title_grams) < TITLE_THRESHOLD
+        ):
+            return False
+        if self.venue and other.venue:
+            return (
+                self.venue in other.venue
+                or other.venue in self.venue
+                or jaccard(self.venue_grams, other.venue_grams) >= VENUE_THRESHOLD
+            )
+        return True
+
+
+def _richness(event: Event) -> int:
+    return sum(1 for v in event.model_dump().values() if v)
+
+
+def merge(events: List[Event]) -> Event:
+    """Keep the most informative value of every field across duplicates."""
+    if len(events) == 1:
+        return events[0]
+
+    # Prefer a record that links somewhere for title/link/source
+    richest = max(events, key=lambda e: (bool(e.link), _richness(e)))
+    merged = richest.model_dump()
+    for field in Event.model_fields:
+        if field in SOURCE_FIELDS:
+            continue
+        values = [getattr(e, field) for e in events if getattr(e, field)]
+        if values:
+            merged[field] = max(values, key=lambda v: len(str(v)))
+    return Event.model_validate(merged)
+
+
+def dedupe(events: List[Event]) -> List[Event]:
+    """
+    Collapse near-duplicate events in roughly linear time.
+
+    Events are blocked by start date and LSH buckets over their title
+    tokens; a new event is only compared to one representative per cluster
+    sharing a bucket with it, never to the whole list. Output keeps the order
+    in which each cluster was first seen.
+    """
+    records = [_Record(e) for e in events if e is not None]
+    clusters: List[List[Event]] = []
+    reps: List[_Record] = []
+    exact: Dict[Tuple[str, str], int] = {}
+    buckets: Dict[Tuple, List[int]] = defaultdict(list)
+
+    for rec in records:
+        day = date_key(rec.event)
+        exact_key = (day, rec.title)
+        if rec.title and exact_key in exact and rec.matches(reps[exact[exact_key]]):
+            clusters[exact[exact_key]].append(rec.event)
+            continue
+
+        keys = [
+            (day, i, band) for i, band in enumerate(minhash_bands(tokens(rec.title)))
+        ]
+        hits = Counter(
+            cid for key in keys for cid in buckets.get(key, [])[-MAX_BUCKET_SCAN:]
+        )
+        found = next(
+            (
+                cid
+                for cid, _ in hits.most_common(MAX_CANDIDATES)
+                if rec.matches(reps[cid])
+            ),
+            None,
+        )
+
+        if found is None:
+            found = len(clusters)
+            clusters.append([])
+            reps.append(rec)
+            for key in keys:
+                buckets[key].append(found)
+
+        clusters[found].append(rec.event)
+        if rec.title:
+            exact[exact_key] = found
+
+    return [merge(c) for c in clusters]
@@ -1,17 +1,14 @@
-import re
-import httpx
 from ..schemas import FetchResult
+from .compact import strip_noise
+from .http import fetch_cleaned
 from bs4 import BeautifulSoup
 
 SYMPLA_URL = "https://www.sympla.com.br/eventos/sao-paulo-sp"
+SESC_URL = "https://www.sescsp.org.br/programacao/"
 SAO_PAULO_SECRETO_URL = (
     "https://saopaulosecreto.com/o-que-fazer-fim-de-semana-sao-paulo/"
 )
 
-HEAD_RE = re.compile(r"<head\b.*?>.*?</head>", re.IGNORECASE | re.DOTALL)
-SCRIPT_RE = re.compile(r"<script\b.*?>.*?</script>", re.I | re.S)
-STYLE_RE = re.compile(r"<style\b.*?>.*?</style>", re.I | re.S)
-
 
 def extract_article_body_sao_paulo_secreto(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
@@ -29,20 +26,25 @@ async def fetch_sympla_fetcher() -> FetchResult:
     return FetchResult(url=SYMPLA_URL, html="", source="sympla")
 
 
+def strip_head_scripts_styles(html: str) -> str:
+    # Markup is otherwise kept: selectors need it, and extraction compacts
+    # the page itself
+    return strip_noise(html)
+
+
+def clean_sao_paulo_secreto(html: str) -> str:
+    html = strip_head_scripts_styles(html)
+    return extract_article_body_sao_paulo_secreto(html)
+
+
+async def fetch_sesc_fetcher() -> FetchResult:
+    # Markup is kept intact: SESC is parsed by the selectors in sources.yaml
+    html = await fetch_cleaned(SESC_URL, strip_head_scripts_styles)
+
+    return FetchResult(url=SESC_URL, html=html, source="sesc")
+
+
 async def fetch_sao_paulo_secreto_fetcher() -> FetchResult:
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(
-            SAO_PAULO_SECRETO_URL,
-            headers={"User-Agent": "Mozilla/5.0"},
-        )
-
-        html = r.text
-        html = HEAD_RE.sub("", html)
-        html = SCRIPT_RE.sub("", html)
-        html = STYLE_RE.sub("", html)
-        html = extract_article_body_sao_paulo_secreto(html)
-        r.raise_for_status()
-
-        return FetchResult(
-            url=SAO_PAULO_SECRETO_URL, html=html, source="sao_paulo_secreto"
-        )
+    html = await fetch_cleaned(SAO_PAULO_SECRETO_URL, clean_sao_paulo_secreto)
+
+    return FetchResult(url=SAO_PAULO_SECRETO_URL, html=html, source="sao_paulo_secreto")
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .compact import CLEAN_VERSION
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:  # pragma: no cover
+    HTTP2 = False
+
+DEFAULT_HTTP_CACHE_PATH = "data/http_cache"
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+PER_HOST_LIMIT = 4
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Process-wide pooled client shared by every fetcher.
+
+    A client is bound to the event loop it was first used on, so a new one is
+    created when the CLI (or a test) starts a fresh loop with asyncio.run.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=20,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=16,
+                keepalive_expiry=60,
+            ),
+        )
+        _client_loop = loop
+        _host_limits.clear()
+    return _client
+
+
+async def aclose_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return _host_limits[host]
+
+
+def cleaner_key(clean: Callable[[str], str]) -> str:
+    """Identity of a cleaner, stored with the HTML it produced."""
+    name = getattr(clean, "__qualname__", type(clean).__qualname__)
+    return f"{getattr(clean, '__module__', '')}.{name}/v{CLEAN_VERSION}"
+
+
+class HttpCache:
+    """
+    On-disk store of validators (ETag / Last-Modified) and the *cleaned*
+    HTML for each URL, so a 304 skips both the download and the cleanup.
+
+    Entries record the cleaner that produced them; an entry from another
+    cleaner (or an older CLEAN_VERSION) is ignored and refetched.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_HTTP_CACHE_PATH):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _files(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.path / f"{key}.json", self.path / f"{key}.html"
+
+    def load(
+        self, url: str, cleaner: str | None = None
+    ) -> tuple[Optional[dict], Optional[str]]:
+        meta_file, body_file = self._files(url)
+        if not meta_file.exists() or not body_file.exists():
+            return None, None
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        if cleaner is not None and meta.get("cleaner") != cleaner:
+            return None, None
+        return meta, body_file.read_text(encoding="utf-8")
+
+    def store(
+        self,
+        url: str,
+        response: httpx.Response,
+        cleaned: str,
+        cleaner: str | None = None,
+    ) -> None:
+        meta_file, body_file = self._files(url)
+        body_file.write_text(cleaned, encoding="utf-8")
+        meta_file.write_text(
+            json.dumps(
+                {
+                    "url": url,
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                    "fetched_at": time.time(),
+                    "cleaner": cleaner,
+                }
+            ),
+            encoding="utf-8",
+        )
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> HttpCache:
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache()
+    return _http_cache
+
+
+async def fetch_cleaned(
+    url: str,
+    clean: Callable[[str], str],
+    *,
+    client: Optional[httpx.AsyncClient] = None,
+    cache: Optional[HttpCache] = None,
+) -> str:
+    """
+    GET `url` through the shared client and return `clean(body)`.
+
+    When the cache holds validators for the URL the request is conditional;
+    a 304 returns the stored cleaned HTML without re-running `clean`, as
+    long as it was produced by the same cleaner.
+    """
+    client = client or get_client()
+    cache = cache or get_http_cache()
+
+    cleaner = cleaner_key(clean)
+    meta, cached = await asyncio.to_thread(cache.load, url, cleaner)
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    async with _host_limit(url):
+        r = await client.get(url, headers=headers)
+
+    if r.status_code == 304 and cached is not None:
+        return cached
+
+    r.raise_for_status()
+    cleaned = clean(r.text)
+    await asyncio.to_thread(cache.store, url, r, cleaned, cleaner)
+    return cleaned
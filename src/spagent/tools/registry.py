@@ -1,41 +1,196 @@
-from typing import List
+"""
+Tool registry.
 
-from spagent.chains.extractor import ExtractorChain
-from spagent.tools.fetchers import fetch_sao_paulo_secreto_fetcher, fetch_sympla_fetcher
-from ..schemas import Event, FetchResult
+Tools are registered as factories and only built (with their imports:
+LangChain, BeautifulSoup, httpx, ...) the first time a plan step looks
+them up, so importing the registry, listing tool names or planning from
+the cache stays cheap.
+"""
 
-extractor = ExtractorChain(model="phi3:mini")
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping
 
+from ..schemas import Event, EventList, FetchResult, SuccessCriteria, ValidationReport
 
-async def fetch_sympla() -> FetchResult:
-    return await fetch_sympla_fetcher()
+if TYPE_CHECKING:
+    from spagent.chains.extractor import ExtractorChain
+    from spagent.tools.validation import Window
 
+# Extraction budget for the pages web search hands over; together with
+# the search deadline this bounds the whole fallback
+WEBSEARCH_EXTRACT_DEADLINE_S = 60.0
 
-async def fetch_sao_paulo_secreto() -> FetchResult:
-    return await fetch_sao_paulo_secreto_fetcher()
+# Extraction cascade: every chunk goes to the small model; only chunks
+# whose answer looks wrong or incomplete are re-run on the larger one
+# (EXTRACTOR_ESCALATION_MODEL= disables escalation)
+EXTRACTOR_MODEL = os.getenv("EXTRACTOR_MODEL", "phi3:mini")
+EXTRACTOR_ESCALATION_MODEL = os.getenv(
+    "EXTRACTOR_ESCALATION_MODEL", "llama3.1:8b-instruct"
+)
 
+ToolFactory = Callable[[], Callable[..., Any]]
 
-async def extract_events(page: FetchResult) -> List[Event]:
-    return await extractor.extract(page)
+_extractor: "ExtractorChain | None" = None
+_extractor_provider: str | None = None
+_selector_extractor = None
 
 
-async def dedupe_events(events: List[Event] = None) -> List[Event]:
-    return events or []
+def get_extractor() -> "ExtractorChain":
+    """The shared LLM extractor, built on first use."""
+    global _extractor
+    if _extractor is None:
+        from spagent.cache import get_response_cache
+        from spagent.chains.chunk_store import ChunkStore
+        from spagent.chains.extractor import ExtractorChain
+        from spagent.llm import DEFAULT_PROVIDER
+        from spagent.snapshots import SnapshotStore
 
+        _extractor = ExtractorChain(
+            model=EXTRACTOR_MODEL,
+            escalate_to=EXTRACTOR_ESCALATION_MODEL or None,
+            cache=get_response_cache(),
+            chunk_store=ChunkStore(),
+            snapshots=SnapshotStore(),
+            provider=_extractor_provider or DEFAULT_PROVIDER,
+        )
+    return _extractor
 
-async def validate_events(events: List[Event] = None) -> List[Event]:
-    return events or []
 
+def extractor_built() -> bool:
+    return _extractor is not None
 
-async def websearch_events() -> List[Event]:
-    return []
 
+def set_extractor_provider(provider: str) -> None:
+    """Use `provider` for the extractor, now or whenever it gets built."""
+    global _extractor_provider
+    _extractor_provider = provider
+    if _extractor is not None and _extractor.llm.provider != provider:
+        _extractor.use_provider(provider)
 
-TOOLS = {
-    "fetch_sympla": fetch_sympla,
-    "fetch_sao_paulo_secreto": fetch_sao_paulo_secreto,
-    "extract_events": extract_events,
-    "dedupe_events": dedupe_events,
-    "validate_events": validate_events,
-    "websearch_events": websearch_events,
-}
+
+def get_selector_extractor():
+    global _selector_extractor
+    if _selector_extractor is None:
+        from spagent.chains.selectors import SelectorExtractor
+
+        _selector_extractor = SelectorExtractor()
+    return _selector_extractor
+
+
+def _fetch_sympla():
+    from spagent.tools.fetchers import fetch_sympla_fetcher
+
+    async def fetch_sympla() -> FetchResult:
+        return await fetch_sympla_fetcher()
+
+    return fetch_sympla
+
+
+def _fetch_sesc():
+    from spagent.tools.fetchers import fetch_sesc_fetcher
+
+    async def fetch_sesc() -> FetchResult:
+        return await fetch_sesc_fetcher()
+
+    return fetch_sesc
+
+
+def _fetch_sao_paulo_secreto():
+    from spagent.tools.fetchers import fetch_sao_paulo_secreto_fetcher
+
+    async def fetch_sao_paulo_secreto() -> FetchResult:
+        return await fetch_sao_paulo_secreto_fetcher()
+
+    return fetch_sao_paulo_secreto
+
+
+def _extract_events():
+    selectors = get_selector_extractor()
+    extractor = get_extractor()
+
+    async def extract_events(page: FetchResult) -> EventList:
+        # Configured CSS selectors first; the LLM only when they yield nothing
+        events = selectors.extract(page)
+        if events:
+            print(f"[selectors] {len(events)} events from {page.url}")
+            return EventList(events=events)
+        return await extractor.extract(page)
+
+    return extract_events
+
+
+def _dedupe_events():
+    from spagent.tools.dedupe import dedupe
+
+    async def dedupe_events(events: List[Event] = None) -> List[Event]:
+        return dedupe(events or [])
+
+    return dedupe_events
+
+
+def _validate_events():
+    from spagent.tools.validation import validate
+
+    async def validate_events(
+        events: List[Event] = None,
+        criteria: SuccessCriteria | None = None,
+        window: "Window | None" = None,
+    ) -> ValidationReport:
+        return validate(events or [], criteria=criteria, window=window)
+
+    return validate_events
+
+
+def _websearch_events():
+    from spagent.tools.calendar import current_weekend
+    from spagent.tools.websearch import gather_until, search_pages
+
+    extract_events = TOOLS["extract_events"]
+
+    async def websearch_events(window: "Window | None" = None) -> List[Event]:
+        pages = await search_pages(window or current_weekend())
+        deadline = asyncio.get_running_loop().time() + WEBSEARCH_EXTRACT_DEADLINE_S
+        batches = await gather_until([extract_events(p) for p in pages], deadline)
+        print(f"[websearch] {len(batches)}/{len(pages)} result pages extracted")
+        return [e for batch in batches for e in batch.events]
+
+    return websearch_events
+
+
+class LazyTools(Mapping):
+    """Read-only name -> tool mapping that builds each tool on first lookup."""
+
+    def __init__(self, factories: Dict[str, ToolFactory]):
+        self._factories = factories
+        self._built: Dict[str, Callable[..., Any]] = {}
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        if name not in self._built:
+            self._built[name] = self._factories[name]()
+        return self._built[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def built(self) -> List[str]:
+        return list(self._built)
+
+
+TOOLS = LazyTools(
+    {
+        "fetch_sympla": _fetch_sympla,
+        "fetch_sesc": _fetch_sesc,
+        "fetch_sao_paulo_secreto": _fetch_sao_paulo_secreto,
+        "extract_events": _extract_events,
+        "dedupe_events": _dedupe_events,
+        "validate_events": _validate_events,
+        "websearch_events": _websearch_events,
+    }
+)
@@ -0,0 +1,141 @@
+import re
+from collections import Counter
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from dateutil import parser as date_parser
+
+from ..schemas import Event, SuccessCriteria, ValidationReport
+from .calendar import TZ, current_weekend
+from .dedupe import fold
+
+CITY_ALIASES = {"sao paulo", "sp", "sao paulo sp", "sampa", "capital paulista"}
+
+Window = Tuple[datetime, datetime]
+
+
+# Explicit day/month (and year) inside free text, e.g. "sáb, 10/01 às 20h"
+NUMERIC_DATE_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{4}|\d{2}))?\b")
+# Two defaults that differ in every field tell what the text actually set
+_PROBES = (datetime(2000, 1, 1), datetime(2001, 2, 2))
+
+DateParts = Tuple[Optional[int], int, int]
+
+
+@lru_cache(maxsize=16384)
+def _date_parts(text: str) -> Optional[DateParts]:
+    """
+    (year or None, month, day) written in `text`. Does not depend on
+    today, so it is cached; the same strings repeat across a batch.
+    """
+    try:
+        d = datetime.fromisoformat(text).date()
+        return d.year, d.month, d.day
+    except ValueError:
+        pass
+    try:
+        a, b = (date_parser.parse(text, dayfirst=True, default=p) for p in _PROBES)
+    except (ValueError, OverflowError):
+        match = NUMERIC_DATE_RE.search(text)
+        if not match:
+            return None
+        day, month, year = match.groups()
+        year = int(year) + (2000 if len(year) == 2 else 0) if year else None
+        return year, int(month), int(day)
+    if (a.month, a.day) != (b.month, b.day):
+        # a time, a bare number or just a month: "20h", "12", "março"
+        return None
+    return (a.year if a.year == b.year else None), a.month, a.day
+
+
+def parse_date(text: Optional[str]) -> Optional[date]:
+    """
+    The date written in `text`, or None unless it names a day and a month.
+    A missing year is the current one in São Paulo.
+    """
+    if not text or not text.strip():
+        return None
+    parts = _date_parts(text.strip())
+    if parts is None:
+        return None
+    year, month, day = parts
+    try:
+        return date(year or datetime.now(TZ).year, month, day)
+    except ValueError:
+        return None
+
+
+def _domain(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    parts = host.removeprefix("www.").split(".")
+    # keep "example.com.br" / "example.com" style registrable domains
+    keep = 3 if len(parts) >= 3 and parts[-2] in ("com", "org", "gov") else 2
+    return ".".join(parts[-keep:])
+
+
+def _reject_reason(
+    event: Event,
+    criteria: SuccessCriteria,
+    window: Optional[Tuple[date, date]],
+) -> Optional[str]:
+    if not event.title or not event.title.strip():
+        return "missing_title"
+
+    link = event.link
+    if link:
+        link = urljoin(event.source_url or "", link)
+        if urlsplit(link).scheme not in ("http", "https"):
+            return "invalid_link"
+        if event.source_url and _domain(link) != _domain(event.source_url):
+            return "link_off_domain"
+
+    if criteria.city:
+        if event.city and fold(event.city) not in CITY_ALIASES | {fold(criteria.city)}:
+            return "other_city"
+
+    if window is not None:
+        start = parse_date(event.starts_at) or parse_date(event.date_text)
+        if start is None:
+            return "missing_date"
+        end = parse_date(event.ends_at) or start
+        if start > window[1] or end < window[0]:
+            return "out_of_window"
+
+    # Normalized only once the event is kept
+    event.link = link
+    if criteria.city:
+        event.city = criteria.city
+    return None
+
+
+def validate(
+    events: List[Event],
+    criteria: Optional[SuccessCriteria] = None,
+    window: Optional[Window] = None,
+) -> ValidationReport:
+    """
+    Filter a batch of events in one pass.
+
+    Normalizes city and relative links of the kept events in place; when
+    the criteria require a date range, events must overlap `window`
+    (default: the current weekend in America/Sao_Paulo), dated by
+    `starts_at` or else `date_text`.
+    """
+    criteria = criteria or SuccessCriteria()
+    days = None
+    if criteria.date_range_required:
+        fri, sun = window or current_weekend()
+        days = (fri.astimezone(TZ).date(), sun.astimezone(TZ).date())
+
+    kept: List[Event] = []
+    rejected: Counter = Counter()
+    for event in events:
+        reason = _reject_reason(event, criteria, days)
+        if reason:
+            rejected[reason] += 1
+        else:
+            kept.append(event)
+
+    return ValidationReport(events=kept, rejected=dict(rejected))
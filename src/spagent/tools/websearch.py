@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Protocol, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import load_settings
+from ..schemas import FetchResult, Result
+from .dedupe import fold
+from .fetchers import strip_head_scripts_styles
+from .http import fetch_cleaned, get_client
+from .validation import Window, parse_date
+
+try:
+    from duckduckgo_search import DDGS
+except ImportError:  # pragma: no cover
+    DDGS = None
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULTS_PER_QUERY = 10
+TOP_PAGES = 6
+# Wall-clock budget for the whole search stage (queries + page fetches);
+# whatever has not returned by then is cancelled
+SEARCH_DEADLINE_S = 30.0
+
+QUERY_TEMPLATES = (
+    "eventos fim de semana São Paulo {dates}",
+    "o que fazer em São Paulo {dates}",
+    "roda de samba São Paulo {dates}",
+    "teatro exposição show São Paulo {dates}",
+)
+
+EVENT_TERMS = {
+    "agenda", "evento", "eventos", "programacao", "show", "shows", "samba",
+    "roda", "teatro", "peca", "exposicao", "festival", "ingressos", "gratis",
+    "fim de semana", "sabado", "domingo", "sexta",
+}  # fmt: skip
+
+# Pages that never hold a weekend listing
+SKIP_DOMAINS = ("youtube.com", "facebook.com", "instagram.com", "tiktok.com")
+
+DATE_TEXT_RE = re.compile(r"\b(\d{1,2})(?:/(\d{1,2})|\s+de\s+(\w+))", re.IGNORECASE)
+MONTHS = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5,
+    "junho": 6, "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10,
+    "novembro": 11, "dezembro": 12,
+}  # fmt: skip
+
+
+class SearchBackend(Protocol):
+    name: str
+
+    async def search(self, query: str, max_results: int) -> List[Result]: ...
+
+
+class DuckDuckGoBackend:
+    """duckduckgo-search, run in a worker thread (the library is sync)."""
+
+    name = "duckduckgo"
+
+    def __init__(self, region: str = "br-pt"):
+        if DDGS is None:
+            raise RuntimeError("duckduckgo-search is not installed")
+        self.region = region
+
+    def _search(self, query: str, max_results: int) -> List[Result]:
+        hits = DDGS().text(query, region=self.region, max_results=max_results)
+        return [
+            Result(
+                title=h.get("title") or "",
+                snippet=h.get("body") or "",
+                url=h["href"],
+                source=self.name,
+                date=None,
+            )
+            for h in hits or []
+            if h.get("href")
+        ]
+
+    async def search(self, query: str, max_results: int) -> List[Result]:
+        return await asyncio.to_thread(self._search, query, max_results)
+
+
+class SearxBackend:
+    """
+    Any SearXNG-compatible JSON endpoint (`/search?q=...&format=json`).
+
+    Also what tests and local runs point at a stub server.
+    """
+
+    name = "searx"
+
+    def __init__(self, base_url: str, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url.rstrip("/")
+        self.client = client
+
+    async def search(self, query: str, max_results: int) -> List[Result]:
+        client = self.client or get_client()
+        r = await client.get(
+            f"{self.base_url}/search",
+            params={"q": query, "format": "json", "language": "pt-BR"},
+        )
+        r.raise_for_status()
+        return [
+            Result(
+                title=h.get("title") or "",
+                snippet=h.get("content") or "",
+                url=h["url"],
+                source=self.name,
+                date=h.get("publishedDate"),
+            )
+            for h in r.json().get("results", [])[:max_results]
+            if h.get("url")
+        ]
+
+
+def get_search_backend(provider: Optional[str] = None) -> SearchBackend:
+    settings = load_settings()
+    provider = provider or settings.search_provider
+    if provider in ("searx", "searxng"):
+        return SearxBackend(settings.searx_url)
+    if provider == "duckduckgo":
+        return DuckDuckGoBackend()
+    raise ValueError(f"Unknown search provider: {provider}")
+
+
+def query_variants(window: Window) -> List[str]:
+    fri, sun = window
+    dates = f"{fri:%d/%m} a {sun:%d/%m}"
+    return [t.format(dates=dates) for t in QUERY_TEMPLATES]
+
+
+def _mentioned_dates(text: str, year: int) -> List[date]:
+    found = []
+    for day, month_num, month_name in DATE_TEXT_RE.findall(text):
+        month = int(month_num) if month_num else MONTHS.get(fold(month_name))
+        try:
+            found.append(date(year, month, int(day)))
+        except (TypeError, ValueError):
+            continue
+    return found
+
+
+def score_result(result: Result, window: Window) -> float:
+    """
+    Cheap relevance from the SERP entry alone: event vocabulary in the
+    title/snippet and dates that fall inside (or near) the window.
+    """
+    start, end = window[0].date(), window[1].date()
+    text = f"{result.title} {result.snippet}"
+    folded = fold(text)
+    score = sum(1.0 for term in EVENT_TERMS if term in folded)
+
+    mentioned = _mentioned_dates(text, start.year)
+    published = parse_date(result.date)
+    if published:
+        mentioned.append(published)
+    if any(start <= d <= end for d in mentioned):
+        score += 3.0
+    elif any(start - timedelta(days=7) <= d <= end for d in mentioned):
+        score += 1.0
+    elif mentioned:
+        # dated, but for some other week
+        score -= 2.0
+    return score
+
+
+def rank_results(results: Sequence[Result], window: Window) -> List[Result]:
+    seen = set()
+    unique = []
+    for r in results:
+        key = r.url.split("#")[0].rstrip("/")
+        host = urlsplit(key).hostname or ""
+        if key in seen or host.endswith(SKIP_DOMAINS):
+            continue
+        seen.add(key)
+        unique.append(r)
+    # stable sort keeps the engine's order between equal scores
+    return sorted(unique, key=lambda r: score_result(r, window), reverse=True)
+
+
+async def gather_until(aws, deadline: float) -> list:
+    """
+    Run `aws` concurrently; keep what finished by `deadline`, drop the rest.
+    Failures are logged and left out.
+    """
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    if not tasks:
+        return []
+    timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    results = []
+    for t in tasks:
+        if t not in done:
+            continue
+        if t.exception() is not None:
+            logger.warning("Web search task failed: %r", t.exception())
+        else:
+            results.append(t.result())
+    return results
+
+
+async def search_pages(
+    window: Window,
+    backend: Optional[SearchBackend] = None,
+    *,
+    top_n: int = TOP_PAGES,
+    deadline_s: float = SEARCH_DEADLINE_S,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[FetchResult]:
+    """
+    Search every query variant at once, pre-rank the merged SERP and fetch the
+    best `top_n` pages concurrently, all within `deadline_s` seconds.
+    """
+    backend = backend or get_search_backend()
+    deadline = asyncio.get_running_loop().time() + deadline_s
+
+    batches = await gather_until(
+        [backend.search(q, SEARCH_RESULTS_PER_QUERY) for q in query_variants(window)],
+        deadline,
+    )
+    ranked = rank_results([r for batch in batches for r in batch], window)
+
+    async def fetch(result: Result) -> FetchResult:
+        html = await fetch_cleaned(result.url, strip_head_scripts_styles, client=client)
+        return FetchResult(url=result.url, html=html, source="websearch")
+
+    return await gather_until([fetch(r) for r in ranked[:top_n]], deadline)
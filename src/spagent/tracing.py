@@ -0,0 +1,159 @@
+import contextvars
+import itertools
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_TRACE_DIR = "data/traces"
+
+# Numeric span attributes that are also summed into counters per span name
+COUNTED_ATTRS = (
+    "input_tokens",
+    "output_tokens",
+    "queue_wait_ms",
+    "retries",
+    "json_dropped",
+)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "spagent_span", default=None
+)
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "attrs", "start", "end", "error")
+
+    def __init__(self, name: str, parent_id: Optional[int], attrs: Dict[str, Any]):
+        self.id = next(_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "error": self.error,
+            **self.attrs,
+        }
+
+
+class Tracer:
+    """
+    In-process spans for plan / step / page / chunk / llm work.
+
+    The parent span travels in a contextvar, so spans opened inside tasks
+    created by asyncio.gather nest under the span that spawned them.
+    Finished spans are kept until `export` and aggregated into per-name
+    metrics (count, errors, total seconds, token and queue-wait counters).
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.metrics: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    @contextmanager
+    def span(self, name: str, current: bool = True, **attrs: Any) -> Iterator[Span]:
+        """
+        Time the block as a child of the current span. With `current=False`
+        the span does not become the parent of spans opened inside it: use
+        that around `yield`s in async generators, whose body is suspended
+        in (and may be closed from) the consumer's context.
+        """
+        parent = _current.get()
+        span = Span(name, parent.id if parent else None, attrs)
+        token = _current.set(span) if current else None
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if token is not None:
+                _current.reset(token)
+            span.end = time.time()
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        self.spans.append(span)
+        m = self.metrics[span.name]
+        m["count"] += 1
+        m["errors"] += span.error is not None
+        m["seconds"] += span.duration_ms / 1000
+        for key in COUNTED_ATTRS:
+            value = span.attrs.get(key)
+            if isinstance(value, (int, float)):
+                m[key] += value
+
+    def write_jsonl(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+                f.write("\n")
+        return path
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the aggregated span metrics."""
+        lines = [
+            "# TYPE spagent_span_total counter",
+            "# TYPE spagent_span_errors_total counter",
+            "# TYPE spagent_span_seconds_total counter",
+        ]
+        for name in sorted(self.metrics):
+            m = self.metrics[name]
+            label = f'{{span="{name}"}}'
+            lines.append(f"spagent_span_total{label} {int(m['count'])}")
+            lines.append(f"spagent_span_errors_total{label} {int(m['errors'])}")
+            lines.append(f"spagent_span_seconds_total{label} {m['seconds']:.6f}")
+            for key in COUNTED_ATTRS:
+                if key in m:
+                    lines.append(f"spagent_{key}_total{label} {m[key]:g}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, trace_dir: str | Path = DEFAULT_TRACE_DIR) -> Path:
+        """Append spans to `<trace_dir>/trace.jsonl`, snapshot metrics.prom."""
+        trace_dir = Path(trace_dir)
+        trace = self.write_jsonl(trace_dir / "trace.jsonl")
+        (trace_dir / "metrics.prom").write_text(self.prometheus(), encoding="utf-8")
+        self.spans.clear()
+        return trace
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, current: bool = True, **attrs: Any):
+    """Shortcut for `get_tracer().span(...)`."""
+    return _tracer.span(name, current, **attrs)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
@@ -1,32 +1,330 @@
 import json
 import re
-from typing import Any
+from types import UnionType
+from typing import Any, Type, TypeVar, Union, get_args, get_origin
 
+from pydantic import BaseModel, ValidationError
 
-def extract_first_json_block(text: str) -> str | None:
+T = TypeVar("T")
+
+
+class _Bad(Exception):
+    """A value that cannot be parsed; the enclosing container skips it."""
+
+
+class _Truncated(Exception):
+    """Output ended inside a value; carries the complete part, if any."""
+
+    def __init__(self, partial: Any = None):
+        self.partial = partial
+
+
+_DECODER = json.JSONDecoder(strict=False)
+_OPEN_RE = re.compile(r"[\[{]")
+# Containers that can open valid JSON. A failed raw_decode costs time
+# proportional to its offset (JSONDecodeError counts the lines before it),
+# so prose like "{n}" or "[1]" further down is not handed to the decoder
+_JSON_START_RE = re.compile(r'\{\s*["}]|\[\s*(?:[\]"{\[\-\d]|true\b|false\b|null\b)')
+# Deeper containers are dropped as damage instead of exhausting the stack
+MAX_DEPTH = 64
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_WORD_RE = re.compile(r"[A-Za-z_][\w-]*")
+_LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None,
+}  # fmt: skip
+
+
+class _Salvager:
     """
-    Attempts to extract the first {...} or [...] JSON block from text.
-    Useful when model adds explanations or truncates output.
+    Single-pass, forgiving JSON reader for model output.
+
+    Comments, trailing or missing commas and unquoted keys are tolerated;
+    an array item or object member that cannot be parsed is skipped up to
+    the next separator and reported in `dropped`, and output that stops
+    mid-value keeps every item that was complete. There is no regex
+    backtracking: intact values are decoded in one go, and only the
+    containers around the damage are walked character by character.
     """
-    if not text:
-        return None
 
-    # Remove markdown fences if present
-    text = re.sub(r"```(?:json)?", "", text, flags=re.IGNORECASE).strip()
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.depth = 0
+        self.dropped: list[str] = []
 
-    # Try object first
-    obj_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if obj_match:
-        return obj_match.group(0)
+    def _skip_ws(self) -> None:
+        text, n = self.text, len(self.text)
+        while self.pos < n:
+            ch = text[self.pos]
+            if ch in " \t\r\n":
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = n if end < 0 else end + 1
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                self.pos = n if end < 0 else end + 2
+            else:
+                return
 
-    # Try array fallback
-    arr_match = re.search(r"\[.*\]", text, re.DOTALL)
-    if arr_match:
-        return arr_match.group(0)
+    def _skip_value(self, close: str) -> None:
+        """Move to the next `,` or `close` outside strings and nesting."""
+        text, depth = self.text, 0
+        while self.pos < len(text):
+            ch = text[self.pos]
+            if ch == '"':
+                end = self._string_end(self.pos)
+                if end < 0:
+                    self.pos = len(text)
+                    return
+                self.pos = end
+            elif ch in "{[":
+                depth += 1
+            elif ch in "}]":
+                if depth == 0 and ch == close:
+                    return
+                depth = max(0, depth - 1)
+            elif ch == "," and depth == 0:
+                return
+            self.pos += 1
 
+    def _string_end(self, start: int) -> int:
+        """Index of the quote closing the string opened at `start`, or -1."""
+        end = start
+        while True:
+            end = self.text.find('"', end + 1)
+            if end < 0:
+                return -1
+            backslashes = 0
+            while self.text[end - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return end
+
+    def value(self) -> Any:
+        self._skip_ws()
+        if self.pos >= len(self.text):
+            raise _Truncated()
+        ch = self.text[self.pos]
+        if ch in "{[":
+            # Intact values go through the C decoder; only damaged
+            # containers are walked here
+            if _JSON_START_RE.match(self.text, self.pos):
+                try:
+                    value, self.pos = _DECODER.raw_decode(self.text, self.pos)
+                    return value
+                except (json.JSONDecodeError, RecursionError):
+                    pass
+            if self.depth >= MAX_DEPTH:
+                raise _Bad("nested too deep")
+            self.depth += 1
+            try:
+                return self._object() if ch == "{" else self._array()
+            finally:
+                self.depth -= 1
+        if ch == '"':
+            return self._string()
+        match = _NUMBER_RE.match(self.text, self.pos) or _WORD_RE.match(
+            self.text, self.pos
+        )
+        if match is None:
+            raise _Bad(f"unexpected {ch!r}")
+        self.pos = match.end()
+        if self.pos >= len(self.text):
+            raise _Truncated()
+        token = match.group(0)
+        if token in _LITERALS:
+            return _LITERALS[token]
+        if token[0] in "-0123456789":
+            return json.loads(token)
+        raise _Bad(f"unexpected {token!r}")
+
+    def _string(self) -> str:
+        end = self._string_end(self.pos)
+        if end < 0:
+            raise _Truncated()
+        raw, self.pos = self.text[self.pos : end + 1], end + 1
+        try:
+            # strict=False: models put raw newlines and tabs inside strings
+            return json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            raise _Bad(f"bad string {raw[:40]!r}")
+
+    def _array(self) -> list:
+        self.pos += 1
+        items: list = []
+        while True:
+            self._skip_ws()
+            if self.pos >= len(self.text):
+                raise _Truncated(items)
+            ch = self.text[self.pos]
+            if ch == "]":
+                self.pos += 1
+                return items
+            if ch == ",":
+                self.pos += 1
+                continue
+            mark = len(self.dropped)
+            try:
+                items.append(self.value())
+            except _Bad as e:
+                self.dropped.append(f"item {len(items)}: {e}")
+                self._skip_value("]")
+            except _Truncated:
+                # An item is all or nothing
+                del self.dropped[mark:]
+                self.dropped.append(f"item {len(items)}: truncated")
+                raise _Truncated(items)
+
+    def _key(self) -> str:
+        if self.text[self.pos] == '"':
+            return self._string()
+        match = _WORD_RE.match(self.text, self.pos)
+        if match is None:
+            raise _Bad(f"unexpected {self.text[self.pos]!r}")
+        self.pos = match.end()
+        return match.group(0)
+
+    def _object(self) -> dict:
+        self.pos += 1
+        obj: dict = {}
+        while True:
+            self._skip_ws()
+            if self.pos >= len(self.text):
+                raise _Truncated(obj)
+            ch = self.text[self.pos]
+            if ch == "}":
+                self.pos += 1
+                return obj
+            if ch == ",":
+                self.pos += 1
+                continue
+            key = None
+            try:
+                key = self._key()
+                self._skip_ws()
+                if self.pos >= len(self.text):
+                    raise _Truncated()
+                if self.text[self.pos] != ":":
+                    raise _Bad(f"no value for {key!r}")
+                self.pos += 1
+                obj[key] = self.value()
+            except _Bad as e:
+                self.dropped.append(f"{key or 'member'}: {e}")
+                self._skip_value("}")
+            except _Truncated as t:
+                # A cut-off list or record keeps its complete members
+                if key is not None and isinstance(t.partial, (dict, list)):
+                    obj[key] = t.partial
+                elif key is not None:
+                    self.dropped.append(f"{key}: truncated")
+                raise _Truncated(obj)
+
+
+def salvage_json(text: str) -> tuple[Any, list[str]]:
+    """
+    Recover the JSON value in model output, in a single pass.
+
+    Markdown fences and prose around the value are ignored, and damage
+    inside it (see `_Salvager`) costs only the affected items. Returns
+    `(value, dropped)`, where `dropped` describes what was skipped; `value`
+    is None when the output holds no JSON object or array.
+    """
+    text = text or ""
+    parser = _Salvager(text)
+    pos, fallback = 0, (None, [])
+    while True:
+        # Search stops at the first bracket of either kind, so prose full
+        # of brackets is still scanned once
+        found = _OPEN_RE.search(text, pos)
+        if found is None:
+            return fallback
+        start = found.start()
+        parser.pos, parser.depth, parser.dropped = start, 0, []
+        try:
+            value = parser.value()
+        except _Truncated as t:
+            value = t.partial
+            parser.dropped.append("output truncated")
+        # Prose like "see [1]" or "{n} events" before the real answer is
+        # passed over
+        if isinstance(value, dict):
+            answer = bool(value) or not parser.dropped
+        else:
+            answer = any(isinstance(v, (dict, list)) for v in value)
+        if answer:
+            return value, parser.dropped
+        if fallback[0] is None:
+            fallback = (value, parser.dropped)
+        pos = max(parser.pos, start + 1)
+
+
+def _list_item_model(annotation: Any) -> Type[BaseModel] | None:
+    """`Model` for fields annotated `List[Model]` or `Optional[List[Model]]`."""
+    if get_origin(annotation) in (Union, UnionType):
+        return next(filter(None, map(_list_item_model, get_args(annotation))), None)
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
     return None
 
 
+def _valid_items(
+    model: Type[BaseModel], items: list, dropped: list[str], field: str = "items"
+) -> list:
+    valid = []
+    for i, item in enumerate(items):
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            error = e.errors()[0]
+            where = ".".join(map(str, error["loc"]))
+            dropped.append(f"{field}[{i}]: {where} {error['msg']}".rstrip())
+    return valid
+
+
+def parse_model(text: str, schema: Type[T]) -> tuple[T, list[str]]:
+    """
+    Salvage model output and validate it against `schema` (a BaseModel or
+    `List[BaseModel]`).
+
+    Items of list fields that fail validation are dropped and reported
+    rather than failing the whole answer, so `dropped` lists everything
+    that was lost. Raises ValueError (pydantic's ValidationError included)
+    only when nothing usable is left.
+    """
+    data, dropped = salvage_json(text)
+    if data is None:
+        raise ValueError("No JSON found in model output")
+
+    if get_origin(schema) is list:
+        (model,) = get_args(schema)
+        if isinstance(data, dict) and len(data) == 1:
+            (data,) = data.values()
+        if not isinstance(data, list):
+            raise ValueError(f"Expected a JSON array, got {type(data).__name__}")
+        return _valid_items(model, data, dropped), dropped
+
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        raise TypeError("Unsupported schema type")
+
+    list_fields = {
+        name: item
+        for name, field in schema.model_fields.items()
+        if (item := _list_item_model(field.annotation))
+    }
+    # A bare array answers a schema with a single list field, e.g. EventList
+    if isinstance(data, list) and len(list_fields) == 1:
+        data = {next(iter(list_fields)): data}
+    if isinstance(data, dict):
+        for name, item in list_fields.items():
+            if isinstance(data.get(name), list):
+                data[name] = _valid_items(item, data[name], dropped, name)
+    return schema.model_validate(data), dropped
+
+
 def normalize_llm_json(text: str) -> dict:
     """
     Accepts:
@@ -34,6 +332,7 @@ def normalize_llm_json(text: str) -> dict:
       - valid JSON array
       - markdown wrapped JSON
       - partial junk before/after JSON
+      - truncated or damaged JSON (see `salvage_json`)
     Returns:
       - {'events': [...]}
     Raises:
@@ -43,23 +342,10 @@ def normalize_llm_json(text: str) -> dict:
     if not text or text.strip().lower() in ("null", ""):
         return {"events": []}
 
-    candidate = text.strip()
-
-    # 1️⃣ Try direct parse first (fast path)
-    try:
-        obj: Any = json.loads(candidate)
-    except json.JSONDecodeError:
-        # 2️⃣ Try extracting first JSON block
-        extracted = extract_first_json_block(candidate)
-        if not extracted:
-            raise ValueError("No JSON block found in model output")
-
-        try:
-            obj = json.loads(extracted)
-        except json.JSONDecodeError as e:
-            raise ValueError("Extracted JSON still invalid") from e
+    obj, _ = salvage_json(text)
+    if obj is None:
+        raise ValueError("No JSON block found in model output")
 
-    # 3️⃣ Normalize shape
     if isinstance(obj, list):
         return {"events": obj}
 
@@ -67,3 +353,72 @@ def normalize_llm_json(text: str) -> dict:
         return obj
 
     raise ValueError(f"Unexpected JSON shape: {type(obj)}")
+
+
+class IncrementalArrayParser:
+    """
+    Incrementally parses the first JSON array in a token stream, e.g. the
+    `[...]` in `{"events": [...]}` or a bare top-level array.
+
+    `feed()` returns every object whose closing brace has arrived; once the
+    array's closing bracket is seen, `done` is set and the caller can stop
+    generating.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.dropped = 0
+        self._in_array = False
+        self._in_string = False
+        self._escape = False
+        self._depth = 0
+        self._current: list[str] = []
+
+    def _string_char(self, ch: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+
+    def feed(self, text: str) -> list[Any]:
+        items = []
+        for ch in text:
+            if self.done:
+                break
+
+            if not self._in_array:
+                if self._in_string:
+                    self._string_char(ch)
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == "[":
+                    self._in_array = True
+                continue
+
+            if self._depth == 0:
+                # Between items: only an object start or the array end matter
+                if ch == "{":
+                    self._depth = 1
+                    self._current = ["{"]
+                elif ch == "]":
+                    self.done = True
+                continue
+
+            self._current.append(ch)
+            if self._in_string:
+                self._string_char(ch)
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(json.loads("".join(self._current)))
+                    except json.JSONDecodeError:
+                        self.dropped += 1
+                    self._current = []
+        return items
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+from src.spagent.agents.executor import Executor
+from src.spagent.schemas import Event, EventList, FetchResult, Plan, ValidationReport
+from src.spagent.tools.registry import LazyTools
+
+
+def _plan(*tools: str) -> Plan:
+    return Plan.model_validate(
+        {
+            "goal": "test",
+            "strategy": "test",
+            "steps": [{"tool": t, "description": t, "params": {}} for t in tools],
+            "success_criteria": {},
+        }
+    )
+
+
+def _fetcher(source: str, delay: float):
+    async def fetch() -> FetchResult:
+        await asyncio.sleep(delay)
+        return FetchResult(url=f"https://{source}", html=source, source=source)
+
+    return fetch
+
+
+async def _extract(page: FetchResult) -> EventList:
+    await asyncio.sleep(0.05)
+    return EventList(events=[Event(title=page.html, starts_at=None)])
+
+
+async def _passthrough(events):
+    return events
+
+
+def test_run_plan_fetches_concurrently():
+    tools = {
+        "fetch_sympla": _fetcher("sympla", 0.2),
+        "fetch_sesc": _fetcher("sesc", 0.2),
+        "fetch_sao_paulo_secreto": _fetcher("sao_paulo_secreto", 0.2),
+        "extract_events": _extract,
+        "dedupe_events": _passthrough,
+    }
+    plan = _plan(
+        "fetch_sympla",
+        "fetch_sesc",
+        "fetch_sao_paulo_secreto",
+        "extract_events",
+        "dedupe_events",
+    )
+    executor = Executor(tools=tools, max_concurrency=4)
+
+    start = time.perf_counter()
+    summary = asyncio.run(executor.run_plan(plan))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert summary.total_events == 3
+    assert summary.sources_used == ["sao_paulo_secreto", "sesc", "sympla"]
+    assert [r.tool for r in executor.step_results] == list(s.tool for s in plan.steps)
+    assert all(r.ok for r in executor.step_results)
+
+
+def test_run_plan_respects_concurrency_cap():
+    in_flight = 0
+    peak = 0
+
+    def tracked(source: str):
+        async def fetch() -> FetchResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return FetchResult(url=source, html="", source=source)
+
+        return fetch
+
+    tools = {
+        "fetch_sympla": tracked("a"),
+        "fetch_sesc": tracked("b"),
+        "fetch_eventim": tracked("c"),
+    }
+    executor = Executor(tools=tools, max_concurrency=1)
+    asyncio.run(executor.run_plan(_plan("fetch_sympla", "fetch_sesc", "fetch_eventim")))
+
+    assert peak == 1
+    assert len(executor.pages) == 3
+
+
+def test_run_plan_keeps_going_when_one_fetch_fails():
+    async def broken() -> FetchResult:
+        raise RuntimeError("boom")
+
+    tools = {
+        "fetch_sympla": broken,
+        "fetch_sesc": _fetcher("sesc", 0),
+        "extract_events": _extract,
+    }
+    executor = Executor(tools=tools)
+    summary = asyncio.run(
+        executor.run_plan(_plan("fetch_sympla", "fetch_sesc", "extract_events"))
+    )
+
+    assert summary.total_events == 1
+    fetch_result, _, extract_result = executor.step_results
+    assert not fetch_result.ok and fetch_result.notes == "boom"
+    assert extract_result.ok and extract_result.events_found == 1
+
+
+def test_validate_step_reports_rejections_in_notes():
+    async def validate(events, criteria, window):
+        kept = [e for e in events if e.title != "sympla"]
+        return ValidationReport(events=kept, rejected={"missing_title": 1})
+
+    tools = {
+        "fetch_sympla": _fetcher("sympla", 0),
+        "fetch_sesc": _fetcher("sesc", 0),
+        "extract_events": _extract,
+        "validate_events": validate,
+    }
+    executor = Executor(tools=tools)
+    summary = asyncio.run(
+        executor.run_plan(
+            _plan("fetch_sympla", "fetch_sesc", "extract_events", "validate_events")
+        )
+    )
+
+    assert summary.total_events == 1
+    assert executor.step_results[-1].notes == "kept 1/2; rejected: missing_title=1"
+
+
+def test_run_step_times_failures_and_counts_errors():
+    async def broken():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("down")
+
+    executor = Executor(tools={"fetch_sesc": broken})
+    step = _plan("fetch_sesc").steps[0]
+
+    result = asyncio.run(executor.run_step(step))
+
+    assert not result.ok
+    assert result.duration_ms >= 50
+    assert executor.summary().errors == 1
+
+
+def test_tools_that_fail_to_build_become_failed_steps():
+    def broken():
+        raise ImportError("langchain_ollama")
+
+    tools = LazyTools(
+        {
+            "fetch_sesc": lambda: _fetcher("sesc", 0),
+            "extract_events": broken,
+            "dedupe_events": lambda: _passthrough,
+        }
+    )
+    executor = Executor(tools=tools)
+
+    summary = asyncio.run(
+        executor.run_plan(_plan("fetch_sesc", "extract_events", "dedupe_events"))
+    )
+
+    extract = executor.step_results[1]
+    assert not extract.ok and extract.errors == 1
+    assert "langchain_ollama" in extract.notes
+    assert summary.sources_used == ["sesc"] and summary.errors == 1
+
+    retry = asyncio.run(executor.run_step(_plan("extract_events").steps[0]))
+    assert not retry.ok and retry.errors == 1
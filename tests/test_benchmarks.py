@@ -0,0 +1,33 @@
+import copy
+import json
+
+from benchmarks.pipeline import BASELINE, compare, run_benchmark
+
+
+def test_benchmark_counts_match_baseline():
+    report = run_benchmark(repeat=1, latency=0)
+    baseline = json.loads(BASELINE.read_text())
+
+    assert report["counts"] == baseline["counts"]
+    assert report["counts"]["llm_calls"] == report["counts"]["chunks"]
+    assert set(report["stages"]) == {
+        "cleanup",
+        "chunking",
+        "extraction",
+        "json_repair",
+        "dedupe",
+        "validation",
+    }
+
+
+def test_compare_flags_regressions():
+    baseline = json.loads(BASELINE.read_text())
+    report = copy.deepcopy(baseline)
+    assert compare(report, baseline) == []
+
+    report["stages"]["extraction"]["p95_ms"] *= 2
+    report["counts"]["llm_calls"] += 1
+    problems = compare(report, baseline)
+
+    assert any(p.startswith("extraction p95") for p in problems)
+    assert any(p.startswith("llm_calls") for p in problems)
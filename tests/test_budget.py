@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+
+from src.spagent.agents import executor as executor_module
+from src.spagent.agents.executor import Executor
+from src.spagent.budget import Budget, BudgetExceeded, use_budget
+from src.spagent.cache import ResponseCache
+from src.spagent.chains.extractor import ExtractorChain
+from src.spagent.llm import LLM
+from src.spagent.replay import ReplayChatModel, ReplayStore
+from src.spagent.schemas import Event, EventList, FetchResult, Plan, PlanStep
+
+
+def test_budget_charges_calls_and_tokens_until_a_limit():
+    budget = Budget(max_llm_calls=2, max_input_tokens=100)
+    budget.charge_llm_call(40)
+    budget.charge_llm_call(40)
+    with pytest.raises(BudgetExceeded):
+        budget.charge_llm_call(10)
+
+    assert budget.truncated and budget.reason == "max_llm_calls"
+    assert (
+        budget.describe() == "truncated by budget (max_llm_calls); skipped 1 llm_calls"
+    )
+    assert not Budget().limited
+
+
+def test_llm_call_is_cut_off_at_the_deadline():
+    llm = LLM(provider="ollama", model="test-budget-deadline")
+    llm.llm = FakeListChatModel(responses=["late"], sleep=1)
+    budget = Budget(deadline_s=0.1)
+
+    async def run():
+        start = time.perf_counter()
+        with use_budget(budget), pytest.raises(BudgetExceeded):
+            await llm.aask("s", "u")
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 0.5
+    assert budget.skipped == {"llm_calls": 1}
+
+
+def test_cache_hits_are_not_charged(tmp_path):
+    llm = LLM(provider="ollama", model="test-budget-cache")
+    llm.llm = FakeListChatModel(
+        responses=["live", "again"], cache=ResponseCache(tmp_path / "c.sqlite")
+    )
+    budget = Budget(max_llm_calls=1)
+
+    async def run():
+        with use_budget(budget):
+            return [await llm.aask("s", "u") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["live"] * 3
+    assert budget.llm_calls == 1 and not budget.truncated
+
+
+def test_only_replay_misses_are_charged(tmp_path):
+    llm = LLM(provider="ollama", model="test-budget-replay")
+    store = ReplayStore(tmp_path / "r.jsonl.gz")
+    llm.llm = ReplayChatModel(
+        store=store,
+        model="test-budget-replay",
+        inner=FakeListChatModel(responses=["a", "b"]),
+        on_miss="live",
+    )
+    budget = Budget(max_llm_calls=1)
+
+    async def run():
+        with use_budget(budget):
+            return [await llm.aask("s", u) for u in ("u", "u", "v")]
+
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(run())
+    store.close()
+    assert budget.llm_calls == 1 and budget.reason == "max_llm_calls"
+
+
+def test_extractor_keeps_events_from_chunks_within_budget(tmp_path, monkeypatch):
+    # The extractor imports the installed `spagent` package, so the budget
+    # has to come from there too
+    from spagent.budget import Budget, use_budget
+
+    monkeypatch.chdir(tmp_path)
+    extractor = ExtractorChain(model="test-budget-extract", max_concurrency=1)
+    extractor.llm.llm = FakeListChatModel(
+        responses=['{"events": [{"title": "a", "starts_at": null}]}'] * 2
+    )
+    page = FetchResult(url="https://x.test", html="a" * 6000, source="test")
+    budget = Budget(max_llm_calls=1)
+
+    async def run():
+        with use_budget(budget):
+            return await extractor.extract(page)
+
+    assert [e.title for e in asyncio.run(run()).events] == ["a"]
+    assert budget.skipped == {"llm_calls": 1}
+
+
+def _fetcher(source: str, delay: float):
+    async def fetch() -> FetchResult:
+        await asyncio.sleep(delay)
+        return FetchResult(url=f"https://{source}", html=source, source=source)
+
+    return fetch
+
+
+async def _extract(page: FetchResult) -> EventList:
+    return EventList(events=[Event(title=page.html, starts_at=None)])
+
+
+def test_run_plan_returns_partial_results_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(executor_module, "DEADLINE_GRACE_S", 0.0)
+    tools = {
+        "fetch_sesc": _fetcher("sesc", 0.01),
+        "fetch_sympla": _fetcher("sympla", 5),
+        "extract_events": _extract,
+        "websearch_events": _fetcher("web", 5),
+    }
+    plan = Plan.model_validate(
+        {
+            "goal": "test",
+            "strategy": "test",
+            "steps": [
+                {"tool": t, "description": t, "params": {}}
+                for t in ("fetch_sesc", "fetch_sympla", "extract_events")
+            ],
+            "success_criteria": {},
+        }
+    )
+    budget = Budget(deadline_s=0.2)
+    executor = Executor(tools=tools, budget=budget)
+
+    async def run():
+        with use_budget(budget):
+            summary = await executor.run_plan(plan)
+            await executor.run_step(PlanStep(tool="websearch_events", description="w"))
+            return summary
+
+    start = time.perf_counter()
+    summary = asyncio.run(run())
+
+    assert time.perf_counter() - start < 1
+    assert [e.title for e in executor.events] == ["sesc"]
+    assert summary.truncated and summary.errors == 0
+    assert summary.truncated_reason == "truncated by budget (deadline)"
+    assert [r.notes for r in executor.step_results] == [
+        None,
+        "cancelled by the run budget",
+        None,
+        "skipped by the run budget",
+    ]
@@ -0,0 +1,43 @@
+import time
+
+from langchain_core.language_models import FakeListChatModel
+
+from src.spagent.cache import ResponseCache
+
+
+def test_chat_model_responses_are_served_from_cache(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    assert llm.invoke("hello").content == "first"
+    assert llm.invoke("hello").content == "first"
+    assert llm.invoke("other").content == "second"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+    # a new process reading the same file still hits
+    reopened = ResponseCache(tmp_path / "cache.sqlite")
+    llm = FakeListChatModel(responses=["first", "second"], cache=reopened)
+    assert llm.invoke("other").content == "second"
+    assert reopened.stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=20)
+    cache.put("a", "x" * 8)
+    cache.put("b", "y" * 8)
+    cache.get("a")
+    cache.put("c", "z" * 8)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 8
+    assert cache.get("c") == "z" * 8
+
+
+def test_cache_expires_entries(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds=0.05)
+    cache.put("a", "value")
+    assert cache.get("a") == "value"
+    time.sleep(0.1)
+    assert cache.get("a") is None
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from src.spagent.tools.chunker import chunk_html, estimate_tokens
+
+FIXTURE = Path(__file__).resolve().parents[1] / "debug_html" / "sao_paulo_secreto.txt"
+
+
+def _cards(n: int) -> str:
+    card = (
+        '<article class="card"><h3>Show {i}</h3>'
+        "<time>2026-01-10</time><p>{body}</p></article>"
+    )
+    return (
+        "<main>"
+        + "".join(card.format(i=i, body="x" * 200) for i in range(n))
+        + "</main>"
+    )
+
+
+def test_chunk_html_keeps_cards_whole():
+    chunks = chunk_html(_cards(20), max_tokens=200)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.count("<article") == chunk.count("</article>")
+    assert sum(c.count("<article") for c in chunks) == 20
+
+
+def test_chunk_html_groups_heading_sections():
+    html = "".join(f"<h3>Event {i}</h3><p>{'y' * 300}</p>" for i in range(6))
+    chunks = chunk_html(html, max_tokens=100)
+
+    assert all(c.startswith("<h3>") for c in chunks)
+    assert len(chunks) == 6
+
+
+def test_chunk_html_respects_budget_on_real_page():
+    html = FIXTURE.read_text(encoding="utf-8")
+    chunks = chunk_html(html, max_tokens=750)
+
+    assert chunks == chunk_html(html, max_tokens=750)
+    assert all(estimate_tokens(c) <= 750 for c in chunks)
+    assert sum(c.count("<h3") for c in chunks) == html.count("<h3")
+
+
+def test_chunk_html_empty():
+    assert chunk_html("") == []
+    assert chunk_html("   \n") == []
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import time
+
+from src.spagent.cli import STARTUP_BUDGET_S
+from src.spagent.tools.registry import LazyTools
+
+HEAVY = ("langchain_core", "chromadb", "bs4", "httpx", "sentence_transformers")
+
+
+def test_cli_help_stays_within_startup_budget():
+    probe = (
+        "import sys, src.spagent.cli; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    imported = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert imported == ""
+
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.spagent.cli", "--help"],
+        capture_output=True,
+        check=True,
+    )
+    assert time.perf_counter() - start < STARTUP_BUDGET_S
+
+
+def test_tools_are_built_on_first_lookup():
+    built = []
+
+    def factory(name):
+        def build():
+            built.append(name)
+            return name.upper
+
+        return build
+
+    tools = LazyTools({"a": factory("a"), "b": factory("b")})
+
+    assert sorted(tools) == ["a", "b"] and "a" in tools
+    assert built == []
+    assert tools.get("a")() == "A"
+    assert tools.get("a") is tools["a"]
+    assert tools.get("missing") is None
+    assert built == ["a"]
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from src.spagent.tools.compact import (
+    compact_html,
+    minify_html,
+    reduction,
+    strip_noise,
+)
+
+FIXTURE = Path(__file__).resolve().parents[1] / "debug_html" / "sao_paulo_secreto.txt"
+
+PAGE = """
+<html><head><title>x</title><style>.a{}</style></head>
+<body class="page">
+  <!-- banner -->
+  <nav><a href="/home">Home</a></nav>
+  <script>track()</script>
+  <div class="card" data-id="1">
+    <h2 class="title"><a href="https://example.test/samba" target="_blank">Roda de samba</a></h2>
+    <span class="date"><time datetime="2026-01-10T20:00">sáb, 20h</time></span>
+    <ul><li>Grátis</li><li>Centro</li></ul>
+    <img src="x.png"><svg><path d="M0"/></svg>
+  </div>
+</body></html>
+"""
+
+
+def test_strip_noise_drops_head_scripts_and_comments():
+    html = strip_noise(PAGE)
+    assert "<head" not in html and "track()" not in html and "banner" not in html
+    assert "<path" not in html
+    assert "Roda de samba" in html
+
+
+def test_minify_keeps_structure_and_only_href_datetime():
+    html = minify_html(PAGE)
+    assert "class=" not in html and "target=" not in html and "<img" not in html
+    assert "Home" not in html  # navigation is dropped
+    assert '<a href="https://example.test/samba">Roda de samba</a>' in html
+    assert '<time datetime="2026-01-10T20:00">' in html
+    assert "<li>Grátis</li>" in html
+
+
+def test_compact_renders_headings_links_times_and_lists():
+    text = compact_html(minify_html(PAGE))
+    assert text.splitlines() == [
+        "## [Roda de samba](https://example.test/samba)",
+        "sáb, 20h (2026-01-10T20:00)",
+        "- Grátis",
+        "- Centro",
+    ]
+
+
+def test_compact_cuts_most_tokens_on_captured_page():
+    html = FIXTURE.read_text(encoding="utf-8")
+    assert reduction(html, compact_html(minify_html(strip_noise(html)))) > 0.5
@@ -0,0 +1,55 @@
+import time
+
+from src.spagent.schemas import Event
+from src.spagent.tools.dedupe import dedupe
+
+
+def test_dedupe_merges_cross_source_variants():
+    events = [
+        Event(
+            title="Roda de Samba da Vela",
+            starts_at="2026-01-10T20:00",
+            venue="Casa de Cultura Santo Amaro",
+            link="https://www.sympla.com.br/samba-da-vela",
+            source_name="sympla",
+        ),
+        Event(
+            title="RODA DE SAMBA DA VELA!",
+            starts_at="2026-01-10",
+            venue="Casa de Cultura de Sto. Amaro",
+            price="R$ 20",
+            category="música",
+            source_name="sao_paulo_secreto",
+        ),
+        Event(title="Exposição Cazuza Exagerado", starts_at="2026-01-10"),
+    ]
+
+    merged, other = dedupe(events)
+
+    assert other.title == "Exposição Cazuza Exagerado"
+    assert merged.starts_at == "2026-01-10T20:00"
+    assert merged.price == "R$ 20"
+    assert merged.category == "música"
+    assert merged.link == "https://www.sympla.com.br/samba-da-vela"
+
+
+def test_dedupe_keeps_different_dates_and_venues_apart():
+    events = [
+        Event(title="Roda de Samba", starts_at="2026-01-10", venue="Bar do Zé"),
+        Event(title="Roda de Samba", starts_at="2026-01-11", venue="Bar do Zé"),
+        Event(title="Roda de Samba", starts_at="2026-01-10", venue="Teatro Municipal"),
+    ]
+
+    assert len(dedupe(events)) == 3
+
+
+def test_dedupe_scales_linearly():
+    events = [
+        Event(title=f"Show {i} banda {i * 7}", starts_at=f"2026-01-{i % 28 + 1:02d}")
+        for i in range(20000)
+    ]
+    start = time.perf_counter()
+    result = dedupe(events + events[:5000])
+
+    assert len(result) == 20000
+    assert time.perf_counter() - start < 20
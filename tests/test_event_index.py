@@ -0,0 +1,65 @@
+from src.spagent.retrieval.event_index import EventIndex
+from src.spagent.schemas import Event
+
+VOCAB = ["samba", "roda", "jazz", "teatro", "exposicao", "museu", "pagode"]
+
+
+class BagOfWords:
+    """Deterministic embedder: one dimension per vocabulary word."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, batch_size=32):
+        self.encoded += len(texts)
+        return [
+            [float(word in text.lower()) for word in VOCAB] + [0.01] for text in texts
+        ]
+
+
+def _events():
+    return [
+        Event(title="Exposição no museu", starts_at="2026-01-10", category="exposicao"),
+        Event(title="Roda de samba", starts_at="2026-01-10", category="samba"),
+        Event(title="Noite de jazz", starts_at="2026-01-11"),
+    ]
+
+
+def test_index_embeds_only_new_or_changed_events(tmp_path):
+    embedder = BagOfWords()
+    index = EventIndex(persist_path=str(tmp_path), embedder=embedder)
+    events = _events()
+
+    assert index.upsert(events) == 3
+    assert index.upsert(events) == 0
+
+    events[2].venue = "Blue Note"
+    assert index.upsert(events) == 1
+    assert embedder.encoded == 4
+
+    reopened = EventIndex(persist_path=str(tmp_path), embedder=BagOfWords())
+    assert reopened.upsert(events) == 0
+
+
+def test_index_ranks_and_filters_by_focus(tmp_path):
+    index = EventIndex(persist_path=str(tmp_path), embedder=BagOfWords())
+    events = _events()
+    index.upsert(events)
+
+    ranked = index.rank(events, "samba")
+    assert [e.title for e in ranked] == ["Roda de samba"]
+
+    (best, score), *_ = index.query("samba", k=2)
+    assert best.title == "Roda de samba" and score > 0.5
+
+
+def test_index_replaces_event_whose_venue_changed(tmp_path):
+    index = EventIndex(persist_path=str(tmp_path), embedder=BagOfWords())
+    events = _events()
+    index.upsert(events)
+
+    events[1].venue = "Casa de Francisca"
+    assert index.upsert(events) == 1
+    assert index.collection.count() == 3
+    (best, _), *_ = index.query("samba", k=1)
+    assert best.venue == "Casa de Francisca"
@@ -0,0 +1,305 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessageChunk
+
+from src.spagent.chains.chunk_store import ChunkStore
+from src.spagent.chains.extractor import ExtractorChain
+from src.spagent.schemas import Event, EventList, FetchResult
+from src.spagent.snapshots import SnapshotStore
+
+
+class FakeChain:
+    """Stands in for `EXTRACTOR_PROMPT | llm | parser`."""
+
+    def __init__(self, delay: float = 0.05, fail_on: str | None = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, inputs: dict) -> EventList:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            chunk = inputs["html"]
+            if self.fail_on and self.fail_on in chunk:
+                raise ValueError("bad chunk")
+            return EventList(events=[Event(title=chunk[:1], starts_at=None)])
+        finally:
+            self.in_flight -= 1
+
+
+def _extractor(chain: FakeChain, **kwargs) -> ExtractorChain:
+    extractor = ExtractorChain(**kwargs)
+    extractor.chain = chain
+    return extractor
+
+
+def _page(html: str) -> FetchResult:
+    return FetchResult(url="https://example.test", html=html, source="test")
+
+
+def test_extract_runs_chunks_concurrently_in_page_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chain = FakeChain(delay=0.1)
+    extractor = _extractor(chain, max_concurrency=5)
+    html = "".join(c * 3000 for c in "abcde")
+
+    start = time.perf_counter()
+    result = asyncio.run(extractor.extract(_page(html)))
+    elapsed = time.perf_counter() - start
+
+    assert [e.title for e in result.events] == list("abcde")
+    assert chain.peak == 5
+    assert elapsed < 0.4
+
+
+def test_extract_respects_concurrency_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chain = FakeChain(delay=0.01)
+    extractor = _extractor(chain, max_concurrency=2)
+
+    asyncio.run(extractor.extract(_page("x" * 3000 * 6)))
+
+    assert chain.peak == 2
+
+
+def test_extract_survives_failed_and_timed_out_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chain = FakeChain(delay=0.01, fail_on="b")
+    extractor = _extractor(chain, max_concurrency=3)
+    result = asyncio.run(extractor.extract(_page("a" * 3000 + "b" * 3000 + "c")))
+    assert [e.title for e in result.events] == ["a", "c"]
+
+    slow = FakeChain(delay=1)
+    extractor = _extractor(slow, chunk_timeout=0.05)
+    result = asyncio.run(extractor.extract(_page("a" * 10)))
+    assert result.events == []
+
+
+def test_extract_reuses_unchanged_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chain = FakeChain(delay=0)
+    calls = []
+    original = chain.ainvoke
+
+    async def counting(inputs):
+        calls.append(inputs["html"][:1])
+        return await original(inputs)
+
+    chain.ainvoke = counting
+    extractor = _extractor(chain, chunk_store=ChunkStore(tmp_path / "chunks"))
+
+    first = asyncio.run(extractor.extract(_page("a" * 3000 + "b" * 3000)))
+    second = asyncio.run(extractor.extract(_page("a" * 3000 + "c" * 3000)))
+
+    assert [e.title for e in first.events] == ["a", "b"]
+    assert [e.title for e in second.events] == ["a", "c"]
+    assert calls == ["a", "b", "c"]
+    assert extractor.stats == {
+        "chunks": 4,
+        "chunks_reused": 1,
+        "llm_calls": 3,
+        "tokens_raw": 3000,
+        "tokens_sent": 3002,
+    }
+
+    # Results from another model (or cascade) are not reused
+    other = _extractor(
+        chain, model="other-model", chunk_store=ChunkStore(tmp_path / "chunks")
+    )
+    asyncio.run(other.extract(_page("a" * 3000 + "c" * 3000)))
+    assert calls == ["a", "b", "c", "a", "c"]
+
+
+def test_extract_snapshots_page_instead_of_dumping_it(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SnapshotStore(tmp_path / "snapshots")
+    extractor = _extractor(FakeChain(delay=0), snapshots=store)
+
+    asyncio.run(extractor.extract(_page("a" * 10)))
+
+    assert store.read(store.latest("test")) == "a" * 10
+    assert not (tmp_path / "debug_html").exists()
+
+
+def test_extract_finishes_the_snapshot_when_extraction_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SnapshotStore(tmp_path / "snapshots")
+    extractor = _extractor(FakeChain(delay=0), snapshots=store)
+
+    async def broken(page):
+        await asyncio.sleep(0)
+        raise RuntimeError("chunker crashed")
+
+    monkeypatch.setattr(extractor, "_extract_page", broken)
+
+    async def run():
+        try:
+            await extractor.extract(_page("a" * 10))
+        except RuntimeError:
+            return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert store.read(store.latest("test")) == "a" * 10
+
+
+class StreamingChat:
+    """Chat model stub whose astream yields a fixed token sequence."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.consumed = 0
+
+    async def astream(self, messages):
+        for token in self.tokens:
+            self.consumed += 1
+            yield AIMessageChunk(content=token)
+
+
+def test_stream_chunk_yields_events_and_stops_early(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tokens = [
+        '{"events": [{"title": "Samba",',
+        ' "starts_at": "2026-01-10"}, {"title"',
+        ': "Jazz", "starts_at": null}',
+        "]}",
+        " Hope this helps!",
+        " More chatter",
+    ]
+    chat = StreamingChat(tokens)
+    extractor = ExtractorChain(stream=True)
+    extractor.llm.llm = chat
+
+    async def run():
+        seen = []
+        async for event in extractor.stream_chunk(_page("<p>x</p>"), "<p>x</p>"):
+            seen.append((event.title, chat.consumed))
+        return seen
+
+    assert asyncio.run(run()) == [("Samba", 2), ("Jazz", 3)]
+    assert chat.consumed == 4
+
+    result = asyncio.run(extractor.extract(_page("<p>x</p>")))
+    assert [e.title for e in result.events] == ["Samba", "Jazz"]
+    assert result.events[0].source_url == "https://example.test"
+
+
+class FixedChain:
+    def __init__(self, *titles: str, fail: bool = False):
+        self.titles = titles
+        self.fail = fail
+        self.calls = 0
+
+    async def ainvoke(self, inputs: dict) -> EventList:
+        self.calls += 1
+        if self.fail:
+            raise ValueError("unusable output")
+        return EventList(
+            events=[Event(title=t, starts_at="2026-01-10") for t in self.titles]
+        )
+
+
+CARDS = "\n".join(
+    f"## {title}\n10/01 às 20h - R$ 40" for title in ("Samba", "Jazz", "Forró")
+)
+
+
+def _cascade(small: FixedChain, large: FixedChain) -> ExtractorChain:
+    extractor = _extractor(small, escalate_to="large-model")
+    extractor.escalation.chain = large
+    return extractor
+
+
+def test_cascade_escalates_chunks_with_too_few_events(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    small, large = FixedChain("Samba"), FixedChain("Jazz", "Forró")
+    extractor = _cascade(small, large)
+
+    result = asyncio.run(extractor.extract(_page(CARDS)))
+
+    assert [e.title for e in result.events] == ["Samba", "Jazz", "Forró"]
+    assert all(e.source_name == "test" for e in result.events)
+    report = extractor.cascade_report()
+    assert report["calls"] == {"phi3:mini": 1, "large-model": 1}
+    assert report["escalation_rate"] == 1.0
+    assert report["reasons"] == {"too_few": 1}
+
+    # A later run on the same (long-lived) extractor reports only itself
+    start = extractor.cascade_counts()
+    asyncio.run(extractor.extract(_page(CARDS)))
+    assert extractor.cascade_report(since=start) == {
+        "calls": {"phi3:mini": 1, "large-model": 1},
+        "escalated": 1,
+        "escalation_rate": 1.0,
+        "reasons": {"too_few": 1},
+    }
+    assert extractor.cascade_report()["escalated"] == 2
+
+
+def test_cascade_trusts_plausible_answers_and_recovers_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    extractor = _cascade(FixedChain("Samba", "Jazz", "Forró"), FixedChain("x"))
+    asyncio.run(extractor.extract(_page(CARDS)))
+    assert extractor.cascade_report()["escalated"] == 0
+
+    invented = [
+        Event(title=t, starts_at="2026-01-10") for t in ("Samba", "Frevo", "Coco")
+    ]
+    assert extractor._escalation_reason(CARDS, invented) == "low_confidence"
+    assert extractor._escalation_reason(CARDS, []) == "too_few"
+
+    failing = _cascade(FixedChain(fail=True), FixedChain("Samba", "Jazz", "Forró"))
+    result = asyncio.run(failing.extract(_page(CARDS)))
+    assert [e.title for e in result.events] == ["Samba", "Jazz", "Forró"]
+    assert failing.escalated == {"failed": 1}
+
+
+def test_cascade_keeps_the_small_answer_when_the_large_model_fails(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    extractor = _cascade(FixedChain("Samba"), FixedChain(fail=True))
+
+    result = asyncio.run(extractor.extract(_page(CARDS)))
+
+    assert [e.title for e in result.events] == ["Samba"]
+    assert extractor.cascade_report()["reasons"] == {"too_few": 1}
+
+
+def test_cascade_merge_keeps_page_order_and_recurring_dates():
+    small = [
+        Event(title="Samba", starts_at="2026-01-10"),
+        Event(title="Samba", starts_at="2026-01-11"),
+        Event(title="Jazz", starts_at="2026-01-10"),
+    ]
+    large = [
+        Event(title="Forró", starts_at="2026-01-10"),
+        Event(title="Samba", starts_at="10/01/2026"),
+    ]
+
+    merged = ExtractorChain._merge(CARDS, small, large)
+
+    assert [(e.title, e.starts_at) for e in merged] == [
+        ("Samba", "10/01/2026"),
+        ("Samba", "2026-01-11"),
+        ("Jazz", "2026-01-10"),
+        ("Forró", "2026-01-10"),
+    ]
+
+
+def test_cascade_merge_drops_invalid_and_undated_duplicates():
+    large = [Event(title="Samba", starts_at="2026-01-10T20:00")]
+    small = [
+        Event(title="Samba", starts_at="sábado à noite"),
+        Event(title="Samba", starts_at=None, date_text="sábado à noite"),
+        Event(title="", starts_at="2026-01-10"),
+        Event(title="Jazz", starts_at="quinta"),
+    ]
+    assert ExtractorChain._merge(CARDS, small, large) == large
+
+    undated = [Event(title="Samba", starts_at=None, date_text="sábado")]
+    merged = ExtractorChain._merge(CARDS, small[:1] + [large[0]], undated)
+    assert merged == undated
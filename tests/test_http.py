@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+
+from src.spagent.tools.http import HttpCache, fetch_cleaned
+
+URL = "https://example.test/agenda"
+
+
+def test_fetch_cleaned_uses_conditional_requests(tmp_path):
+    seen_headers = []
+    cleaned_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<p>raw</p>", headers={"ETag": '"v1"'})
+
+    def clean(html: str) -> str:
+        cleaned_calls.append(html)
+        return html.upper()
+
+    async def run():
+        cache = HttpCache(tmp_path)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            first = await fetch_cleaned(URL, clean, client=c, cache=cache)
+            second = await fetch_cleaned(URL, clean, client=c, cache=cache)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == "<P>RAW</P>"
+    assert "if-none-match" not in seen_headers[0]
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    assert cleaned_calls == ["<p>raw</p>"]
+
+
+def test_fetch_cleaned_refreshes_changed_pages(tmp_path):
+    versions = iter(["<p>old</p>", "<p>new</p>"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, text=next(versions), headers={"Last-Modified": "Fri, 09 Jan 2026"}
+        )
+
+    async def run():
+        cache = HttpCache(tmp_path)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            await fetch_cleaned(URL, str.strip, client=c, cache=cache)
+            return await fetch_cleaned(URL, str.strip, client=c, cache=cache)
+
+    assert asyncio.run(run()) == "<p>new</p>"
+
+
+def test_fetch_cleaned_ignores_pages_from_another_cleaner(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=" <p>raw</p> ", headers={"ETag": '"v1"'})
+
+    async def run():
+        cache = HttpCache(tmp_path)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            await fetch_cleaned(URL, str.upper, client=c, cache=cache)
+            return await fetch_cleaned(URL, str.strip, client=c, cache=cache)
+
+    assert asyncio.run(run()) == "<p>raw</p>"
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from langchain_core.language_models import FakeListChatModel
+
+from src.spagent.llm import LLM, set_model_concurrency
+from src.spagent.schemas import EventList
+from src.spagent.tracing import current_span, get_tracer, span
+
+
+def _llm(model: str, responses, sleep: float = 0) -> LLM:
+    llm = LLM(provider="ollama", model=model)
+    llm.llm = FakeListChatModel(responses=responses, sleep=sleep)
+    return llm
+
+
+def test_llm_json_does_not_block_the_event_loop():
+    llm = _llm("test-nonblocking", ['{"events": []}'] * 4, sleep=0.1)
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(llm.json(system="s", user="u", schema=EventList) for _ in range(4))
+        )
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 0.3
+
+
+def test_model_concurrency_limit_is_shared_across_clients():
+    set_model_concurrency("test-limited", 1)
+    planner = _llm("test-limited", ["a"], sleep=0.05)
+    extractor = _llm("test-limited", ["b"], sleep=0.05)
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(
+            planner.aask("s", "u"),
+            extractor.aask("s", "u"),
+            planner.aask("s", "u"),
+        )
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_llm_streams_tokens():
+    llm = _llm("test-stream", ["hello"])
+
+    async def run():
+        return [token async for token in llm.astream("s", "u")]
+
+    assert "".join(asyncio.run(run())) == "hello"
+
+
+def test_llm_stream_span_does_not_leak_into_the_consumer():
+    llm = _llm("test-stream-span", ["hello"])
+
+    async def run():
+        with span("consumer") as outer:
+            async for _ in llm.astream("s", "u"):
+                assert current_span() is outer
+                with span("per-token"):
+                    pass
+        return outer
+
+    outer = asyncio.run(run())
+    spans = [s for s in get_tracer().spans if s.parent_id == outer.id]
+    assert {s.name for s in spans} == {"llm", "per-token"}
+
+
+def test_llm_json_salvages_truncated_output_without_retrying():
+    llm = _llm(
+        "test-salvage",
+        ['{"events": [{"title": "a", "starts_at": null}, {"title": "b", "sta', "{}"],
+    )
+    result = asyncio.run(llm.json(system="s", user="u", schema=EventList))
+
+    assert [e.title for e in result.events] == ["a"]
+    assert llm.llm.i == 1  # the second response was never requested
+
+
+def test_llm_json_retries_only_when_nothing_is_salvageable():
+    llm = _llm("test-retry", ["Sorry, I can't.", '[{"title": "a", "starts_at": null}]'])
+    result = asyncio.run(llm.json(system="s", user="u", schema=EventList))
+
+    assert [e.title for e in result.events] == ["a"]
@@ -0,0 +1,105 @@
+import asyncio
+
+from src.spagent.agents.plan_cache import PlanCache
+from src.spagent.agents.plan_validator import default_plan, validate_plan
+from src.spagent.agents.planner import Planner
+from src.spagent.schemas import Plan
+
+TOOLS = [
+    "fetch_sympla",
+    "fetch_sesc",
+    "fetch_sao_paulo_secreto",
+    "extract_events",
+    "dedupe_events",
+    "validate_events",
+    "websearch_events",
+]
+
+
+def _plan(*steps, fallback=None) -> Plan:
+    return Plan.model_validate(
+        {
+            "goal": "Find events between 2026-01-09 and 2026-01-11",
+            "strategy": "s",
+            "steps": [{"tool": t, "description": t, "params": p} for t, p in steps],
+            "success_criteria": {},
+            "fallback": fallback,
+        }
+    )
+
+
+class FakeLLM:
+    def __init__(self, plan: Plan | None = None):
+        self.plan = plan
+        self.calls = 0
+
+    async def json(self, **kwargs):
+        self.calls += 1
+        if self.plan is None:
+            raise RuntimeError("unparseable")
+        return self.plan
+
+
+def test_validate_plan_repairs_pipeline_order():
+    plan = _plan(
+        ("validate_events", {"city": "SP"}),
+        ("fetch_sympla", {}),
+        ("fetch_eventim", {}),
+        ("extract_events", {}),
+        ("dedupe_events", {}),
+        ("fetch_sympla", {}),
+    )
+
+    repaired, repairs = validate_plan(plan, TOOLS)
+
+    assert [s.tool for s in repaired.steps] == [
+        "fetch_sympla",
+        "fetch_sao_paulo_secreto",
+        "extract_events",
+        "dedupe_events",
+        "validate_events",
+    ]
+    assert all(s.params == {} for s in repaired.steps)
+    assert any("fetch_eventim" in r for r in repairs)
+    assert any("reordered" in r for r in repairs)
+
+
+def test_validate_plan_keeps_valid_plan_untouched():
+    plan = default_plan("goal", TOOLS)
+    repaired, repairs = validate_plan(plan, TOOLS)
+
+    assert repairs == []
+    assert repaired == plan
+
+
+def test_planner_caches_validated_plans_across_weekends(tmp_path):
+    llm = FakeLLM(_plan(("fetch_sympla", {}), ("fetch_sesc", {})))
+    planner = Planner(llm, tools=TOOLS, cache=PlanCache(tmp_path / "plans.json"))
+
+    first = asyncio.run(
+        planner.plan("Eventos de 2026-01-09 a 2026-01-11 em São Paulo;")
+    )
+    assert first.steps[-1].tool == "extract_events"
+
+    reloaded = Planner(llm, tools=TOOLS, cache=PlanCache(tmp_path / "plans.json"))
+    second = asyncio.run(
+        reloaded.plan("eventos de 2026-01-16 a 2026-01-18 em Sao Paulo")
+    )
+
+    assert llm.calls == 1
+    assert second.steps == first.steps
+    assert second.goal == "Find events between 2026-01-16 and 2026-01-18"
+
+
+def test_planner_falls_back_to_default_plan():
+    llm = FakeLLM(None)
+    plan = asyncio.run(Planner(llm, tools=TOOLS).plan("goal"))
+    assert [s.tool for s in plan.steps][:3] == [
+        "fetch_sao_paulo_secreto",
+        "fetch_sesc",
+        "fetch_sympla",
+    ]
+
+    skipped = Planner(llm, tools=TOOLS, use_llm=False)
+    asyncio.run(skipped.plan("goal"))
+    assert llm.calls == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+
+from src.spagent.llm import LLM
+from src.spagent.replay import ReplayChatModel, ReplayMiss, ReplayStore
+
+
+def _llm(chat) -> LLM:
+    llm = LLM(provider="ollama", model="test-replay")
+    llm.llm = chat
+    return llm
+
+
+def test_recorded_responses_replay_without_the_live_model(tmp_path):
+    path = tmp_path / "llm.jsonl.gz"
+    live = FakeListChatModel(responses=["first", "second"])
+    recorder = _llm(
+        ReplayChatModel(
+            store=ReplayStore(path), model="test-replay", inner=live, record=True
+        )
+    )
+
+    async def record():
+        return [await recorder.aask("s", "one"), await recorder.aask("s", "two")]
+
+    assert asyncio.run(record()) == ["first", "second"]
+
+    store = ReplayStore(path)
+    replayer = _llm(ReplayChatModel(store=store, model="test-replay"))
+
+    async def replay():
+        return [await replayer.aask("s", "two"), await replayer.aask("s", "one")]
+
+    assert asyncio.run(replay()) == ["second", "first"]
+    assert store.hits == 2
+
+    with pytest.raises(ReplayMiss):
+        asyncio.run(replayer.aask("s", "three"))
+
+
+def test_replay_misses_can_fall_through_to_the_live_model(tmp_path):
+    path = tmp_path / "llm.jsonl.gz"
+    live = FakeListChatModel(responses=["live"])
+    replayer = _llm(
+        ReplayChatModel(
+            store=ReplayStore(path), model="test-replay", inner=live, on_miss="live"
+        )
+    )
+
+    assert asyncio.run(replayer.aask("s", "new")) == "live"
+    assert len(ReplayStore(path)) == 1
+
+
+def test_session_writes_one_gzip_member_and_repairs_unclosed_ones(tmp_path):
+    path = tmp_path / "llm.jsonl.gz"
+    store = ReplayStore(path)
+    for n in range(20):
+        store.put(f"k{n}", "Roda de samba no Centro " * 20)
+    store.close()
+    assert path.read_bytes().count(b"\x1f\x8b\x08") == 1
+    assert path.stat().st_size < 1000
+
+    killed = ReplayStore(path)
+    killed.put("k20", "never closed")
+    killed._session_lock.close()  # the process died; its member is unfinished
+    resumed = ReplayStore(path)
+    assert len(resumed) == 21
+    resumed.put("k21", "after restart")
+    resumed.close()
+
+    assert len(ReplayStore(path)) == 22
+
+
+def test_file_being_recorded_is_not_rewritten_under_the_live_session(tmp_path):
+    path = tmp_path / "llm.jsonl.gz"
+    live = ReplayStore(path)
+    live.put("a", "first")
+    inode = path.stat().st_ino
+
+    other = ReplayStore(path)
+    assert len(other) == 1
+    other.put("b", "second")
+    other.close()
+    live.close()
+
+    assert path.stat().st_ino == inode
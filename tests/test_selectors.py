@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from src.spagent.chains.selectors import SelectorExtractor, load_sources
+from src.spagent.schemas import FetchResult
+
+SOURCES = Path(__file__).resolve().parents[1] / "config" / "sources.yaml"
+SESC_URL = "https://www.sescsp.org.br/programacao/"
+
+CARD = """
+<article class="card-programacao">
+  <a href="/programacao/{slug}/"><h3>{title}</h3></a>
+  <time datetime="2026-01-10T20:00">10 jan, 20h</time>
+</article>
+"""
+
+
+def _page(html: str, url: str = SESC_URL) -> FetchResult:
+    return FetchResult(url=url, html=html, source="sesc")
+
+
+def test_selectors_extract_configured_source():
+    extractor = SelectorExtractor(load_sources(SOURCES))
+    html = "<main>" + CARD.format(slug="samba", title="Roda de Samba") + "</main>"
+
+    events = extractor.extract(_page(html))
+
+    assert len(events) == 1
+    event = events[0]
+    assert event.title == "Roda de Samba"
+    assert event.starts_at == "2026-01-10T20:00"
+    assert event.date_text == "10 jan, 20h"
+    assert event.link == "https://www.sescsp.org.br/programacao/samba/"
+    assert event.source_url == SESC_URL
+
+
+def test_selectors_fall_back_when_markup_drifts():
+    extractor = SelectorExtractor(load_sources(SOURCES))
+
+    assert extractor.extract(_page("<div class='new-layout'>nada</div>")) is None
+    broken = CARD.format(slug="x", title="") * 3
+    assert extractor.extract(_page(broken)) is None
+
+
+def test_selectors_ignore_sources_without_selectors():
+    extractor = SelectorExtractor(load_sources(SOURCES))
+    page = _page(
+        CARD.format(slug="x", title="Show"),
+        url="https://www.eventbrite.com/d/brazil--s%C3%A3o-paulo/events/",
+    )
+    page.source = "eventbrite"
+
+    assert extractor.extract(page) is None
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from src.spagent.server import WeekendService, make_handler
+from src.spagent.tools.calendar import weekend_of
+
+WEEKEND = weekend_of("2026-01-07")
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.runs = 0
+
+    async def batch_run(self, foci, weekends, mode="serp"):
+        self.runs += 1
+        await asyncio.sleep(0.05)
+        for focus in foci:
+            yield {
+                "focus": focus,
+                "weekend_start": weekends[0][0].date().isoformat(),
+                "events": [{"title": f"{focus} #{self.runs}"}],
+            }
+
+
+def test_concurrent_misses_share_one_run(tmp_path):
+    orch = FakeOrchestrator()
+    service = WeekendService(orch, ["samba"], path=tmp_path / "r.json")
+
+    async def run():
+        return await asyncio.gather(*(service.get("samba", WEEKEND) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert orch.runs == 1
+    assert all(r["events"] == [{"title": "samba #1"}] for r in results)
+    # persisted for the next process
+    reloaded = WeekendService(orch, ["samba"], path=tmp_path / "r.json")
+    assert ("samba", "2026-01-09") in reloaded.results
+
+
+def test_stale_results_are_served_while_refreshing(tmp_path):
+    orch = FakeOrchestrator()
+    service = WeekendService(orch, ["samba"], path=tmp_path / "r.json", fresh_s=0)
+
+    async def run():
+        await service.get("samba", WEEKEND)
+        stale = await service.get("samba", WEEKEND)
+        await asyncio.sleep(0.1)
+        refreshed = service.results[("samba", "2026-01-09")]
+        return stale, refreshed
+
+    stale, refreshed = asyncio.run(run())
+
+    assert stale["stale"] and stale["events"] == [{"title": "samba #1"}]
+    assert refreshed["events"] == [{"title": "samba #2"}]
+    assert service.stats["stale_hits"] == 1
+
+
+def test_http_endpoint(tmp_path):
+    service = WeekendService(FakeOrchestrator(), ["samba"], path=tmp_path / "r.json")
+
+    async def request(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        status = (await reader.readline()).split()[1]
+        body = (await reader.read()).split(b"\r\n\r\n", 1)[1]
+        writer.close()
+        return int(status), json.loads(body)
+
+    async def run():
+        server = await asyncio.start_server(make_handler(service), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return (
+                await request(port, "/events?focus=teatro&weekend=2026-01-07"),
+                await request(port, "/events?weekend=not-a-date"),
+                await request(port, "/nope"),
+            )
+
+    ok, bad, missing = asyncio.run(run())
+
+    assert ok[0] == 200 and ok[1]["focus"] == "teatro"
+    assert bad[0] == 400
+    assert missing[0] == 404
+
+
+def test_requested_foci_are_capped_least_recently_used(tmp_path):
+    orch = FakeOrchestrator()
+    service = WeekendService(orch, ["samba"], path=tmp_path / "r.json", max_foci=3)
+
+    async def run():
+        for focus in ("teatro", "jazz", "teatro", "museu"):
+            await service.get(focus, WEEKEND)
+
+    asyncio.run(run())
+
+    assert service.foci == ["samba", "teatro", "museu"]
+    assert {focus for focus, _ in service.results} == {"samba", "teatro", "museu"}
+
+
+class EmptyOrchestrator:
+    async def batch_run(self, foci, weekends, mode="serp"):
+        return
+        yield
+
+
+class BrokenOrchestrator:
+    async def batch_run(self, foci, weekends, mode="serp"):
+        raise ValueError("bad model output")
+        yield
+
+
+def test_missing_result_is_unavailable_and_pipeline_errors_are_500(tmp_path):
+    async def request(service, path):
+        server = await asyncio.start_server(make_handler(service), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            status = int((await reader.readline()).split()[1])
+            writer.close()
+            return status
+
+    empty = WeekendService(EmptyOrchestrator(), ["samba"], path=tmp_path / "a.json")
+    broken = WeekendService(BrokenOrchestrator(), ["samba"], path=tmp_path / "b.json")
+    path = "/events?focus=samba&weekend=2026-01-07"
+
+    assert asyncio.run(request(empty, path)) == 503
+    assert asyncio.run(request(broken, path)) == 500
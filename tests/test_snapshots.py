@@ -0,0 +1,49 @@
+import asyncio
+
+from src.spagent.schemas import FetchResult
+from src.spagent.snapshots import SnapshotStore
+
+DAY = 86400
+
+
+def _page(html: str, source: str = "sesc") -> FetchResult:
+    return FetchResult(url=f"https://{source}.test/", html=html, source=source)
+
+
+def test_put_dedupes_content_and_keeps_history(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first = asyncio.run(store.put(_page("<h2>Samba</h2>" * 200)))
+    again = store.put_sync(_page("<h2>Samba</h2>" * 200))
+    other = store.put_sync(_page("<h2>Jazz</h2>", source="sympla"))
+
+    assert first.sha == again.sha
+    assert [s.sha for s in store.history("sesc")] == [first.sha, first.sha]
+    assert store.latest("sympla") == other
+    assert store.sources() == ["sesc", "sympla"]
+    assert store.read(first) == "<h2>Samba</h2>" * 200
+    assert store.page(other).html == "<h2>Jazz</h2>"
+
+    stats = store.stats()
+    assert stats["blobs"] == 2 and stats["snapshots"] == 3
+    assert stats["bytes"] < len("<h2>Samba</h2>" * 200)
+
+
+def test_retention_trims_history_and_orphaned_blobs(tmp_path):
+    store = SnapshotStore(tmp_path, max_age_days=7, max_per_source=2)
+    old = store.put_sync(_page("<p>v1</p>"), now=0)
+    store.put_sync(_page("<p>v2</p>"), now=8 * DAY)
+    assert [store.read(s) for s in store.history("sesc")] == ["<p>v2</p>"]
+    assert not store._blob(old.sha).exists()
+
+    for i in range(3, 6):
+        store.put_sync(_page(f"<p>v{i}</p>"), now=8 * DAY + i)
+    assert [store.read(s) for s in store.history("sesc")] == ["<p>v4</p>", "<p>v5</p>"]
+    assert store.stats()["blobs"] == 2
+
+
+def test_diff_compares_extraction_text(tmp_path):
+    store = SnapshotStore(tmp_path)
+    old = store.put_sync(_page("<h2>Samba</h2><p>sábado</p>"))
+    new = store.put_sync(_page("<h2>Samba</h2><p>domingo</p>"))
+    diff = store.diff(old, new)
+    assert "-sábado" in diff and "+domingo" in diff
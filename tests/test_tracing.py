@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+
+from src.spagent.tracing import Tracer
+
+
+def test_spans_nest_across_tasks_and_record_errors():
+    tracer = Tracer()
+
+    async def chunk(i):
+        with tracer.span("chunk", idx=i) as s:
+            await asyncio.sleep(0.01)
+            s.add("input_tokens", 10)
+
+    async def run():
+        with tracer.span("page") as page:
+            await asyncio.gather(*(chunk(i) for i in range(3)))
+        return page
+
+    page = asyncio.run(run())
+    with pytest.raises(ValueError):
+        with tracer.span("llm"):
+            raise ValueError("boom")
+
+    chunks = [s for s in tracer.spans if s.name == "chunk"]
+    assert len(chunks) == 3
+    assert all(s.parent_id == page.id for s in chunks)
+    assert page.duration_ms >= 10
+    assert tracer.spans[-1].error == "ValueError: boom"
+    assert tracer.metrics["chunk"]["input_tokens"] == 30
+    assert tracer.metrics["llm"]["errors"] == 1
+
+
+def test_export_writes_jsonl_and_prometheus_snapshot(tmp_path):
+    tracer = Tracer()
+    with tracer.span("step", tool="fetch_sesc", queue_wait_ms=5):
+        pass
+
+    trace = tracer.export(tmp_path)
+
+    (line,) = trace.read_text().splitlines()
+    assert json.loads(line)["tool"] == "fetch_sesc"
+    metrics = (tmp_path / "metrics.prom").read_text()
+    assert 'spagent_span_total{span="step"} 1' in metrics
+    assert 'spagent_queue_wait_ms_total{span="step"} 5' in metrics
+    assert tracer.spans == []
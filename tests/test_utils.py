@@ -0,0 +1,91 @@
+import time
+from typing import List
+
+import pytest
+
+from src.spagent.schemas import Event, EventList
+from src.spagent.utils import IncrementalArrayParser, parse_model, salvage_json
+
+
+def test_incremental_parser_emits_objects_as_they_close():
+    text = (
+        'Sure! {"events": [{"title": "a [x] }", "meta": {"k": 1}}, '
+        '{"title": "b\\"q"}, {broken}, {"title": "c"}]} trailing {"x": 1}'
+    )
+    parser = IncrementalArrayParser()
+    items = []
+    for i in range(0, len(text), 3):
+        items += parser.feed(text[i : i + 3])
+
+    assert items == [
+        {"title": "a [x] }", "meta": {"k": 1}},
+        {"title": 'b"q'},
+        {"title": "c"},
+    ]
+    assert parser.done
+    assert parser.dropped == 1
+
+
+def test_incremental_parser_handles_bare_arrays_and_truncation():
+    parser = IncrementalArrayParser()
+    assert parser.feed('[{"title": "a"}, {"title": "tr') == [{"title": "a"}]
+    assert not parser.done
+
+
+def test_salvage_recovers_complete_items_from_damaged_output():
+    text = (
+        'Sure!\n```json\n{"events": [{"title": "a"}, // first\n'
+        '{"title": "b",}, {"title": oops}, /* x */ {title: "c"}, {"title": "tr'
+    )
+    value, dropped = salvage_json(text)
+
+    assert value == {"events": [{"title": "a"}, {"title": "b"}, {}, {"title": "c"}]}
+    assert dropped == [
+        "title: unexpected 'oops'",
+        "item 4: truncated",
+        "output truncated",
+    ]
+
+
+def test_salvage_skips_prose_and_reports_nothing_for_valid_json():
+    assert salvage_json('see [1]: [{"title": "a"}] done') == ([{"title": "a"}], [])
+    assert salvage_json("no json here") == (None, [])
+    assert salvage_json('Returned {n} events: {"events": [{"title": "a"}]}') == (
+        {"events": [{"title": "a"}]},
+        [],
+    )
+    assert salvage_json("Returned {n} events.") == ({}, ["n: no value for 'n'"])
+
+
+def test_salvage_scans_bracket_heavy_prose_in_linear_time():
+    text = "Returned {n} events, see [a] " * 6000 + '{"events": [{"title": "a"}]}'
+    start = time.perf_counter()
+    value, _ = salvage_json(text)
+    assert value == {"events": [{"title": "a"}]}
+    assert time.perf_counter() - start < 1.0
+
+
+def test_salvage_survives_pathological_nesting():
+    value, dropped = salvage_json("[" * 5000)
+    assert value == [] and "output truncated" in dropped
+    value, _ = salvage_json('{"a": ' * 3000 + "1")
+    assert isinstance(value, dict)
+
+
+def test_parse_model_drops_invalid_items_and_accepts_bare_arrays():
+    events, dropped = parse_model(
+        '[{"title": "a", "starts_at": null}, {"title": 3, "starts_at": null}', EventList
+    )
+    assert [e.title for e in events.events] == ["a"]
+    assert dropped == [
+        "output truncated",
+        "events[1]: title Input should be a valid string",
+    ]
+
+    items, _ = parse_model(
+        '{"events": [{"title": "a", "starts_at": null}]}', List[Event]
+    )
+    assert [e.title for e in items] == ["a"]
+
+    with pytest.raises(ValueError):
+        parse_model("no json", EventList)
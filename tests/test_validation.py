@@ -0,0 +1,84 @@
+from datetime import date, datetime
+
+from src.spagent.schemas import Event, SuccessCriteria
+from src.spagent.tools.calendar import TZ
+from src.spagent.tools.validation import parse_date, validate
+
+WINDOW = (
+    TZ.localize(datetime(2026, 1, 9)),
+    TZ.localize(datetime(2026, 1, 11, 23, 59)),
+)
+SOURCE = "https://saopaulosecreto.com/o-que-fazer-fim-de-semana-sao-paulo/"
+
+
+def _event(**kwargs) -> Event:
+    defaults = dict(title="Roda de Samba", starts_at="2026-01-10", source_url=SOURCE)
+    return Event(**{**defaults, **kwargs})
+
+
+def test_validate_filters_window_city_and_hallucinations():
+    events = [
+        _event(),
+        _event(starts_at="10/01/2026 20h", city="SP", link="/samba/"),
+        _event(starts_at="2026-01-05", ends_at="2026-02-01"),
+        _event(starts_at="2026-01-20"),
+        _event(starts_at=None),
+        _event(title="  "),
+        _event(city="Rio de Janeiro"),
+        _event(link="https://made-up.example/event"),
+    ]
+
+    report = validate(events, SuccessCriteria(), window=WINDOW)
+
+    assert len(report.events) == 3
+    assert report.events[1].city == "São Paulo"
+    assert report.events[1].link == "https://saopaulosecreto.com/samba/"
+    assert report.rejected == {
+        "out_of_window": 1,
+        "missing_date": 1,
+        "missing_title": 1,
+        "other_city": 1,
+        "link_off_domain": 1,
+    }
+    assert report.notes().startswith("kept 3/8; rejected: link_off_domain=1")
+
+
+def test_validate_skips_window_when_not_required():
+    criteria = SuccessCriteria(date_range_required=False)
+    report = validate([_event(starts_at=None)], criteria)
+
+    assert len(report.events) == 1
+    assert report.rejected == {}
+
+
+def test_parse_date_needs_a_day_and_month():
+    assert parse_date("10/01/2026 20h") == date(2026, 1, 10)
+    assert parse_date("sáb, 10/01/2026 às 20h") == date(2026, 1, 10)
+    assert parse_date("Jan 5, 2026") == date(2026, 1, 5)
+    # fuzzy parsing used to turn these into dates this month
+    for text in ("20h", "R$ 20", "a partir de 12 anos", "12", "março"):
+        assert parse_date(text) is None, text
+
+
+def test_parse_date_fills_in_the_current_year(monkeypatch):
+    class Clock(datetime):
+        year = 2026
+
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(cls.year, 6, 1, tzinfo=tz)
+
+    monkeypatch.setattr("src.spagent.tools.validation.datetime", Clock)
+    assert parse_date("10/01") == date(2026, 1, 10)
+    Clock.year = 2027
+    assert parse_date("10/01") == date(2027, 1, 10)
+
+
+def test_validate_dates_from_text_and_leaves_rejected_events_alone():
+    dated_by_text = _event(starts_at=None, date_text="sáb, 10/01/2026 às 20h")
+    rejected = _event(starts_at="2026-01-20", city="SP", link="/samba/")
+
+    report = validate([dated_by_text, rejected], SuccessCriteria(), window=WINDOW)
+
+    assert report.events == [dated_by_text]
+    assert rejected.city == "SP" and rejected.link == "/samba/"
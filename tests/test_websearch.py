@@ -0,0 +1,109 @@
+import asyncio
+import time
+from datetime import datetime
+
+import httpx
+
+from src.spagent.schemas import Result
+from src.spagent.tools.http import HttpCache, fetch_cleaned
+from src.spagent.tools.websearch import (
+    SearxBackend,
+    gather_until,
+    get_search_backend,
+    rank_results,
+    search_pages,
+)
+
+WINDOW = (datetime(2026, 1, 9), datetime(2026, 1, 11, 23, 59))
+
+
+def _result(url: str, title: str, snippet: str = "", date=None) -> Result:
+    return Result(title=title, snippet=snippet, url=url, source="t", date=date)
+
+
+def test_rank_results_prefers_dated_event_pages():
+    results = [
+        _result("https://a.test/blog", "Receita de bolo"),
+        _result("https://b.test/old", "Show", "show em 12/12"),
+        _result("https://c.test/agenda", "Agenda do fim de semana", "10 de janeiro"),
+        _result("https://c.test/agenda#top", "dup"),
+        _result("https://www.youtube.com/watch?v=1", "Roda de samba ao vivo"),
+    ]
+
+    ranked = [r.url for r in rank_results(results, WINDOW)]
+
+    assert ranked == [
+        "https://c.test/agenda",
+        "https://a.test/blog",
+        "https://b.test/old",
+    ]
+
+
+def _cached_fetch(cache):
+    async def fetch(url, clean, *, client=None):
+        return await fetch_cleaned(url, clean, client=client, cache=cache)
+
+    return fetch
+
+
+def test_search_pages_fetches_concurrently_within_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.spagent.tools.websearch.fetch_cleaned",
+        _cached_fetch(HttpCache(tmp_path)),
+    )
+    queries = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search":
+            queries.append(request.url.params["q"])
+            results = [
+                {"url": f"https://site{i}.test/", "title": f"Agenda {i}", "content": ""}
+                for i in range(5)
+            ]
+            return httpx.Response(200, json={"results": results})
+        if request.url.host == "site4.test":
+            await asyncio.sleep(5)
+        else:
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, text=f"<p>{request.url.host}</p>")
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            backend = SearxBackend("http://stub.test", client=client)
+            return await search_pages(
+                WINDOW, backend, top_n=5, deadline_s=1.0, client=client
+            )
+
+    start = time.perf_counter()
+    pages = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert len(queries) == 4
+    assert elapsed < 1.5
+    assert sorted(p.url for p in pages) == [f"https://site{i}.test/" for i in range(4)]
+    assert all(p.source == "websearch" for p in pages)
+
+
+def test_search_backend_comes_from_settings(monkeypatch):
+    monkeypatch.setenv("SEARCH_PROVIDER", "searxng")
+    monkeypatch.setenv("SEARX_URL", "http://searx.test")
+
+    backend = get_search_backend()
+    assert isinstance(backend, SearxBackend)
+    assert backend.base_url == "http://searx.test"
+
+
+def test_gather_until_logs_failed_tasks(caplog):
+    async def fail():
+        raise httpx.ConnectError("refused")
+
+    async def ok():
+        return "page"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        return await gather_until([fail(), ok()], loop.time() + 1)
+
+    assert asyncio.run(run()) == ["page"]
+    assert "refused" in caplog.text
@@ -1,6 +1,69 @@
-from src.spagent.tools.calendar import current_weekend
+import asyncio
+
+from src.spagent.agents import orchestrator
+from src.spagent.schemas import Event, ExecutionSummary
+from src.spagent.tools.calendar import current_weekend, upcoming_weekends, weekend_of
 
 
 def test_current_weekend_order():
     fri, sun = current_weekend()
     assert fri < sun
+
+
+def test_upcoming_weekends_are_consecutive():
+    first, second = upcoming_weekends(2, today=weekend_of("2026-01-07")[0])
+    assert first[0].date().isoformat() == "2026-01-09"
+    assert second[0].date().isoformat() == "2026-01-16"
+    assert weekend_of("2026-01-14") == second
+
+
+def test_weekend_days_map_to_their_own_weekend():
+    for day in ("2026-10-16", "2026-10-17", "2026-10-18"):
+        fri, sun = weekend_of(day)
+        assert (fri.date().isoformat(), sun.date().isoformat()) == (
+            "2026-10-16",
+            "2026-10-18",
+        )
+
+
+class FakeIndex:
+    def upsert(self, events):
+        return 0
+
+    def rank(self, events, focus):
+        return [e for e in events if focus in e.title.lower()]
+
+
+def test_batch_run_shares_one_pipeline_pass(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    async def fake_run_agent(
+        user_request, planner, window=None, mode="serp", budget=None
+    ):
+        calls.append(window)
+        pool = [
+            Event(title="Roda de samba", starts_at="2026-01-10"),
+            Event(title="Peça de teatro", starts_at="2026-01-11"),
+            Event(title="Samba no parque", starts_at="2026-01-17"),
+        ]
+        return pool, [], ExecutionSummary(total_events=len(pool), sources_used=[])
+
+    monkeypatch.setattr(orchestrator, "run_agent", fake_run_agent)
+    orch = orchestrator.Orchestrator(skip_planner=True)
+    orch.index = FakeIndex()
+    weekends = [weekend_of("2026-01-07"), weekend_of("2026-01-14")]
+
+    async def run():
+        return [r async for r in orch.batch_run(["samba", "teatro"], weekends)]
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert calls[0][0] == weekends[0][0] and calls[0][1] == weekends[1][1]
+    assert [(r["focus"], r["weekend_start"], len(r["events"])) for r in results] == [
+        ("samba", "2026-01-09", 1),
+        ("teatro", "2026-01-09", 1),
+        ("samba", "2026-01-16", 1),
+        ("teatro", "2026-01-16", 0),
+    ]